@@ -2,5 +2,17 @@
 CRM Benchmark library for evaluating AI agents on CRM-related tasks.
 """
 
-from .client import BenchmarkClient, AsyncBenchmarkClient
-from .benchmark import run_benchmark 
\ No newline at end of file
+# The clients pull in pandas, matplotlib, openai and aiohttp. They are imported
+# on first attribute access so light entry points (the crm-bench daemon client)
+# start without paying that cost.
+__all__ = ["BenchmarkClient", "AsyncBenchmarkClient", "run_benchmark"]
+
+
+def __getattr__(name):
+    if name in ("BenchmarkClient", "AsyncBenchmarkClient"):
+        from . import client
+        return getattr(client, name)
+    if name == "run_benchmark":
+        from .benchmark import run_benchmark
+        return run_benchmark
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
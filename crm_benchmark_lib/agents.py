@@ -0,0 +1,374 @@
+# agents.py
+
+"""
+Agent protocols and helpers understood by the benchmark harness.
+
+Besides a plain `agent_callable(question_text, df) -> str`, run_benchmark
+accepts a PreparedAgent: `prepare(df)` is called once per CSV and its return
+value is handed to `answer(question_text, state)` for every question, so
+indexes, embeddings or summaries of the DataFrame are built only once.
+
+AgentPool backs the `agent_factory` option of the clients: every worker
+thread builds its own agent once and reuses it for all of its benchmarks.
+
+Agents can attach per-question measurements with report_agent_metrics(); the
+harness collects them into the question's "agent_metrics". HttpAgent uses
+this to report network versus server time for remote agents.
+
+question_frame() gives every question its own copy-on-write view of the
+DataFrame, so an agent that modifies its input cannot affect later questions.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import inspect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PreparedAgent:
+    """
+    Base class for agents with a per-dataset setup step.
+
+    ```python
+    class IndexedAgent(PreparedAgent):
+        def prepare(self, df):
+            return build_index(df)
+
+        def answer(self, question, state):
+            return search(state, question)
+    ```
+    """
+
+    def prepare(self, df: pd.DataFrame) -> Any:
+        """Build per-CSV state once. Defaults to the DataFrame itself."""
+        return df
+
+    def answer(self, question: str, state: Any) -> str:
+        raise NotImplementedError
+
+
+def is_prepared_agent(agent: Any) -> bool:
+    """True if `agent` follows the prepare/answer protocol (duck-typed)."""
+    return callable(getattr(agent, "prepare", None)) and callable(getattr(agent, "answer", None))
+
+
+class AgentPool:
+    """
+    Lazily builds one agent per worker thread from `factory` and records how
+    long the builds took.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.agents_built = 0
+        self.build_seconds = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """Return this thread's agent, building it on first use."""
+        agent = getattr(self._local, "agent", None)
+        if agent is None:
+            start_time = time.time()
+            agent = self.factory()
+            elapsed = time.time() - start_time
+            self._local.agent = agent
+            self._local.pending_build_seconds = elapsed
+            with self._lock:
+                self.agents_built += 1
+                self.build_seconds += elapsed
+        return agent
+
+    def pop_build_seconds(self) -> float:
+        """Build time of this thread's agent not yet reported, then reset to 0."""
+        elapsed = getattr(self._local, "pending_build_seconds", 0.0)
+        self._local.pending_build_seconds = 0.0
+        return elapsed
+
+
+# ------------------------------------------------------------------------
+# Copy-on-write DataFrame views
+# ------------------------------------------------------------------------
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def copy_on_write_enabled() -> bool:
+    """True if pandas Copy-on-Write is active (always with pandas >= 3)."""
+    if _PANDAS_MAJOR >= 3:
+        return True
+    try:
+        return pd.options.mode.copy_on_write is True
+    except (AttributeError, KeyError):
+        return False
+
+
+def question_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cheap per-question view of `df` that the agent may freely modify.
+
+    With Copy-on-Write this is a shallow copy: no data is copied until the
+    agent writes, and writes only affect the view. Older pandas without
+    Copy-on-Write shares the underlying arrays between shallow copies, so
+    there each question gets a deep copy instead.
+    """
+    return df.copy(deep=not copy_on_write_enabled())
+
+
+# ------------------------------------------------------------------------
+# Per-question agent metrics
+# ------------------------------------------------------------------------
+_current_agent_metrics = contextvars.ContextVar("crm_bench_agent_metrics", default=None)
+
+
+@contextmanager
+def agent_metrics_scope():
+    """
+    Collect report_agent_metrics() calls made while the block runs (in this
+    thread / task) into the yielded dict.
+    """
+    metrics = {}
+    token = _current_agent_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_agent_metrics.reset(token)
+
+
+def report_agent_metrics(**metrics) -> None:
+    """
+    Attach measurements to the question currently being answered. Numeric
+    values reported more than once are summed; other values are replaced.
+    Outside a benchmark run this is a no-op.
+    """
+    scope = _current_agent_metrics.get()
+    if scope is None:
+        return
+    for key, value in metrics.items():
+        previous = scope.get(key)
+        if _is_number(value) and _is_number(previous):
+            scope[key] = previous + value
+        else:
+            scope[key] = value
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_async_agent(agent: Any) -> bool:
+    """True if the agent can run natively on the event loop (async def, async generator or acall)."""
+    return (
+        inspect.iscoroutinefunction(agent)
+        or inspect.isasyncgenfunction(agent)
+        or inspect.iscoroutinefunction(getattr(agent, "acall", None))
+    )
+
+
+# ------------------------------------------------------------------------
+# Remote HTTP agents
+# ------------------------------------------------------------------------
+_SERVER_TIMING_DUR = re.compile(r"dur=([0-9.]+)")
+_INLINE_CACHE_SIZE = 8
+
+
+async def _close_with_loop(session):
+    """Suspended async generator: the loop's shutdown_asyncgens() runs the finally."""
+    try:
+        yield
+    finally:
+        if not session.closed:
+            await session.close()
+
+
+class HttpAgent:
+    """
+    Use a remote HTTP service anywhere an agent_callable is accepted.
+
+    Each question is sent as a JSON POST:
+        {"question": "...", "dataset": "D1", "csv_path": "...", "data": {...}}
+    where "data" (the DataFrame in pandas "split" orientation) is only included
+    with inline_data=True; otherwise the service is expected to resolve the
+    dataset from "csv_path". The service replies with {"answer": "..."} or
+    plain text.
+
+    Requests go through one pooled keep-alive session (aiohttp when called via
+    `acall`, which AsyncBenchmarkClient does natively) and at most
+    `max_concurrency` requests are in flight at once. The round trip is
+    reported as `http_total_seconds`; if the service reports its own time via
+    a `Server-Timing` header (dur in ms), an `X-Server-Time` header (seconds)
+    or a "server_time_seconds" JSON field, it is reported as
+    `server_time_seconds` and the remainder as `network_time_seconds`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        inline_data: bool = False,
+        max_concurrency: int = 8,
+        timeout: float = 120.0,
+        headers: Optional[Dict[str, str]] = None,
+        session: Optional[requests.Session] = None
+    ):
+        self.url = url
+        self.inline_data = inline_data
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.headers = headers or {}
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._inline_cache = {}
+        self._inline_lock = threading.Lock()
+
+        # aiohttp sessions and semaphores are bound to the loop that created them:
+        # loop -> (session, semaphore, guard), see _aio_state
+        self._aio_sessions = {}
+        self._aio_lock = threading.Lock()
+
+    def _payload(self, question: str, df: pd.DataFrame) -> Dict[str, Any]:
+        csv_path = df.attrs.get("csv_data_path") if df is not None else None
+        payload = {"question": question, "csv_path": csv_path}
+        if csv_path:
+            name = os.path.basename(csv_path)
+            payload["dataset"] = name[:2] if name.startswith("D") else None
+        if self.inline_data and df is not None:
+            payload["data"] = self._inline_data(df)
+        return payload
+
+    def _inline_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Serialize each dataset once, however many questions (and per-question views) there are."""
+        key = (df.attrs.get("csv_data_path") or id(df), df.shape, tuple(df.columns))
+        with self._inline_lock:
+            data = self._inline_cache.get(key)
+        if data is None:
+            data = json.loads(df.to_json(orient="split", index=False))
+            with self._inline_lock:
+                while len(self._inline_cache) >= _INLINE_CACHE_SIZE:
+                    self._inline_cache.pop(next(iter(self._inline_cache)))
+                self._inline_cache[key] = data
+        return data
+
+    @staticmethod
+    def _server_time(headers, body) -> Optional[float]:
+        timing = headers.get("Server-Timing")
+        if timing:
+            durations = _SERVER_TIMING_DUR.findall(timing)
+            if durations:
+                return sum(float(d) for d in durations) / 1000.0
+        if headers.get("X-Server-Time"):
+            try:
+                return float(headers["X-Server-Time"])
+            except ValueError:
+                pass
+        if isinstance(body, dict) and _is_number(body.get("server_time_seconds")):
+            return float(body["server_time_seconds"])
+        return None
+
+    @staticmethod
+    def _answer(body, text: str) -> str:
+        if isinstance(body, dict):
+            return str(body.get("answer", body.get("response", "")))
+        if body is not None:
+            return str(body)
+        return text
+
+    def _report(self, total: float, server: Optional[float]) -> None:
+        metrics = {"http_total_seconds": round(total, 4), "http_requests": 1}
+        if server is not None:
+            metrics["server_time_seconds"] = round(server, 4)
+            metrics["network_time_seconds"] = round(max(total - server, 0.0), 4)
+        report_agent_metrics(**metrics)
+
+    def __call__(self, question: str, df: pd.DataFrame) -> str:
+        payload = self._payload(question, df)
+        with self._semaphore:
+            start_time = time.time()
+            response = self.session.post(self.url, json=payload, headers=self.headers, timeout=self.timeout)
+            total = time.time() - start_time
+        response.raise_for_status()
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        self._report(total, self._server_time(response.headers, body))
+        return self._answer(body, response.text)
+
+    async def _aio_state(self):
+        """
+        Session and semaphore of the running loop, created on first use. Each
+        session is closed when its loop shuts down: asyncio.run and
+        asyncio.Runner close pending async generators first, which runs
+        _close_with_loop. A loop closed without loop.shutdown_asyncgens() can no
+        longer close its session; it is only dropped on the next call.
+        """
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        with self._aio_lock:
+            self._release_dead_sessions()
+            state = self._aio_sessions.get(loop)
+            if state is not None and not state[0].closed:
+                return state
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            guard = _close_with_loop(session)
+            state = self._aio_sessions[loop] = (session, asyncio.Semaphore(self.max_concurrency), guard)
+        await guard.__anext__()
+        return state
+
+    def _release_dead_sessions(self) -> None:
+        for loop in [loop for loop in self._aio_sessions if loop.is_closed()]:
+            session = self._aio_sessions.pop(loop)[0]
+            if not session.closed:
+                # Nothing can be awaited on a closed loop: drop the connector unawaited
+                session.detach()
+
+    async def acall(self, question: str, df: pd.DataFrame) -> str:
+        session, semaphore, _ = await self._aio_state()
+        payload = self._payload(question, df)
+        async with semaphore:
+            start_time = time.time()
+            async with session.post(self.url, json=payload, headers=self.headers) as response:
+                response.raise_for_status()
+                text = await response.text()
+                total = time.time() - start_time
+                headers = response.headers
+
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = None
+        self._report(total, self._server_time(headers, body))
+        return self._answer(body, text)
+
+    async def aclose(self) -> None:
+        """Close the running loop's aiohttp session."""
+        with self._aio_lock:
+            state = self._aio_sessions.pop(asyncio.get_running_loop(), None)
+            self._release_dead_sessions()
+        if state is not None and not state[0].closed:
+            await state[0].close()
+
+    def close(self) -> None:
+        self.session.close()
+        with self._aio_lock:
+            self._release_dead_sessions()
@@ -5,25 +5,116 @@ Main user-facing interface to run the benchmark.
 """
 
 import time
+import asyncio
 import logging
-from typing import Callable
+import inspect
+import functools
+import contextvars
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import AsyncIterator, Iterator
+from typing import Callable, List, Optional, Union
 import pandas as pd
-from .evaluator import load_questions, evaluate_response_with_variants, compute_weighted_score
+from .evaluator import (
+    load_questions, compute_weighted_score, GradingBatcher, GRADING_FAILED_PREFIX, grading_failed,
+    hold_async_grader_client, close_async_grader_client
+)
+from .grader_health import grader_breaker
+from .graders import GraderBackend, OpenAIGrader, get_grader
+from .grader_context import GraderContextBuilder, GRADER_CONTEXT_TOKEN_BUDGET
+from .hedging import GradingHedger, hedging_summary
+from .records import QuestionRecord, ResultSpill, ScoreAggregate, intern_question, percentiles
+from .agents import is_prepared_agent, agent_metrics_scope, question_frame
+from .tracing import trace_llm_calls, summarize_llm_calls, merge_llm_summaries
+from .metering import CostMeter, usage_scope, merge_usage_summaries
+from .fast_grader import pre_grade
+from .grading_cache import GradingCache
+from .question_registry import load_question_set, question_set_hash
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.CRITICAL)
 
 def run_benchmark(
-    agent_callable: Callable[[str, pd.DataFrame], str],
+    agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
     questions_json_path: str,
     csv_data_path: str,
-    optional_post_function: Callable[[dict], None] = None
+    optional_post_function: Callable[[dict], None] = None,
+    questions: Optional[List[dict]] = None,
+    df: Optional[pd.DataFrame] = None,
+    compact_results: bool = False,
+    result_spill: Optional[ResultSpill] = None,
+    agent_batch_callable: Optional[Callable[[List[str], pd.DataFrame], List[str]]] = None,
+    isolate_data: bool = True,
+    trace_agent_llm_calls: bool = False,
+    cost_meter: Optional[CostMeter] = None,
+    fast_path_grading: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    batch_grading: Union[bool, GradingBatcher] = False,
+    grader: Union[None, str, GraderBackend] = None,
+    grader_context: Union[bool, int] = False,
+    hedge_grading: Union[bool, GradingHedger] = False
 ):
     """
-    - agent_callable: user-provided function that takes (question_text, dataframe) -> returns agent response str
+    - agent_callable: user-provided function that takes (question_text, dataframe) -> returns agent response str,
+      or a PreparedAgent-style object whose prepare(df) runs once per CSV and whose
+      answer(question_text, state) runs per question; setup is timed separately
     - questions_json_path: path to the question set JSON
     - csv_data_path: path to the CSV file that the agent might parse for context
     - optional_post_function: placeholder to send results to an external API, if desired
+    - questions / df: already-loaded question set and DataFrame; when given, the
+      corresponding file is not read again (used by the benchmark daemon)
+    - compact_results: keep QuestionRecord objects (slots + shared question
+      metadata) in "question_details" instead of plain dicts
+    - result_spill: stream each QuestionRecord to this ResultSpill and keep only
+      running aggregates; "question_details" is then empty
+    - agent_batch_callable: alternative to agent_callable that takes
+      (list_of_question_texts, dataframe) and returns the answers in the same
+      order (or a dict keyed by question_id); the batch time is split evenly
+      across the questions' time_taken_seconds
+    - isolate_data: give every question (and prepare()/batch call) its own
+      copy-on-write view of the DataFrame (agents.question_frame), so changes an
+      agent makes to its input never reach later questions
+    - trace_agent_llm_calls: record the OpenAI calls the agent makes per question
+      (tracing.trace_llm_calls) in "llm_trace", splitting the question's time
+      into model_time_seconds and local_time_seconds
+    - cost_meter: metering.CostMeter with the price table and a running total
+      across runs; defaults to a fresh meter with the built-in prices. Grader
+      and agent token usage (metering.report_agent_usage) is priced per question
+      in "usage" and per CSV in "usage_summary" / "cost_usd"
+    - fast_path_grading: score crisp numeric / named-entity answers locally
+      (fast_grader.pre_grade) and only send ambiguous ones to the LLM judge;
+      each question's "grader_tier" and the result's "grading" counts show
+      which path was taken. Off by default: its verdicts are final and are not
+      checked against the LLM judge
+    - grading_cache: optional grading_cache.GradingCache; LLM verdicts for
+      answers graded before (same question, expected answer, grader version
+      and normalized response) are reused instead of calling the grader again
+    - batch_grading: grade after all questions are answered, packing many
+      responses into each grader request (evaluator.evaluate_responses_batch);
+      responses the grader leaves unscored are graded one by one. Pass a
+      shared evaluator.GradingBatcher to pool requests with other runs
+    - grader: grading backend (graders.GraderBackend or a name in
+      graders.GRADERS, e.g. "similarity" for the offline TF-IDF grader or
+      "cascade" to send only borderline similarity scores to the LLM);
+      defaults to the OpenAI LLM judge
+    - grader_context: give the grader a compacted view of the CSV (schema,
+      relevant columns, rows matching the names / numbers in the response)
+      and truncate overlong responses (grader_context.GraderContextBuilder).
+      True uses GRADER_CONTEXT_TOKEN_BUDGET; an int sets the token budget.
+      Tokens saved against sending the whole CSV are reported in
+      "grader_context". Batched grading only truncates responses
+    - hedge_grading: send a duplicate grader request when one is slower than
+      the live p95 latency, capped at 5% extra calls (hedging.py); pass a
+      shared hedging.GradingHedger to pool latencies with other runs or set
+      the percentile and cap. Reported in "hedging"
+
+    Measurements an agent reports through agents.report_agent_metrics() while
+    answering are stored in that question's "agent_metrics".
+
+    An agent may also return an iterator of text chunks (or an OpenAI stream)
+    instead of a string. The joined text is graded, the question gets
+    "stream_metrics" (time to first token, chunks, tokens per second) and the
+    result dict gets "ttft_percentiles".
 
     Returns a dict with overall results, including question-by-question detail.
     """
@@ -31,56 +122,73 @@ def run_benchmark(
     logger.info("Question Set JSON: %s", questions_json_path)
     logger.info("CSV Data: %s", csv_data_path)
 
-    questions = load_questions(questions_json_path)
-    df = pd.read_csv(csv_data_path)
+    if agent_callable is None and agent_batch_callable is None:
+        raise ValueError("Either agent_callable or agent_batch_callable must be provided")
 
-    question_results = []
-    total_time = 0.0
+    weights = _set_weights(questions_json_path, questions)
+    if questions is None:
+        questions = load_questions(questions_json_path)
+    if df is None:
+        df = pd.read_csv(csv_data_path)
 
-    for q in questions:
-        question_id = q["question_id"]
-        question_text = q["question_text"]
-        category = q["category"]
-        correct_answer = q["correct_answer"]
+    run = _BenchmarkRun(questions, df, csv_data_path, compact_results, result_spill, isolate_data, trace_agent_llm_calls, cost_meter, fast_path_grading, grading_cache, batch_grading, grader, grader_context, hedge_grading, weights)
 
-        logger.debug("Asking question: %s (%s)", question_id, category)
+    if agent_batch_callable is not None:
+        with usage_scope() as usage, agent_metrics_scope() as metrics, run.trace_scope() as llm_calls:
+            start_time = time.time()
+            answers = agent_batch_callable(run.question_texts(), run.agent_frame())
+            run.set_batch_answers(answers, time.time() - start_time, metrics, llm_calls, usage)
 
-        start_time = time.time()
-        # Call the user’s AI agent function
-        agent_response = agent_callable(question_text, df)
-        end_time = time.time()
-        elapsed = end_time - start_time
-        total_time += elapsed
+        for q, agent_response in zip(questions, run.batch_answers):
+            elapsed = run.batch_time / len(questions)
+            if not run.grader_available():
+                run.add(ungraded_record(q, "grader unavailable; answer not graded", agent_response, elapsed), elapsed)
+                continue
+            if run.batch_grading:
+                run.defer(q, agent_response, elapsed)
+                continue
+            with usage_scope() as usage, run.hedge_scope():
+                record = grade_record(q, agent_response, elapsed, fast_path=run.fast_path_grading, grading_cache=run.grading_cache, grader=run.grader, grader_context=run.grader_context)
+            run.add(record, elapsed, usage)
+    else:
+        ask = run.prepare_agent(agent_callable)
 
-        logger.debug("Agent response: %r", agent_response)
+        for q in questions:
+            question_id = q["question_id"]
+            question_text = q["question_text"]
 
-        # Evaluate response
-        # Optionally pass the CSV text if you want the evaluator to see it
-        # or you can do: csv_data=df.to_string() if you want the entire CSV in the prompt.
-        score, debug_info = evaluate_response_with_variants(
-            agent_response, correct_answer, csv_data=""
-        )
+            logger.debug("Asking question: %s (%s)", question_id, q["category"])
 
-        logger.debug("Score=%.2f, Debug=%s", score, debug_info)
+            # Don't spend agent work on answers the grader can't score right now
+            if not run.grader_available():
+                run.add(ungraded_record(q, "grader unavailable; question not asked"), 0.0)
+                continue
 
-        question_results.append({
-            "question_id": question_id,
-            "category": category,
-            "question_text": question_text,
-            "agent_response": agent_response,
-            "score": score,
-            "evaluation_debug": debug_info,
-            "time_taken_seconds": round(elapsed, 3)
-        })
+            with usage_scope() as usage, run.hedge_scope():
+                with agent_metrics_scope() as metrics, run.trace_scope() as llm_calls:
+                    start_time = time.time()
+                    # Call the user’s AI agent function
+                    agent_response = ask(question_text)
+                    agent_response, stream_metrics = _collect_stream(agent_response, start_time)
+                    end_time = time.time()
+                elapsed = end_time - start_time
 
-    # Weighted final
-    final_percentage = compute_weighted_score(question_results)
+                if run.batch_grading:
+                    run.defer(
+                        q, agent_response, elapsed, usage, agent_metrics=metrics, stream_metrics=stream_metrics,
+                        llm_trace=run.llm_trace(llm_calls, elapsed)
+                    )
+                    continue
+                record = grade_record(
+                    q, agent_response, elapsed, agent_metrics=metrics, stream_metrics=stream_metrics,
+                    llm_trace=run.llm_trace(llm_calls, elapsed), fast_path=run.fast_path_grading,
+                    grading_cache=run.grading_cache, grader=run.grader, grader_context=run.grader_context
+                )
+            run.add(record, elapsed, usage)
 
-    results_obj = {
-        "overall_weighted_score_percent": final_percentage,
-        "total_time_seconds": round(total_time, 3),
-        "question_details": question_results
-    }
+    run.grade_deferred()
+    results_obj = run.finish()
+    final_percentage = results_obj["overall_weighted_score_percent"]
 
     logger.info("=== Final Weighted Score: %s ===", final_percentage)
 
@@ -89,3 +197,746 @@ def run_benchmark(
         optional_post_function(results_obj)
 
     return results_obj
+
+
+async def run_benchmark_async(
+    agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
+    questions_json_path: str,
+    csv_data_path: str,
+    optional_post_function: Callable[[dict], None] = None,
+    questions: Optional[List[dict]] = None,
+    df: Optional[pd.DataFrame] = None,
+    compact_results: bool = False,
+    result_spill: Optional[ResultSpill] = None,
+    agent_batch_callable: Optional[Callable[[List[str], pd.DataFrame], List[str]]] = None,
+    isolate_data: bool = True,
+    trace_agent_llm_calls: bool = False,
+    cost_meter: Optional[CostMeter] = None,
+    fast_path_grading: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    batch_grading: Union[bool, GradingBatcher] = False,
+    grader: Union[None, str, GraderBackend] = None,
+    grader_context: Union[bool, int] = False,
+    hedge_grading: Union[bool, GradingHedger] = False
+):
+    """
+    Asynchronous counterpart of run_benchmark with the same arguments and
+    result dict.
+
+    Agents (and answer() of prepared agents, and batch callables) may be
+    `async def` functions or objects with an async `acall(question, df)`
+    method such as HttpAgent; those are awaited on the event loop. Streaming
+    agents may return async iterators or be async generators. Synchronous
+    agents and file loading run in the default executor.
+
+    Grading uses the async evaluator on the event loop: each question's
+    grading runs as a task while the agent moves on to the next question, and
+    records are added in question order once all gradings finished.
+    batch_grading still grades in the executor.
+    """
+    logger.info("=== Running benchmark (async) ===")
+    logger.info("Question Set JSON: %s", questions_json_path)
+    logger.info("CSV Data: %s", csv_data_path)
+
+    if agent_callable is None and agent_batch_callable is None:
+        raise ValueError("Either agent_callable or agent_batch_callable must be provided")
+
+    weights = await _in_executor(_set_weights, questions_json_path, questions)
+    if questions is None:
+        questions = await _in_executor(load_questions, questions_json_path)
+    if df is None:
+        df = await _in_executor(pd.read_csv, csv_data_path)
+
+    run = _BenchmarkRun(questions, df, csv_data_path, compact_results, result_spill, isolate_data, trace_agent_llm_calls, cost_meter, fast_path_grading, grading_cache, batch_grading, grader, grader_context, hedge_grading, weights)
+    gradings = []  # (grading task, elapsed, usage ledger) in question order
+    # Synchronous agent code of one run stays on one thread, as in run_benchmark
+    agent_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crm-bench-agent")
+
+    # Grading tasks on this loop share one async grader client until the run ends
+    hold_async_grader_client()
+    try:
+        if agent_batch_callable is not None:
+            with usage_scope() as usage, agent_metrics_scope() as metrics, run.trace_scope() as llm_calls:
+                start_time = time.time()
+                answers = await _call_maybe_async(
+                    agent_batch_callable, run.question_texts(), run.agent_frame(), executor=agent_thread
+                )
+                run.set_batch_answers(answers, time.time() - start_time, metrics, llm_calls, usage)
+
+            for q, agent_response in zip(questions, run.batch_answers):
+                elapsed = run.batch_time / len(questions)
+                if not await run.grader_available_async():
+                    run.add(ungraded_record(q, "grader unavailable; answer not graded", agent_response, elapsed), elapsed)
+                    continue
+                if run.batch_grading:
+                    run.defer(q, agent_response, elapsed)
+                    continue
+                with usage_scope() as usage, run.hedge_scope():
+                    grading = asyncio.ensure_future(grade_record_async(
+                        q, agent_response, elapsed, fast_path=run.fast_path_grading, grading_cache=run.grading_cache, grader=run.grader, grader_context=run.grader_context
+                    ))
+                gradings.append((grading, elapsed, usage))
+        else:
+            if is_prepared_agent(agent_callable):
+                run.prepared_frame = run.agent_frame()
+                setup_start = time.time()
+                prepared_state = await _call_maybe_async(agent_callable.prepare, run.prepared_frame, executor=agent_thread)
+                run.setup_time = time.time() - setup_start
+
+                def ask(text):
+                    return _call_maybe_async(agent_callable.answer, text, prepared_state, executor=agent_thread)
+            else:
+                def ask(text):
+                    return _call_maybe_async(agent_callable, text, run.agent_frame(), executor=agent_thread)
+
+            for q in questions:
+                logger.debug("Asking question: %s (%s)", q["question_id"], q["category"])
+
+                if not await run.grader_available_async():
+                    run.add(ungraded_record(q, "grader unavailable; question not asked"), 0.0)
+                    continue
+
+                with usage_scope() as usage, run.hedge_scope():
+                    with agent_metrics_scope() as metrics, run.trace_scope() as llm_calls:
+                        start_time = time.time()
+                        agent_response = await ask(q["question_text"])
+                        agent_response, stream_metrics = await _collect_stream_async(agent_response, start_time, agent_thread)
+                        end_time = time.time()
+                    elapsed = end_time - start_time
+
+                    if run.batch_grading:
+                        run.defer(
+                            q, agent_response, elapsed, usage, agent_metrics=metrics, stream_metrics=stream_metrics,
+                            llm_trace=run.llm_trace(llm_calls, elapsed)
+                        )
+                        continue
+                    # The task copies the current context, so grader usage lands in this question's ledger
+                    grading = asyncio.ensure_future(grade_record_async(
+                        q, agent_response, elapsed, agent_metrics=metrics, stream_metrics=stream_metrics,
+                        llm_trace=run.llm_trace(llm_calls, elapsed), fast_path=run.fast_path_grading,
+                        grading_cache=run.grading_cache, grader=run.grader, grader_context=run.grader_context
+                    ))
+                gradings.append((grading, elapsed, usage))
+
+        for grading, elapsed, usage in gradings:
+            run.add(await grading, elapsed, usage)
+    finally:
+        for grading, _, _ in gradings:
+            grading.cancel()
+        agent_thread.shutdown(wait=False)
+        await close_async_grader_client()
+
+    await _in_executor(run.grade_deferred)
+    results_obj = run.finish()
+    logger.info("=== Final Weighted Score: %s ===", results_obj["overall_weighted_score_percent"])
+
+    if optional_post_function:
+        optional_post_function(results_obj)
+
+    return results_obj
+
+
+async def _in_executor(func, *args, **kwargs):
+    """Run a blocking call in the default executor, keeping contextvars."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
+
+
+async def _in_thread(executor, func, *args):
+    """Run a blocking call in `executor` (None for the default one), keeping contextvars."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args))
+
+
+async def _call_maybe_async(func, *args, executor=None):
+    """Await async callables / acall methods, run plain callables in the executor."""
+    if inspect.isasyncgenfunction(func):
+        return func(*args)
+    if asyncio.iscoroutinefunction(func):
+        return await func(*args)
+    acall = getattr(func, "acall", None)
+    if asyncio.iscoroutinefunction(acall):
+        return await acall(*args)
+    return await _in_thread(executor, func, *args)
+
+
+# ------------------------------------------------------------------------
+# Streaming responses
+# ------------------------------------------------------------------------
+def _chunk_text(chunk) -> str:
+    """Text of one streamed chunk: a string or an OpenAI ChatCompletionChunk."""
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, bytes):
+        return chunk.decode("utf-8", errors="replace")
+    choices = getattr(chunk, "choices", None)
+    if choices:
+        delta = getattr(choices[0], "delta", None)
+        return getattr(delta, "content", None) or ""
+    return str(chunk) if chunk is not None else ""
+
+
+def _stream_metrics(start_time: float, first_token_time: Optional[float], chunks: int) -> dict:
+    """Timing of a consumed stream; each non-empty chunk counts as one token."""
+    end_time = time.time()
+    metrics = {"stream_chunks": chunks, "time_to_first_token_seconds": None, "tokens_per_second": None}
+    if first_token_time is not None:
+        metrics["time_to_first_token_seconds"] = round(first_token_time - start_time, 4)
+        generation_time = end_time - first_token_time
+        if generation_time > 0:
+            metrics["tokens_per_second"] = round(chunks / generation_time, 2)
+    return metrics
+
+
+def _run_coroutine(coro):
+    """
+    asyncio.run(coro), or asyncio.run on a helper thread when this thread is
+    already running an event loop (a sync agent called from Jupyter or from a
+    loop's worker).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="crm-bench-stream") as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _collect_stream(response, start_time: float):
+    """Join a streamed response; returns (text, stream_metrics or None)."""
+    if isinstance(response, AsyncIterator):
+        return _run_coroutine(_collect_stream_async(response, start_time))
+    if not isinstance(response, Iterator):
+        return response, None
+
+    parts = []
+    first_token_time = None
+    for chunk in response:
+        text = _chunk_text(chunk)
+        if text:
+            if first_token_time is None:
+                first_token_time = time.time()
+            parts.append(text)
+    return "".join(parts), _stream_metrics(start_time, first_token_time, len(parts))
+
+
+async def _collect_stream_async(response, start_time: float, executor=None):
+    """_collect_stream for the async path; sync iterators are drained in the executor."""
+    if isinstance(response, Iterator):
+        return await _in_thread(executor, _collect_stream, response, start_time)
+    if not isinstance(response, AsyncIterator):
+        return response, None
+
+    parts = []
+    first_token_time = None
+    async for chunk in response:
+        text = _chunk_text(chunk)
+        if text:
+            if first_token_time is None:
+                first_token_time = time.time()
+            parts.append(text)
+    return "".join(parts), _stream_metrics(start_time, first_token_time, len(parts))
+
+
+class _BenchmarkRun:
+    """
+    Bookkeeping shared by run_benchmark and run_benchmark_async: stores graded
+    records (as dicts, compact records or spill rows), keeps the running
+    aggregate and assembles the result dict.
+    """
+
+    def __init__(
+        self, questions, df, csv_data_path, compact_results, result_spill,
+        isolate_data=True, trace_agent_llm_calls=False, cost_meter=None, fast_path_grading=False,
+        grading_cache=None, batch_grading=False, grader=None, grader_context=False,
+        hedge_grading=False, weights=None
+    ):
+        self.questions = questions
+        self.weights = weights
+        self.df = df
+        self.isolate_data = isolate_data
+        self.trace_agent_llm_calls = trace_agent_llm_calls
+        self.llm_summaries = []
+        self.cost_meter = cost_meter if cost_meter is not None else CostMeter()
+        self.usage_summaries = []
+        self.fast_path_grading = fast_path_grading
+        self.grading_cache = grading_cache
+        self.batch_grading = batch_grading
+        self.grader = get_grader(grader)
+        self.grader_context = None
+        if grader_context:
+            budget = GRADER_CONTEXT_TOKEN_BUDGET if grader_context is True else int(grader_context)
+            self.grader_context = GraderContextBuilder(df, token_budget=budget)
+        # A hedger created here is closed by finish(); a shared one belongs to the caller
+        self.owns_hedger = hedge_grading is True
+        self.hedger = GradingHedger() if hedge_grading is True else hedge_grading or None
+        self.hedge_stats = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+        self.deferred = []
+        self.batch_grading_usage = None
+        self.grading_failed = 0
+        # With a cache the hit rate is reported even when nothing was cached yet
+        self.grader_tiers = {"cache": 0} if grading_cache is not None else {}
+        # A cascade's escalations are counted apart from its tiers
+        self.escalation_tier = getattr(self.grader, "escalation_tier", None)
+        if self.escalation_tier is not None:
+            self.grader_tiers["escalated"] = 0
+        # Kept alive for the whole run: prepared state may reference it
+        self.prepared_frame = None
+        self.csv_data_path = csv_data_path
+        self.compact_results = compact_results
+        self.result_spill = result_spill
+
+        self.question_results = []
+        self.aggregate = ScoreAggregate(weights)
+        self.setup_time = 0.0
+        self.batch_time = None
+        self.batch_answers = None
+        self.batch_metrics = None
+        self.batch_llm_trace = None
+        self.batch_usage = None
+
+        # Lets agents that forward the dataset by reference (e.g. HttpAgent) find it
+        df.attrs.setdefault("csv_data_path", csv_data_path)
+
+    def question_texts(self) -> List[str]:
+        return [q["question_text"] for q in self.questions]
+
+    def hedge_scope(self):
+        """Context manager hedging the grader calls made in it, when hedge_grading is on."""
+        return self.hedger.scope(self.hedge_stats) if self.hedger is not None else nullcontext()
+
+    def grader_available(self) -> bool:
+        """Wait while the OpenAI grader's circuit is open; offline graders never wait."""
+        return not self.grader.uses_openai or grader_breaker.wait_until_healthy()
+
+    async def grader_available_async(self) -> bool:
+        return not self.grader.uses_openai or await grader_breaker.wait_until_healthy_async()
+
+    def trace_scope(self):
+        """Context manager yielding the list of traced LLM calls, or None when not tracing."""
+        return trace_llm_calls() if self.trace_agent_llm_calls else nullcontext()
+
+    def llm_trace(self, llm_calls, elapsed: float) -> Optional[dict]:
+        """Per-question "llm_trace" entry: the calls plus their totals."""
+        if llm_calls is None:
+            return None
+        summary = summarize_llm_calls(llm_calls, elapsed)
+        self.llm_summaries.append(summary)
+        return dict(summary, calls=llm_calls)
+
+    def agent_frame(self) -> pd.DataFrame:
+        """The DataFrame to hand to the agent: a fresh copy-on-write view when isolating."""
+        return question_frame(self.df) if self.isolate_data else self.df
+
+    def prepare_agent(self, agent_callable):
+        """Run prepare() for prepared agents and return a question -> answer function."""
+        if is_prepared_agent(agent_callable):
+            self.prepared_frame = self.agent_frame()
+            setup_start = time.time()
+            prepared_state = agent_callable.prepare(self.prepared_frame)
+            self.setup_time = time.time() - setup_start
+            logger.debug("Agent prepare() took %.3fs", self.setup_time)
+
+            def ask(text):
+                return agent_callable.answer(text, prepared_state)
+        else:
+            def ask(text):
+                return agent_callable(text, self.agent_frame())
+        return ask
+
+    def set_batch_answers(self, answers, elapsed: float, metrics: dict, llm_calls=None, usage=None) -> None:
+        """Align a batch agent's answers with the questions (list or dict by question_id)."""
+        questions = self.questions
+        if isinstance(answers, dict):
+            answers = [answers.get(q["question_id"], "") for q in questions]
+        else:
+            answers = list(answers)
+            if len(answers) != len(questions):
+                logger.warning(
+                    "Batch agent returned %d answers for %d questions", len(answers), len(questions)
+                )
+                answers = (answers + [""] * len(questions))[:len(questions)]
+
+        self.batch_answers = answers
+        self.batch_time = elapsed
+        self.batch_metrics = metrics
+        self.batch_llm_trace = self.llm_trace(llm_calls, elapsed)
+        self.batch_usage = self.price_usage(usage)
+
+    def price_usage(self, usage) -> Optional[dict]:
+        """Price a UsageLedger, add it to the run totals and the live meter."""
+        if not usage:
+            return None
+        summary = usage.summary(self.cost_meter.prices)
+        self.usage_summaries.append(summary)
+        self.cost_meter.add(summary["cost_usd"])
+        return summary
+
+    def defer(self, question, agent_response, elapsed: float, usage=None, **extras) -> None:
+        """Keep an answer for grade_deferred() (batch_grading=True)."""
+        self.deferred.append((question, agent_response, elapsed, usage, extras))
+
+    def grade_deferred(self) -> None:
+        """
+        Grade the deferred answers: fast path and cache first, then the rest
+        with batched grader requests. Grader usage is metered per run in
+        "batch_grading_usage" since one request covers many questions.
+        """
+        if not self.deferred:
+            return
+        deferred, self.deferred = self.deferred, []
+
+        verdicts = [None] * len(deferred)
+        to_grade = []
+        for index, (question, agent_response, _, _, _) in enumerate(deferred):
+            if self.fast_path_grading:
+                verdict = pre_grade(agent_response, question["correct_answer"], question.get("question_text", ""))
+                if verdict is not None:
+                    verdicts[index] = (verdict[0], verdict[1], "fast_path")
+                    continue
+            if self.grading_cache is not None and self.grader.cacheable:
+                verdict = self.grading_cache.lookup(question, agent_response, self.grader.batch_version)
+                if verdict is not None:
+                    verdicts[index] = (verdict[0], verdict[1], "cache")
+                    continue
+            to_grade.append(index)
+
+        if to_grade:
+            items = [(deferred[index][1], deferred[index][0]["correct_answer"]) for index in to_grade]
+            if self.grader_context is not None:
+                items = [(self.grader_context.truncate(response), answer) for response, answer in items]
+            with usage_scope() as usage, self.hedge_scope():
+                graded = self.grader.grade_batch_tiered(items, self._grade_batch)
+            self.batch_grading_usage = self.price_usage(usage)
+            for index, (score, debug_info, tier) in zip(to_grade, graded):
+                verdicts[index] = (score, debug_info, tier)
+                if self.grading_cache is not None and self.grader.cacheable:
+                    question, agent_response = deferred[index][:2]
+                    self.grading_cache.store(question, agent_response, score, debug_info, self.grader.batch_version)
+
+        for (question, agent_response, elapsed, usage, extras), (score, debug_info, tier) in zip(deferred, verdicts):
+            record = make_record(question, agent_response, elapsed, score, debug_info, tier, **extras)
+            self.add(record, elapsed, usage)
+
+    def _grade_batch(self, grader: GraderBackend, items):
+        # A shared GradingBatcher pools requests for the default LLM judge
+        if isinstance(self.batch_grading, GradingBatcher) and isinstance(grader, OpenAIGrader) and grader.model is None:
+            return self.batch_grading.grade(items)
+        return grader.grade_batch(items)
+
+    def add(self, record: QuestionRecord, elapsed: float, usage=None) -> None:
+        usage_summary = self.price_usage(usage)
+        if usage_summary is not None:
+            if record.extra is None:
+                record.extra = {}
+            record.extra["usage"] = usage_summary
+
+        failed = record.get("status") == "grading_failed"
+        if failed:
+            self.grading_failed += 1
+
+        tier = record.get("grader_tier")
+        if tier:
+            self.grader_tiers[tier] = self.grader_tiers.get(tier, 0) + 1
+            if tier == self.escalation_tier:
+                self.grader_tiers["escalated"] += 1
+
+        stream_metrics = record.get("stream_metrics") or {}
+        self.aggregate.add(
+            record.category, record.score, elapsed, ttft=stream_metrics.get("time_to_first_token_seconds"),
+            scored=not failed, question_id=record.question_id
+        )
+
+        if self.result_spill is not None:
+            self.result_spill.write(record, csv_data_path=self.csv_data_path)
+        elif self.compact_results:
+            self.question_results.append(record)
+        else:
+            self.question_results.append(record.to_dict())
+
+    def finish(self) -> dict:
+        results_obj = build_results(self.question_results, self.aggregate.total_time, self.weights)
+        results_obj["csv_data_path"] = self.csv_data_path
+        # Scores are comparable between runs only for the same question set
+        results_obj["question_set_hash"] = question_set_hash(self.questions)
+        results_obj["setup_time_seconds"] = round(self.setup_time, 3)
+        if self.batch_time is not None:
+            results_obj["batch_time_seconds"] = round(self.batch_time, 3)
+            if self.batch_metrics:
+                results_obj["batch_agent_metrics"] = self.batch_metrics
+            if self.batch_llm_trace:
+                results_obj["batch_llm_trace"] = self.batch_llm_trace
+            if self.batch_usage:
+                results_obj["batch_usage"] = self.batch_usage
+        if self.grader_tiers:
+            results_obj["grading"] = grading_summary(self.grader_tiers)
+        if self.grading_failed:
+            # Excluded from overall_weighted_score_percent
+            results_obj["grading_failed"] = self.grading_failed
+        if self.batch_grading_usage:
+            results_obj["batch_grading_usage"] = self.batch_grading_usage
+        if self.grader_context is not None:
+            results_obj["grader_context"] = self.grader_context.stats()
+        if self.hedger is not None:
+            results_obj["hedging"] = hedging_summary(self.hedge_stats)
+            if self.owns_hedger:
+                self.hedger.close()
+        if self.usage_summaries:
+            results_obj["usage_summary"] = merge_usage_summaries(self.usage_summaries)
+            results_obj["cost_usd"] = results_obj["usage_summary"]["cost_usd"]
+        if self.llm_summaries:
+            results_obj["llm_trace_summary"] = merge_llm_summaries(self.llm_summaries)
+        if self.aggregate.ttft_samples:
+            results_obj["ttft_percentiles"] = percentiles(self.aggregate.ttft_samples)
+            results_obj["ttft_samples"] = self.aggregate.ttft_samples
+        if self.result_spill is not None:
+            results_obj["overall_weighted_score_percent"] = self.aggregate.weighted_score_percent()
+            results_obj["questions_processed"] = self.aggregate.questions
+            results_obj["spill_path"] = self.result_spill.path
+        if self.grading_failed and self.grading_failed == self.aggregate.questions:
+            # Nothing was graded: there is no score rather than a score of 0
+            results_obj["overall_weighted_score_percent"] = None
+        return results_obj
+
+
+def grade_question(
+    question: dict,
+    agent_response: str,
+    elapsed: float,
+    grading_cache: Optional[GradingCache] = None,
+    grader: Union[None, str, GraderBackend] = None
+) -> dict:
+    """
+    Grade one agent response against its question entry and return the
+    per-question result dict used in "question_details".
+    """
+    return grade_record(
+        question, agent_response, elapsed, grading_cache=grading_cache, grader=get_grader(grader)
+    ).to_dict()
+
+
+def _grader_input(question: dict, agent_response: str, grader_context, context) -> tuple:
+    """Arguments of GraderBackend.grade: the compacted context and response when there is one."""
+    question_text = question.get("question_text", "")
+    if context is None:
+        return agent_response, question["correct_answer"], question_text, ""
+    grader_context.record(context)
+    return context.agent_response, question["correct_answer"], question_text, context.csv_data
+
+
+def _grader_version(grader: GraderBackend, context) -> str:
+    # Verdicts given with different CSV context are cached separately
+    return grader.version if context is None else f"{grader.version}:ctx-{context.fingerprint}"
+
+
+def grade_verdict(
+    question: dict,
+    agent_response: str,
+    fast_path: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    grader: Optional[GraderBackend] = None,
+    grader_context: Optional[GraderContextBuilder] = None
+):
+    """
+    Score one response: fast path, then cache, then the grader backend
+    (the LLM judge by default). Returns (score, debug_info, tier).
+    """
+    if fast_path:
+        verdict = pre_grade(agent_response, question["correct_answer"], question.get("question_text", ""))
+        if verdict is not None:
+            return verdict[0], verdict[1], "fast_path"
+
+    grader = get_grader(grader)
+    context = grader_context.build(question.get("question_text", ""), agent_response, question["correct_answer"]) \
+        if grader_context is not None else None
+
+    # Evaluate response
+    if grading_cache is None or not grader.cacheable:
+        return grader.grade_tiered(*_grader_input(question, agent_response, grader_context, context))
+
+    tier = grader.name
+
+    def grade_with_backend():
+        nonlocal tier
+        score, debug_info, tier = grader.grade_tiered(*_grader_input(question, agent_response, grader_context, context))
+        return score, debug_info
+
+    score, debug_info, cached = grading_cache.grade(
+        question, agent_response, grade_with_backend, grader_version=_grader_version(grader, context)
+    )
+    return score, debug_info, "cache" if cached else tier
+
+
+async def grade_verdict_async(
+    question: dict,
+    agent_response: str,
+    fast_path: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    grader: Optional[GraderBackend] = None,
+    grader_context: Optional[GraderContextBuilder] = None
+):
+    """grade_verdict on the event loop, using the backend's grade_async (the async evaluator by default)."""
+    if fast_path:
+        verdict = pre_grade(agent_response, question["correct_answer"], question.get("question_text", ""))
+        if verdict is not None:
+            return verdict[0], verdict[1], "fast_path"
+
+    grader = get_grader(grader)
+    context = None
+    if grader_context is not None:
+        # Scans the DataFrame: keep it off the event loop
+        context = await _in_executor(
+            grader_context.build, question.get("question_text", ""), agent_response, question["correct_answer"]
+        )
+
+    if grading_cache is None or not grader.cacheable:
+        return await grader.grade_tiered_async(*_grader_input(question, agent_response, grader_context, context))
+
+    tier = grader.name
+
+    async def grade_with_backend():
+        nonlocal tier
+        score, debug_info, tier = await grader.grade_tiered_async(
+            *_grader_input(question, agent_response, grader_context, context)
+        )
+        return score, debug_info
+
+    score, debug_info, cached = await grading_cache.grade_async(
+        question, agent_response, grade_with_backend, grader_version=_grader_version(grader, context)
+    )
+    return score, debug_info, "cache" if cached else tier
+
+
+def grade_record(
+    question: dict,
+    agent_response: str,
+    elapsed: float,
+    agent_metrics: Optional[dict] = None,
+    stream_metrics: Optional[dict] = None,
+    llm_trace: Optional[dict] = None,
+    fast_path: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    grader: Optional[GraderBackend] = None,
+    grader_context: Optional[GraderContextBuilder] = None
+) -> QuestionRecord:
+    """Grade one agent response and return it as a compact QuestionRecord."""
+    logger.debug("Agent response: %r", agent_response)
+    score, debug_info, tier = grade_verdict(question, agent_response, fast_path, grading_cache, grader, grader_context)
+    return make_record(question, agent_response, elapsed, score, debug_info, tier, agent_metrics, stream_metrics, llm_trace)
+
+
+async def grade_record_async(
+    question: dict,
+    agent_response: str,
+    elapsed: float,
+    agent_metrics: Optional[dict] = None,
+    stream_metrics: Optional[dict] = None,
+    llm_trace: Optional[dict] = None,
+    fast_path: bool = False,
+    grading_cache: Optional[GradingCache] = None,
+    grader: Optional[GraderBackend] = None,
+    grader_context: Optional[GraderContextBuilder] = None
+) -> QuestionRecord:
+    """Asynchronous grade_record."""
+    logger.debug("Agent response: %r", agent_response)
+    score, debug_info, tier = await grade_verdict_async(
+        question, agent_response, fast_path, grading_cache, grader, grader_context
+    )
+    return make_record(question, agent_response, elapsed, score, debug_info, tier, agent_metrics, stream_metrics, llm_trace)
+
+
+def ungraded_record(question: dict, reason: str, agent_response: str = "", elapsed: float = 0.0) -> QuestionRecord:
+    """Record of a question skipped (or an answer left ungraded) because the grader is down."""
+    return make_record(question, agent_response, elapsed, 0.0, f"{GRADING_FAILED_PREFIX}: {reason}", "failed")
+
+
+def make_record(
+    question: dict,
+    agent_response: str,
+    elapsed: float,
+    score: float,
+    debug_info: str,
+    tier: str,
+    agent_metrics: Optional[dict] = None,
+    stream_metrics: Optional[dict] = None,
+    llm_trace: Optional[dict] = None
+) -> QuestionRecord:
+    """Build the QuestionRecord of a graded response."""
+    logger.debug("Score=%.2f, Debug=%s", score, debug_info)
+
+    extra = {"grader_tier": tier}
+    if tier != "fast_path" and grading_failed(debug_info):
+        # Not a grade: reported, but left out of the score
+        extra = {"grader_tier": "failed", "status": "grading_failed"}
+    if agent_metrics:
+        extra["agent_metrics"] = dict(agent_metrics)
+    if stream_metrics:
+        extra["stream_metrics"] = stream_metrics
+    if llm_trace:
+        extra["llm_trace"] = llm_trace
+
+    return QuestionRecord(
+        meta=intern_question(question),
+        agent_response=agent_response,
+        score=score,
+        evaluation_debug=debug_info,
+        time_taken_seconds=round(elapsed, 3),
+        extra=extra
+    )
+
+
+def grading_summary(tiers: dict) -> dict:
+    """
+    Question counts per grader tier plus the shares settled by the fast path
+    and the cache and, for a cascade, the share of grader verdicts escalated
+    to its second tier.
+    """
+    summary = dict(tiers)
+    graded = sum(count for tier, count in tiers.items() if tier != "escalated")
+    summary["fast_path_rate"] = round(tiers.get("fast_path", 0) / graded, 4) if graded else 0.0
+    if "cache" in tiers:
+        # Share of would-be grader calls answered from the cache
+        lookups = graded - tiers.get("fast_path", 0)
+        summary["cache_hit_rate"] = round(tiers["cache"] / lookups, 4) if lookups else 0.0
+    if "escalated" in tiers:
+        cascaded = graded - tiers.get("fast_path", 0) - tiers.get("cache", 0)
+        summary["escalation_rate"] = round(tiers["escalated"] / cascaded, 4) if cascaded else 0.0
+    return summary
+
+
+def merge_grading_summaries(summaries: List[dict]) -> dict:
+    """Add up grading_summary() results (e.g. over CSVs)."""
+    tiers = {}
+    for summary in summaries:
+        for tier, count in summary.items():
+            if not tier.endswith("_rate"):
+                tiers[tier] = tiers.get(tier, 0) + count
+    return grading_summary(tiers)
+
+
+def _set_weights(questions_json_path: str, questions: Optional[List[dict]]) -> Optional[dict]:
+    """
+    Precomputed weights of the question set file, unless the caller passed
+    its own questions instead of that (shared, unmodified) set.
+    """
+    question_set = load_question_set(questions_json_path)
+    if questions is None or questions is question_set.questions:
+        return question_set.weights
+    return None
+
+
+def build_results(question_results: list, total_time: float, weights: Optional[dict] = None) -> dict:
+    """
+    Assemble the run_benchmark result dict from graded question results;
+    `weights` are the question set's precomputed weights, if known.
+    """
+    # Weighted final
+    final_percentage = compute_weighted_score(question_results, weights)
+
+    return {
+        "overall_weighted_score_percent": final_percentage,
+        "total_time_seconds": round(total_time, 3),
+        "question_details": question_results
+    }
@@ -0,0 +1,110 @@
+# cli.py
+
+"""
+Command line entry point, installed as `crm-bench`.
+
+    crm-bench serve                       # start the warm benchmark daemon
+    crm-bench status                      # check that the daemon is up
+    crm-bench register NAME URL           # register an HTTP agent endpoint
+    crm-bench run --agent NAME_OR_URL     # daemon calls the HTTP agent
+    crm-bench run --callable mod:func     # agent runs in this process
+    crm-bench stop                        # shut the daemon down
+"""
+
+import sys
+import json
+import argparse
+import importlib
+import logging
+
+from .daemon import BenchmarkDaemon, DaemonClient, DaemonError, DEFAULT_SOCKET_PATH
+
+
+def _load_callable(spec: str):
+    """Resolve a 'package.module:function' string to the callable it names."""
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Expected 'module:function', got {spec!r}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _print_summary(results):
+    print(f"Overall average: {results.get('overall_average', 0):.2f}%")
+    for dataset, score in results.get("dataset_averages", {}).items():
+        print(f"  {dataset}: {score:.2f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crm-bench", description="CRM Benchmark tools")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path of the daemon")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve = subparsers.add_parser("serve", help="Start the benchmark daemon")
+    serve.add_argument("--questions-dir", default=None, help="Directory with dataset_X_questions.json files")
+    serve.add_argument("--csv-dir", default=None, help="Directory with D[1-5]_*.csv files")
+    serve.add_argument("--max-workers", type=int, default=8, help="Grading / HTTP agent threads")
+    serve.add_argument("--grading-cache", default=None, help="SQLite file to cache grader verdicts in")
+
+    subparsers.add_parser("status", help="Show daemon status")
+    subparsers.add_parser("reload", help="Reload datasets and question sets")
+    subparsers.add_parser("stop", help="Stop the daemon")
+
+    register = subparsers.add_parser("register", help="Register an HTTP agent endpoint")
+    register.add_argument("name")
+    register.add_argument("url")
+
+    run = subparsers.add_parser("run", help="Run the benchmark through the daemon")
+    target = run.add_mutually_exclusive_group(required=True)
+    target.add_argument("--agent", help="Registered agent name or endpoint URL")
+    target.add_argument("--callable", help="In-process agent as 'module:function'")
+    run.add_argument("--datasets", nargs="*", default=None, help="Restrict to datasets, e.g. D1 D3")
+    run.add_argument("--json", action="store_true", help="Print the full result JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO)
+        try:
+            BenchmarkDaemon(
+                socket_path=args.socket,
+                questions_dir=args.questions_dir,
+                csv_dir=args.csv_dir,
+                max_workers=args.max_workers,
+                grading_cache_path=args.grading_cache
+            ).serve_forever()
+        except (OSError, RuntimeError) as e:
+            print(f"crm-bench: {str(e)}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    client = DaemonClient(socket_path=args.socket)
+    try:
+        if args.command == "status":
+            print(json.dumps(client.ping(), indent=2))
+        elif args.command == "reload":
+            print(json.dumps(client.reload(), indent=2))
+        elif args.command == "stop":
+            client.shutdown()
+        elif args.command == "register":
+            client.register_agent(args.name, args.url)
+        elif args.command == "run":
+            if args.callable:
+                results = client.run(_load_callable(args.callable), datasets=args.datasets)
+            else:
+                results = client.run_registered(args.agent, datasets=args.datasets)
+            if args.json:
+                print(json.dumps(results, indent=2, default=str))
+            else:
+                _print_summary(results)
+    except (OSError, DaemonError) as e:
+        print(f"crm-bench: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
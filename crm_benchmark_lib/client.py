@@ -9,6 +9,7 @@ import os
 import time
 import json
 import asyncio
+import functools
 import aiohttp
 import requests
 import logging
@@ -17,9 +18,20 @@ from typing import Callable, Dict, List, Any, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import matplotlib.pyplot as plt
-from .benchmark import run_benchmark
-from .evaluator import load_questions, evaluate_response_with_variants
+from .benchmark import run_benchmark, run_benchmark_async, merge_grading_summaries
+from .grader_context import merge_context_stats
+from .hedging import GradingHedger, merge_hedging_summaries
+from .evaluator import (
+    load_questions, evaluate_response_with_variants, GradingBatcher, hold_async_grader_client,
+    close_async_grader_client
+)
 from .config import CATEGORY_SECTION_WEIGHTS
+from .records import ResultSpill, percentiles
+from .run_store import RunStore
+from .agents import AgentPool
+from .tracing import merge_llm_summaries
+from .metering import CostMeter, merge_usage_summaries
+from .question_registry import QuestionRegistry, get_question_registry
 import glob
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -32,6 +44,62 @@ logger.setLevel(logging.ERROR)
 DEFAULT_SERVER_URL = "http://localhost:5000"
 
 
+def _attach_cost_meter(benchmark_kwargs: Dict[str, Any], progress_bar) -> CostMeter:
+    """Share one CostMeter across a batch and show its running total in the progress bar."""
+    meter = benchmark_kwargs.get("cost_meter")
+    if meter is None:
+        meter = benchmark_kwargs["cost_meter"] = CostMeter()
+    if progress_bar is not None:
+        previous = meter.on_update
+
+        def on_update(total):
+            progress_bar.set_postfix_str(f"cost ${total:.4f}")
+            if previous is not None:
+                previous(total)
+        meter.on_update = on_update
+    return meter
+
+
+def _share_grading_state(benchmark_kwargs: Dict[str, Any]) -> Optional[GradingHedger]:
+    """
+    Let the CSV runs of a batch pool their batch_grading requests and hedging
+    latencies. Returns the hedger created here, for the caller to close.
+    """
+    if benchmark_kwargs.get("batch_grading") is True:
+        benchmark_kwargs["batch_grading"] = GradingBatcher()
+    if benchmark_kwargs.get("hedge_grading") is True:
+        benchmark_kwargs["hedge_grading"] = GradingHedger()
+        return benchmark_kwargs["hedge_grading"]
+    return None
+
+
+def _group_csv_files(csv_files: List[str]) -> Dict[str, List[str]]:
+    """CSV paths by dataset prefix ("D1_xxx.csv" -> "D1")."""
+    dataset_csvs = {}
+    for csv_file in csv_files:
+        filename = os.path.basename(csv_file)
+        if filename.startswith('D'):
+            dataset_csvs.setdefault(filename[:2], []).append(csv_file)
+    return dataset_csvs
+
+
+def _plan_benchmarks(registry: QuestionRegistry, dataset_csvs: Dict[str, List[str]]):
+    """Parallel lists of question JSON and CSV paths, plus CSV path -> dataset."""
+    questions_json_paths = []
+    csv_data_paths = []
+    dataset_mapping = {}
+    for dataset, json_path in registry.paths().items():
+        if dataset not in dataset_csvs:
+            logger.warning(f"No CSV files found for {dataset}")
+            continue
+        logger.info(f"Found question set for {dataset}: {json_path}")
+        for csv_file in dataset_csvs[dataset]:
+            questions_json_paths.append(json_path)
+            csv_data_paths.append(csv_file)
+            dataset_mapping[csv_file] = dataset
+    return questions_json_paths, csv_data_paths, dataset_mapping
+
+
 class BenchmarkClient:
     """
     A client for the CRM Benchmark system that provides:
@@ -142,9 +210,14 @@ class BenchmarkClient:
         self,
         agent_callable: Callable[[str, pd.DataFrame], str],
         questions_json_path: str,
-        csv_data_path: str
+        csv_data_path: str,
+        **benchmark_kwargs
     ) -> Dict[str, Any]:
-        """Run a single benchmark with proper evaluation and retry logic."""
+        """
+        Run a single benchmark with proper evaluation and retry logic.
+
+        Extra keyword arguments are passed through to benchmark.run_benchmark.
+        """
         try:
             logger.info(f"Starting benchmark with {questions_json_path} and {csv_data_path}")
             
@@ -152,7 +225,8 @@ class BenchmarkClient:
             results = run_benchmark(
                 agent_callable=agent_callable,
                 questions_json_path=questions_json_path,
-                csv_data_path=csv_data_path
+                csv_data_path=csv_data_path,
+                **benchmark_kwargs
             )
             
             # Ensure the result has the structure expected by the rest of the client code
@@ -223,27 +297,61 @@ class BenchmarkClient:
                 }
             }
     
+    def _run_with_pool(
+        self,
+        agent_pool: AgentPool,
+        questions_json_path: str,
+        csv_data_path: str,
+        **benchmark_kwargs
+    ) -> Dict[str, Any]:
+        """Run one benchmark with this worker thread's agent from agent_pool."""
+        agent = agent_pool.get()
+        result = self.run_benchmark(
+            agent_callable=agent,
+            questions_json_path=questions_json_path,
+            csv_data_path=csv_data_path,
+            **benchmark_kwargs
+        )
+        if isinstance(result, dict):
+            result["agent_build_seconds"] = round(agent_pool.pop_build_seconds(), 3)
+        return result
+    
     def run_batch(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         questions_json_paths: List[str],
         csv_data_paths: List[str],
-        parallel: bool = True
+        parallel: bool = True,
+        agent_factory: Optional[Callable[[], Any]] = None,
+        **benchmark_kwargs
     ) -> List[Dict[str, Any]]:
         """
         Run multiple benchmarks in batch, with optional parallel processing.
         
         Args:
             agent_callable: Function that takes a question and data frame and returns a response
+                (or a PreparedAgent); may be None when agent_factory or an
+                agent_batch_callable keyword argument is given
             questions_json_paths: List of paths to question JSON files
             csv_data_paths: List of paths to CSV files
             parallel: Whether to run benchmarks in parallel
+            agent_factory: Zero-argument callable that builds an agent; each worker
+                thread calls it once and reuses its own agent instead of sharing one
+            **benchmark_kwargs: Passed through to benchmark.run_benchmark
             
         Returns:
             List of dictionaries with benchmark results
         """
         if len(questions_json_paths) != len(csv_data_paths):
             raise ValueError("questions_json_paths and csv_data_paths must have the same length")
+        if agent_callable is None and agent_factory is None and benchmark_kwargs.get("agent_batch_callable") is None:
+            raise ValueError("One of agent_callable, agent_factory or agent_batch_callable must be provided")
+        
+        if agent_factory is not None:
+            agent_pool = AgentPool(agent_factory)
+            run_one = functools.partial(self._run_with_pool, agent_pool)
+        else:
+            run_one = functools.partial(self.run_benchmark, agent_callable)
         
         total_benchmarks = len(questions_json_paths)
         results = []
@@ -252,15 +360,17 @@ class BenchmarkClient:
         progress_bar = None
         if self.show_progress:
             progress_bar = tqdm(total=total_benchmarks, desc="Running benchmarks")
+        _attach_cost_meter(benchmark_kwargs, progress_bar)
+        hedger = _share_grading_state(benchmark_kwargs)
         
         if not parallel or total_benchmarks == 1:
             # Sequential execution
             for i in range(total_benchmarks):
                 try:
-                    result = self.run_benchmark(
-                        agent_callable=agent_callable,
+                    result = run_one(
                         questions_json_path=questions_json_paths[i],
-                        csv_data_path=csv_data_paths[i]
+                        csv_data_path=csv_data_paths[i],
+                        **benchmark_kwargs
                     )
                     results.append(result)
                 except Exception as e:
@@ -274,10 +384,10 @@ class BenchmarkClient:
                 # Submit all tasks
                 future_to_idx = {
                     executor.submit(
-                        self.run_benchmark,
-                        agent_callable=agent_callable,
+                        run_one,
                         questions_json_path=questions_json_paths[i],
-                        csv_data_path=csv_data_paths[i]
+                        csv_data_path=csv_data_paths[i],
+                        **benchmark_kwargs
                     ): i for i in range(total_benchmarks)
                 }
                 
@@ -299,6 +409,8 @@ class BenchmarkClient:
         
         if progress_bar:
             progress_bar.close()
+        if hedger is not None:
+            hedger.close()
             
         return results
     
@@ -361,38 +473,10 @@ class BenchmarkClient:
             }
     
     def locate_question_jsons(self, base_dir=None):
-        """Locate all question JSON files."""
-        if base_dir is None:
-            # Try multiple possible locations
-            possible_dirs = [
-                "dataset_questions",
-                "crm_benchmark_lib/dataset_questions",
-                os.path.join(os.path.dirname(__file__), "dataset_questions")
-            ]
-            
-            for dir_path in possible_dirs:
-                if os.path.exists(dir_path):
-                    base_dir = dir_path
-                    break
-            
-        if base_dir is None:
-                raise FileNotFoundError("Cannot find dataset_questions directory")
-        
-        logger.info(f"Looking for question JSONs in: {base_dir}")
-        
-        # Find all JSON files that match the pattern dataset_X_questions.json
-        json_files = []
-        for i in range(1, 6):
-            json_path = os.path.join(base_dir, f"dataset_{i}_questions.json")
-            if os.path.exists(json_path):
-                json_files.append(json_path)
-            else:
-                logger.warning(f"Could not find {json_path}")
-        
-        if not json_files:
-            raise FileNotFoundError("No question JSON files found")
-        
-        return json_files
+        """Locate all question JSON files (see question_registry.find_questions_dir)."""
+        registry = get_question_registry(base_dir)
+        logger.info(f"Looking for question JSONs in: {registry.questions_dir}")
+        return list(registry.paths().values())
 
     def locate_csv_files(self, csv_dir=None):
         """Locate all CSV files for benchmarking."""
@@ -443,12 +527,28 @@ class BenchmarkClient:
     
     def run_full_benchmark(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         parallel: bool = True,
         base_dir: Optional[str] = None,
-        csv_dir: Optional[str] = None
+        csv_dir: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        agent_factory: Optional[Callable[[], Any]] = None,
+        **benchmark_kwargs
     ) -> Dict[str, Any]:
-        """Run the full benchmark suite."""
+        """
+        Run the full benchmark suite.
+
+        agent_callable may be a plain function or a PreparedAgent; alternatively
+        pass agent_factory to build one agent per worker thread, or
+        agent_batch_callable=f with f(questions, df) -> answers to ask all
+        questions of a CSV in one call.
+
+        If spill_path is given (".jsonl" or ".parquet"), per-question results are
+        streamed to that file and only aggregates are kept in memory; the summary
+        is the same either way. Other keyword arguments are passed through to
+        benchmark.run_benchmark.
+        """
+        spill = None
         try:
             logger.info("\nStarting full benchmark suite")
             
@@ -456,37 +556,11 @@ class BenchmarkClient:
             all_csv_files = self.locate_csv_files(csv_dir)
             logger.info(f"Found {len(all_csv_files)} CSV files")
             
-            # Organize CSV files by dataset prefix
-            dataset_csvs = {}
-            for csv_file in all_csv_files:
-                filename = os.path.basename(csv_file)
-                if filename.startswith('D'):
-                    prefix = filename[:2]  # Get D1, D2, etc.
-                    if prefix not in dataset_csvs:
-                        dataset_csvs[prefix] = []
-                    dataset_csvs[prefix].append(csv_file)
-            
+            dataset_csvs = _group_csv_files(all_csv_files)
             logger.info(f"Dataset distribution: {', '.join(f'{k}: {len(v)}' for k, v in dataset_csvs.items())}")
             
-            # Find question files
-            if base_dir is None:
-                base_dir = os.path.join(os.path.dirname(__file__), "dataset_questions")
-            
-            # Prepare batch run parameters
-            questions_json_paths = []
-            csv_data_paths = []
-            dataset_mapping = {}
-            
-            for dataset_num in range(1, 6):
-                dataset_prefix = f"D{dataset_num}"
-                json_path = os.path.join(base_dir, f"dataset_{dataset_num}_questions.json")
-                
-                if os.path.exists(json_path) and dataset_prefix in dataset_csvs:
-                    logger.info(f"Found question set for {dataset_prefix}: {json_path}")
-                    for csv_file in dataset_csvs[dataset_prefix]:
-                        questions_json_paths.append(json_path)
-                        csv_data_paths.append(csv_file)
-                        dataset_mapping[csv_file] = dataset_prefix
+            registry = get_question_registry(base_dir)
+            questions_json_paths, csv_data_paths, dataset_mapping = _plan_benchmarks(registry, dataset_csvs)
             
             if not questions_json_paths:
                 logger.error("No valid CSV files or question sets found")
@@ -494,12 +568,18 @@ class BenchmarkClient:
             
             logger.info(f"Running {len(questions_json_paths)} total benchmarks")
             
+            if spill_path:
+                spill = ResultSpill(spill_path)
+                benchmark_kwargs["result_spill"] = spill
+            
             # Run the benchmarks
             results = self.run_batch(
                 agent_callable=agent_callable,
                 questions_json_paths=questions_json_paths,
                 csv_data_paths=csv_data_paths,
-                parallel=parallel
+                parallel=parallel,
+                agent_factory=agent_factory,
+                **benchmark_kwargs
             )
             
             # Process results by dataset
@@ -507,6 +587,16 @@ class BenchmarkClient:
             all_scores = []
             total_processed = 0
             total_failed = 0
+            total_setup_time = 0.0
+            total_build_time = 0.0
+            ttft_samples = []
+            llm_summaries = []
+            usage_summaries = []
+            grading_summaries = []
+            context_stats = []
+            hedging_summaries = []
+            grading_failed = 0
+            cost_by_dataset = {}
             
             for i, result in enumerate(results):
                 if result is None:
@@ -520,10 +610,27 @@ class BenchmarkClient:
                     
                     score = result.get("overall_weighted_score_percent", 0)
                     metadata = result.get("metadata", {})
+                    total_setup_time += result.get("setup_time_seconds", 0.0)
+                    total_build_time += result.get("agent_build_seconds", 0.0)
+                    ttft_samples.extend(result.get("ttft_samples", []))
+                    if result.get("llm_trace_summary"):
+                        llm_summaries.append(result["llm_trace_summary"])
+                    if result.get("grading"):
+                        grading_summaries.append(result["grading"])
+                    if result.get("grader_context"):
+                        context_stats.append(result["grader_context"])
+                    if result.get("hedging"):
+                        hedging_summaries.append(result["hedging"])
+                    grading_failed += result.get("grading_failed", 0)
                     
                     total_processed += metadata.get("questions_processed", 0)
                     total_failed += metadata.get("questions_failed", 0)
                     
+                    if result.get("usage_summary"):
+                        usage_summaries.append(result["usage_summary"])
+                        dataset = dataset_mapping[csv_data_paths[i]]
+                        cost_by_dataset[dataset] = cost_by_dataset.get(dataset, 0.0) + result["cost_usd"]
+                    
                     if score is not None:
                         csv_path = csv_data_paths[i]
                         dataset = dataset_mapping[csv_path]
@@ -552,21 +659,47 @@ class BenchmarkClient:
             overall_average = sum(all_scores) / len(all_scores)
             logger.info(f"Overall average score: {overall_average:.2f}%")
             
-            return {
+            summary = {
                 "overall_average": overall_average,
                 "dataset_averages": dataset_averages,
                 "individual_results": results,
+                "question_set_hashes": registry.set_hashes(),
                 "metadata": {
                     "total_questions_processed": total_processed,
                     "total_questions_failed": total_failed,
                     "total_benchmarks": len(questions_json_paths),
-                    "valid_scores": len(all_scores)
+                    "valid_scores": len(all_scores),
+                    "total_setup_time_seconds": round(total_setup_time, 3),
+                    "total_agent_build_seconds": round(total_build_time, 3)
                 }
             }
+            if ttft_samples:
+                summary["ttft_percentiles"] = percentiles(ttft_samples)
+            if llm_summaries:
+                summary["llm_trace_summary"] = merge_llm_summaries(llm_summaries)
+            if grading_summaries:
+                summary["grading"] = merge_grading_summaries(grading_summaries)
+            if context_stats:
+                summary["grader_context"] = merge_context_stats(context_stats)
+            if hedging_summaries:
+                summary["hedging"] = merge_hedging_summaries(hedging_summaries)
+            if grading_failed:
+                summary["grading_failed"] = grading_failed
+            if usage_summaries:
+                summary["usage_summary"] = merge_usage_summaries(usage_summaries)
+                summary["cost_usd"] = summary["usage_summary"]["cost_usd"]
+                summary["cost_by_dataset"] = {k: round(v, 6) for k, v in sorted(cost_by_dataset.items())}
+            if spill:
+                summary["spill_path"] = spill.path
+            
+            return summary
             
         except Exception as e:
             logger.error(f"Benchmark suite error: {str(e)}")
             return {"status": "error", "message": str(e)}
+        finally:
+            if spill:
+                spill.close()
     
     def visualize_results(self, results: Dict[str, Any]) -> None:
         """
@@ -609,13 +742,19 @@ class BenchmarkClient:
     
     def run_and_submit(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         agent_name: str,
         parallel: bool = True,
         visualize: bool = True,
+        run_store: Optional[RunStore] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Run benchmarks and submit results."""
+        """
+        Run benchmarks and submit results.
+
+        If run_store is given, the run and its per-question rows are saved
+        under agent_name and the returned dict gets a "run_id".
+        """
         try:
             # Run the full benchmark
             results = self.run_full_benchmark(
@@ -662,6 +801,9 @@ class BenchmarkClient:
             # Add submission result to results
             results["submission"] = submission
             
+            if run_store is not None:
+                results["run_id"] = run_store.save_run(results, agent_name)
+            
             # Visualize if requested
             if visualize:
                 self.visualize_results(results)
@@ -788,25 +930,50 @@ class AsyncBenchmarkClient:
     
     async def run_benchmark_async(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         questions_json_path: str,
-        csv_data_path: str
+        csv_data_path: str,
+        agent_pool: Optional[AgentPool] = None,
+        **benchmark_kwargs
     ) -> Dict[str, Any]:
-        """Run a single benchmark asynchronously."""
+        """
+        Run a single benchmark asynchronously.
+
+        The benchmark runs on the event loop via benchmark.run_benchmark_async,
+        so gradings of all concurrent runs share the async grader client. Async
+        agents (async def, or an async acall method such as HttpAgent's) are
+        awaited natively, synchronous ones are called in executor threads.
+        With agent_pool the whole benchmark runs in an executor thread that
+        uses its own agent from the pool instead of agent_callable.
+        """
         await self._ensure_semaphore()
         
+        native = agent_pool is None
+        
+        def run_in_worker():
+            agent = agent_pool.get() if agent_pool else agent_callable
+            results = run_benchmark(agent, questions_json_path, csv_data_path, **benchmark_kwargs)
+            if agent_pool and isinstance(results, dict):
+                results["agent_build_seconds"] = round(agent_pool.pop_build_seconds(), 3)
+            return results
+        
         async with self._semaphore:
             try:
-                # Use the benchmark module's run_benchmark function
-                # Since run_benchmark is synchronous, we'll run it in a thread pool
-                loop = asyncio.get_event_loop()
-                results = await loop.run_in_executor(
-                    None,  # Use default executor
-                    run_benchmark,
-                    agent_callable,
-                    questions_json_path,
-                    csv_data_path
-                )
+                if native:
+                    results = await run_benchmark_async(
+                        agent_callable,
+                        questions_json_path,
+                        csv_data_path,
+                        **benchmark_kwargs
+                    )
+                else:
+                    # Use the benchmark module's run_benchmark function
+                    # Since run_benchmark is synchronous, we'll run it in a thread pool
+                    loop = asyncio.get_event_loop()
+                    results = await loop.run_in_executor(
+                        None,  # Use default executor
+                        run_in_worker
+                    )
                 
                 # Ensure the result has the structure expected by the rest of the client code
                 if isinstance(results, dict):
@@ -878,23 +1045,33 @@ class AsyncBenchmarkClient:
     
     async def run_batch_async(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         questions_json_paths: List[str],
         csv_data_paths: List[str],
+        agent_factory: Optional[Callable[[], Any]] = None,
+        **benchmark_kwargs
     ) -> List[Dict[str, Any]]:
         """
         Run multiple benchmarks asynchronously.
         
         Args:
             agent_callable: Function that takes a question and data frame and returns a response
+                (or a PreparedAgent); may be None when agent_factory or an
+                agent_batch_callable keyword argument is given
             questions_json_paths: List of paths to question JSON files
             csv_data_paths: List of paths to CSV files
+            agent_factory: Zero-argument callable that builds one agent per worker thread
+            **benchmark_kwargs: Passed through to benchmark.run_benchmark
             
         Returns:
             List of dictionaries with benchmark results
         """
         if len(questions_json_paths) != len(csv_data_paths):
             raise ValueError("questions_json_paths and csv_data_paths must have the same length")
+        if agent_callable is None and agent_factory is None and benchmark_kwargs.get("agent_batch_callable") is None:
+            raise ValueError("One of agent_callable, agent_factory or agent_batch_callable must be provided")
+        
+        agent_pool = AgentPool(agent_factory) if agent_factory is not None else None
         
         total_benchmarks = len(questions_json_paths)
         results = [None] * total_benchmarks  # Pre-allocate results list
@@ -904,21 +1081,29 @@ class AsyncBenchmarkClient:
         if self.show_progress:
             import tqdm.asyncio
             progress_bar = tqdm.asyncio.tqdm(total=total_benchmarks, desc="Running benchmarks")
+        _attach_cost_meter(benchmark_kwargs, progress_bar)
+        hedger = _share_grading_state(benchmark_kwargs)
         
-        # Create tasks for all benchmarks
-        tasks = []
-        for i in range(total_benchmarks):
-            task = asyncio.create_task(
-                self.run_benchmark_async(
-                    agent_callable=agent_callable,
-                    questions_json_path=questions_json_paths[i],
-                    csv_data_path=csv_data_paths[i]
+        try:
+            # Create tasks for all benchmarks
+            tasks = []
+            for i in range(total_benchmarks):
+                task = asyncio.create_task(
+                    self.run_benchmark_async(
+                        agent_callable=agent_callable,
+                        questions_json_path=questions_json_paths[i],
+                        csv_data_path=csv_data_paths[i],
+                        agent_pool=agent_pool,
+                        **benchmark_kwargs
+                    )
                 )
-            )
-            tasks.append(task)
-        
-        # Run all tasks concurrently with semaphore control
-        completed_tasks = await asyncio.gather(*tasks)
+                tasks.append(task)
+            
+            # Run all tasks concurrently with semaphore control
+            completed_tasks = await asyncio.gather(*tasks)
+        finally:
+            if hedger is not None:
+                hedger.close()
         
         # Process results
         for i, result in enumerate(completed_tasks):
@@ -933,17 +1118,25 @@ class AsyncBenchmarkClient:
     
     async def run_full_benchmark_async(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         base_dir: Optional[str] = None,
-        csv_dir: Optional[str] = None
+        csv_dir: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        agent_factory: Optional[Callable[[], Any]] = None,
+        **benchmark_kwargs
     ) -> Dict[str, Any]:
         """
         Run the full benchmark suite asynchronously.
         
         Args:
             agent_callable: Function that takes a question and data frame and returns a response
-            base_dir: Base directory for question files (default: current directory)
+                (or a PreparedAgent); may be None when agent_factory or an
+                agent_batch_callable keyword argument is given
+            base_dir: Directory with the question JSON files (default: see question_registry.find_questions_dir)
             csv_dir: Directory containing CSV files (default: 'generated_csvs')
+            spill_path: Optional ".jsonl" / ".parquet" file to stream per-question results to
+            agent_factory: Zero-argument callable that builds one agent per worker thread
+            **benchmark_kwargs: Passed through to benchmark.run_benchmark
             
         Returns:
             Dictionary with all results
@@ -955,36 +1148,9 @@ class AsyncBenchmarkClient:
             show_progress=False
         )
         
-        # Find question files
-        if base_dir is None:
-            base_dir = os.getcwd()
-            
-        # Locate dataset question files
-        dataset_to_json_map = {}
-        for i in range(1, 6):
-            json_path = os.path.join(base_dir, f"dataset_{i}_questions.json")
-            if not os.path.exists(json_path):
-                # Try alternate path
-                json_path = os.path.join(base_dir, "..", f"dataset_{i}_questions.json")
-                if not os.path.exists(json_path):
-                    logger.warning(f"Could not find dataset_{i}_questions.json")
-                    continue
-            dataset_to_json_map[f"D{i}"] = json_path
-        
-        # Find CSV files
-        dataset_csvs = sync_client.locate_csv_files(csv_dir)
-        
-        # Prepare batch run parameters
-        questions_json_paths = []
-        csv_data_paths = []
-        csv_to_dataset = {}  # Keep track of which dataset each CSV belongs to
-        
-        for dataset_prefix, json_path in dataset_to_json_map.items():
-            csv_files = dataset_csvs.get(dataset_prefix, [])
-            for csv_file in csv_files:
-                questions_json_paths.append(json_path)
-                csv_data_paths.append(csv_file)
-                csv_to_dataset[csv_file] = dataset_prefix
+        registry = get_question_registry(base_dir)
+        dataset_csvs = _group_csv_files(sync_client.locate_csv_files(csv_dir))
+        questions_json_paths, csv_data_paths, csv_to_dataset = _plan_benchmarks(registry, dataset_csvs)
         
         # Check if we have any benchmarks to run
         if len(questions_json_paths) == 0:
@@ -993,26 +1159,67 @@ class AsyncBenchmarkClient:
         
         # Run the benchmarks
         logger.info(f"Running {len(questions_json_paths)} benchmarks asynchronously...")
-        results = await self.run_batch_async(
-            agent_callable=agent_callable,
-            questions_json_paths=questions_json_paths,
-            csv_data_paths=csv_data_paths
-        )
+        spill = ResultSpill(spill_path) if spill_path else None
+        if spill:
+            benchmark_kwargs["result_spill"] = spill
+        # One async grader client (and connection pool) for every CSV of the suite
+        hold_async_grader_client()
+        try:
+            results = await self.run_batch_async(
+                agent_callable=agent_callable,
+                questions_json_paths=questions_json_paths,
+                csv_data_paths=csv_data_paths,
+                agent_factory=agent_factory,
+                **benchmark_kwargs
+            )
+        finally:
+            if spill:
+                spill.close()
+            await close_async_grader_client()
         
         # Process results by dataset
         scores_by_dataset = {f"D{i}": [] for i in range(1, 6)}
         all_scores = []
+        ttft_samples = []
+        llm_summaries = []
+        usage_summaries = []
+        grading_summaries = []
+        context_stats = []
+        hedging_summaries = []
+        grading_failed = 0
+        cost_by_dataset = {}
         
         for i, result in enumerate(results):
             score = result.get("overall_weighted_score_percent", 0)
+            ttft_samples.extend(result.get("ttft_samples", []))
+            if result.get("llm_trace_summary"):
+                llm_summaries.append(result["llm_trace_summary"])
+            if result.get("grading"):
+                grading_summaries.append(result["grading"])
+            if result.get("grader_context"):
+                context_stats.append(result["grader_context"])
+            if result.get("hedging"):
+                hedging_summaries.append(result["hedging"])
+            grading_failed += result.get("grading_failed", 0)
             csv_path = csv_data_paths[i]
             dataset = csv_to_dataset[csv_path]
+            if result.get("usage_summary"):
+                usage_summaries.append(result["usage_summary"])
+                cost_by_dataset[dataset] = cost_by_dataset.get(dataset, 0.0) + result["cost_usd"]
             
+            if score is None:
+                # Every question of this CSV failed grading
+                continue
             scores_by_dataset[dataset].append(score)
             all_scores.append(score)
             
             logger.info(f"{os.path.basename(csv_path)} => Score: {score:.2f}%")
         
+        if not all_scores:
+            # Every question failed grading: no score to report or store as a 0
+            logger.error("No valid scores were calculated")
+            return {"status": "error", "message": "No valid scores were calculated"}
+        
         # Calculate averages
         avg_scores = {}
         for dataset, scores in scores_by_dataset.items():
@@ -1021,7 +1228,7 @@ class AsyncBenchmarkClient:
             avg_scores[dataset] = sum(scores) / len(scores)
         
         # Calculate overall average
-        overall_avg = sum(all_scores) / len(all_scores) if all_scores else 0
+        overall_avg = sum(all_scores) / len(all_scores)
         
         # Print summary
         logger.info("\n=== Average Scores by Dataset ===")
@@ -1033,8 +1240,27 @@ class AsyncBenchmarkClient:
         summary = {
             "overall_average": overall_avg,
             "dataset_averages": avg_scores,
-            "individual_results": results
+            "individual_results": results,
+            "question_set_hashes": registry.set_hashes()
         }
+        if ttft_samples:
+            summary["ttft_percentiles"] = percentiles(ttft_samples)
+        if llm_summaries:
+            summary["llm_trace_summary"] = merge_llm_summaries(llm_summaries)
+        if grading_summaries:
+            summary["grading"] = merge_grading_summaries(grading_summaries)
+        if context_stats:
+            summary["grader_context"] = merge_context_stats(context_stats)
+        if hedging_summaries:
+            summary["hedging"] = merge_hedging_summaries(hedging_summaries)
+        if grading_failed:
+            summary["grading_failed"] = grading_failed
+        if usage_summaries:
+            summary["usage_summary"] = merge_usage_summaries(usage_summaries)
+            summary["cost_usd"] = summary["usage_summary"]["cost_usd"]
+            summary["cost_by_dataset"] = {k: round(v, 6) for k, v in sorted(cost_by_dataset.items())}
+        if spill:
+            summary["spill_path"] = spill.path
         
         return summary
     
@@ -1055,9 +1281,10 @@ class AsyncBenchmarkClient:
     
     async def run_and_submit(
         self,
-        agent_callable: Callable[[str, pd.DataFrame], str],
+        agent_callable: Optional[Callable[[str, pd.DataFrame], str]],
         agent_name: str,
         visualize: bool = True,
+        run_store: Optional[RunStore] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -1067,6 +1294,7 @@ class AsyncBenchmarkClient:
             agent_callable: Function that takes a question and data frame and returns a response
             agent_name: Name of the agent for the leaderboard
             visualize: Whether to show visualization of results
+            run_store: Optional RunStore to save the run and its per-question rows in
             **kwargs: Additional arguments to pass to run_full_benchmark_async
             
         Returns:
@@ -1092,6 +1320,9 @@ class AsyncBenchmarkClient:
         # Add submission status to results
         results["submission"] = submission
         
+        if run_store is not None:
+            results["run_id"] = run_store.save_run(results, agent_name)
+        
         # Visualize if requested
         if visualize:
             self.visualize_results(results)
@@ -7,4 +7,17 @@ CATEGORY_SECTION_WEIGHTS = {
     "email_analysis": 0.75,
     "general_sales_knowledge": 0.50,
     "employee_performance": 0.25
-}
\ No newline at end of file
+}
+# USD per 1M (prompt, completion) tokens, used by metering.CostMeter.
+# Dated snapshots (e.g. "gpt-4o-2024-08-06") match by prefix.
+MODEL_PRICES_PER_MILLION_TOKENS = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "o1": (15.00, 60.00),
+    "o1-mini": (1.10, 4.40),
+    "o3-mini": (1.10, 4.40),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
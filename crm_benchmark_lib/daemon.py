@@ -0,0 +1,490 @@
+# daemon.py
+
+"""
+Long-lived benchmark daemon and its thin client.
+
+`crm-bench serve` starts a BenchmarkDaemon that loads every question set and
+CSV once, keeps the grader client and a pooled HTTP session warm, and then
+accepts runs over a Unix socket. Messages are newline-delimited JSON objects
+with an "op" field; every request gets exactly one JSON reply line.
+
+The agent can run in two places:
+  - in the client process: DaemonClient.run() asks the daemon for the run plan,
+    calls the agent locally and sends the responses back for grading;
+  - behind an HTTP endpoint: the endpoint is registered once with
+    DaemonClient.register_agent() and the daemon calls it directly.
+
+The socket lives in a directory only the current user can enter
+($XDG_RUNTIME_DIR, else a 0700 crm-bench-<uid> directory in the temp dir) and
+is itself mode 0600, since anyone who can connect can run code-calling ops.
+
+This module only imports the standard library at import time so that the thin
+client starts quickly; pandas and the evaluator are loaded by the daemon.
+"""
+
+import os
+import json
+import glob
+import time
+import stat
+import socket
+import logging
+import tempfile
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def _private_socket_dir() -> str:
+    """Per-user directory for the socket when $XDG_RUNTIME_DIR is not set."""
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"crm-bench-{user}")
+
+
+DEFAULT_SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or _private_socket_dir(), "crm-bench.sock")
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_QUESTIONS_DIR = os.path.join(PACKAGE_DIR, "dataset_questions")
+DEFAULT_CSV_DIR = os.path.join(PACKAGE_DIR, "generated_csvs")
+
+
+class DaemonError(RuntimeError):
+    """Raised by DaemonClient when the daemon replies with an error."""
+
+
+def _prepare_socket_dir(socket_path: str) -> None:
+    """
+    Create the socket's directory (mode 0700). The shared-temp fallback
+    directory must belong to this user and be closed to everyone else, or
+    another local user could have planted it.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory != _private_socket_dir() or not hasattr(os, "getuid"):
+        return
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory owned by this user with mode 0700")
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Unlink a socket left behind by a daemon that is gone. Refuses to touch a
+    socket a daemon still answers on, or anything that is not a socket.
+    """
+    try:
+        info = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+
+def summarize_runs(jobs: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the same summary shape as BenchmarkClient.run_full_benchmark from a
+    list of per-CSV run_benchmark results.
+    """
+    dataset_scores = {}
+    set_hashes = {}
+    for job, result in zip(jobs, results):
+        if result.get("question_set_hash"):
+            set_hashes[job["dataset"]] = result["question_set_hash"]
+        score = result.get("overall_weighted_score_percent")
+        if score is None:
+            continue
+        dataset_scores.setdefault(job["dataset"], []).append(score)
+
+    all_scores = [s for scores in dataset_scores.values() for s in scores]
+    dataset_averages = {
+        dataset: sum(scores) / len(scores)
+        for dataset, scores in sorted(dataset_scores.items())
+    }
+    overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
+
+    return {
+        "overall_average": overall_average,
+        "dataset_averages": dataset_averages,
+        "individual_results": results,
+        "question_set_hashes": dict(sorted(set_hashes.items())),
+        "metadata": {
+            "total_questions_processed": sum(len(r.get("question_details", [])) for r in results),
+            "total_benchmarks": len(jobs),
+            "valid_scores": len(all_scores)
+        }
+    }
+
+
+class BenchmarkDaemon:
+    """
+    Keeps datasets, question sets and grader connections warm between runs.
+
+    Usage:
+    ```python
+    daemon = BenchmarkDaemon()
+    daemon.serve_forever()   # blocks; stop with DaemonClient().shutdown()
+    ```
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        questions_dir: Optional[str] = None,
+        csv_dir: Optional[str] = None,
+        max_workers: int = 8,
+        agent_timeout: float = 300.0,
+        grading_cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            socket_path: Path of the Unix socket to listen on
+            questions_dir: Directory with dataset_X_questions.json files
+            csv_dir: Directory with D[1-5]_*.csv files
+            max_workers: Number of threads used for grading and HTTP agents
+            agent_timeout: Timeout in seconds for one registered-agent request
+            grading_cache_path: SQLite file for a persistent GradingCache shared by all runs
+        """
+        self.socket_path = socket_path
+        self.questions_dir = questions_dir or DEFAULT_QUESTIONS_DIR
+        self.csv_dir = csv_dir or DEFAULT_CSV_DIR
+        self.max_workers = max_workers
+        self.agent_timeout = agent_timeout
+        self.grading_cache_path = grading_cache_path
+        self.grading_cache = None
+
+        self.question_sets = {}   # "D1" -> list of question dicts
+        self.question_set_hashes = {}   # "D1" -> question_registry content hash
+        self.question_weights = {}      # "D1" -> question_id -> category weight
+        self.frames = {}          # csv path -> DataFrame
+        self.jobs = []            # [{"dataset", "csv_path", "questions_json_path"}]
+        self.agents = {}          # registered agent name -> URL
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._session = None
+        self._server = None
+
+    def load(self) -> None:
+        """Import the heavy modules and load every question set and CSV once."""
+        import pandas as pd
+        import requests
+        from requests.adapters import HTTPAdapter
+        from .question_registry import get_question_registry
+
+        started = time.time()
+        self.question_sets = {}
+        self.question_set_hashes = {}
+        self.question_weights = {}
+        self.frames = {}
+        self.jobs = []
+
+        registry = get_question_registry(self.questions_dir)
+        for dataset, json_path in registry.paths().items():
+            self.question_sets[dataset] = registry.question_set(dataset).questions
+            self.question_set_hashes[dataset] = registry.set_hash(dataset)
+            self.question_weights[dataset] = registry.question_set(dataset).weights
+
+            for csv_path in sorted(glob.glob(os.path.join(self.csv_dir, f"{dataset}_*.csv"))):
+                self.frames[csv_path] = pd.read_csv(csv_path)
+                self.jobs.append({
+                    "dataset": dataset,
+                    "csv_path": csv_path,
+                    "questions_json_path": json_path
+                })
+
+        if self.grading_cache_path and self.grading_cache is None:
+            from .grading_cache import GradingCache
+            self.grading_cache = GradingCache(self.grading_cache_path)
+
+        # One pooled keep-alive session for all registered HTTP agents
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        logger.info(
+            f"Loaded {len(self.question_sets)} question sets and {len(self.frames)} CSVs "
+            f"in {time.time() - started:.2f}s"
+        )
+
+    def _select_jobs(self, datasets: Optional[List[str]]) -> List[Dict[str, Any]]:
+        if not datasets:
+            return self.jobs
+        return [job for job in self.jobs if job["dataset"] in datasets]
+
+    # ------------------------------------------------------------------
+    # Request handlers
+    # ------------------------------------------------------------------
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one decoded request and return the reply object."""
+        op = request.get("op")
+        handler = getattr(self, f"_op_{op}", None)
+        if handler is None:
+            return {"status": "error", "message": f"Unknown op: {op!r}"}
+        try:
+            reply = handler(request)
+            reply.setdefault("status", "ok")
+            return reply
+        except Exception as e:
+            logger.error(f"Daemon error in {op}: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+    def _op_ping(self, request):
+        reply = {
+            "pid": os.getpid(),
+            "question_sets": sorted(self.question_sets),
+            "question_set_hashes": dict(self.question_set_hashes),
+            "csv_files": len(self.frames),
+            "agents": sorted(self.agents)
+        }
+        if self.grading_cache is not None:
+            reply["grading_cache"] = self.grading_cache.stats()
+        return reply
+
+    def _op_reload(self, request):
+        self.load()
+        return self._op_ping(request)
+
+    def _op_plan(self, request):
+        """Return the CSVs and question texts for a client-side agent run."""
+        plan = []
+        for job in self._select_jobs(request.get("datasets")):
+            plan.append({
+                "dataset": job["dataset"],
+                "csv_path": job["csv_path"],
+                "questions": [
+                    {"question_id": q["question_id"], "question_text": q["question_text"]}
+                    for q in self.question_sets[job["dataset"]]
+                ]
+            })
+        return {"plan": plan}
+
+    def _op_grade(self, request):
+        """Grade responses produced by a client-side agent."""
+        from .benchmark import grade_question, build_results
+
+        jobs_by_path = {j["csv_path"]: j for j in self.jobs}
+        unknown = [run["csv_path"] for run in request["runs"] if run["csv_path"] not in jobs_by_path]
+        if unknown:
+            return {"status": "error", "message": f"Unknown csv_path: {', '.join(map(str, unknown))}"}
+
+        jobs = [jobs_by_path[run["csv_path"]] for run in request["runs"]]
+        questions_by_run = [{q["question_id"]: q for q in self.question_sets[job["dataset"]]} for job in jobs]
+        unknown = [
+            r.get("question_id")
+            for run, questions in zip(request["runs"], questions_by_run)
+            for r in run["responses"]
+            if r.get("question_id") not in questions
+        ]
+        if unknown:
+            return {"status": "error", "message": f"Unknown question_id: {', '.join(map(str, unknown))}"}
+
+        futures = []
+        for run, questions in zip(request["runs"], questions_by_run):
+            futures.append([
+                self._executor.submit(
+                    grade_question,
+                    questions[r["question_id"]],
+                    r["agent_response"],
+                    r.get("time_taken_seconds", 0.0),
+                    self.grading_cache
+                )
+                for r in run["responses"]
+            ])
+
+        results = []
+        for run, job, run_futures in zip(request["runs"], jobs, futures):
+            question_results = [f.result() for f in run_futures]
+            total_time = sum(r.get("time_taken_seconds", 0.0) for r in run["responses"])
+            results.append(build_results(question_results, total_time, self.question_weights[job["dataset"]]))
+
+        return summarize_runs(jobs, results)
+
+    def _op_register_agent(self, request):
+        self.agents[request["name"]] = request["url"]
+        return {"agents": sorted(self.agents)}
+
+    def _op_run(self, request):
+        """Run a registered HTTP agent against the warm datasets."""
+        from .benchmark import run_benchmark
+        from .agents import HttpAgent
+
+        url = self.agents.get(request.get("agent"), request.get("url"))
+        if not url:
+            raise ValueError(f"Unknown agent: {request.get('agent')!r}")
+
+        agent = HttpAgent(
+            url,
+            max_concurrency=self.max_workers,
+            timeout=self.agent_timeout,
+            session=self._session
+        )
+        jobs = self._select_jobs(request.get("datasets"))
+        futures = [
+            self._executor.submit(
+                run_benchmark,
+                agent,
+                job["questions_json_path"],
+                job["csv_path"],
+                questions=self.question_sets[job["dataset"]],
+                df=self.frames[job["csv_path"]],
+                grading_cache=self.grading_cache
+            )
+            for job in jobs
+        ]
+        return summarize_runs(jobs, [f.result() for f in futures])
+
+    def _op_shutdown(self, request):
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {}
+
+    # ------------------------------------------------------------------
+    # Socket server
+    # ------------------------------------------------------------------
+    def serve_forever(self) -> None:
+        """Load everything and serve requests until a shutdown op arrives."""
+        _prepare_socket_dir(self.socket_path)
+        _remove_stale_socket(self.socket_path)
+
+        if not self.frames:
+            self.load()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        reply = {"status": "error", "message": f"Invalid JSON: {str(e)}"}
+                    else:
+                        reply = daemon.handle_request(request)
+                    self.wfile.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        self._server = Server(self.socket_path, Handler)
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"crm-bench daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class DaemonClient:
+    """
+    Thin client for a running BenchmarkDaemon.
+
+    Usage:
+    ```python
+    from crm_benchmark_lib.daemon import DaemonClient
+
+    client = DaemonClient()
+    results = client.run(my_agent)                    # agent runs in this process
+    client.register_agent("v2", "http://localhost:8080/answer")
+    results = client.run_registered("v2")            # daemon calls the endpoint
+    ```
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._frames = {}
+
+    def request(self, op: str, **payload) -> Dict[str, Any]:
+        """Send one request and return the decoded reply."""
+        payload["op"] = op
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+
+        if not line:
+            raise DaemonError("Daemon closed the connection without replying")
+        reply = json.loads(line)
+        if reply.get("status") == "error":
+            raise DaemonError(reply.get("message", "Unknown daemon error"))
+        return reply
+
+    def ping(self) -> Dict[str, Any]:
+        return self.request("ping")
+
+    def reload(self) -> Dict[str, Any]:
+        return self.request("reload")
+
+    def shutdown(self) -> Dict[str, Any]:
+        return self.request("shutdown")
+
+    def register_agent(self, name: str, url: str) -> Dict[str, Any]:
+        return self.request("register_agent", name=name, url=url)
+
+    def run_registered(self, agent: str, datasets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Have the daemon run a registered HTTP agent (name or URL)."""
+        if agent.startswith(("http://", "https://")):
+            return self.request("run", url=agent, datasets=datasets)
+        return self.request("run", agent=agent, datasets=datasets)
+
+    def run(self, agent_callable: Callable, datasets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run an in-process agent: fetch the plan, answer locally, grade remotely.
+        Agents may stream their answers as iterators of text chunks.
+
+        DataFrames are read once per client and reused across calls; every
+        question gets its own copy-on-write view of them.
+        """
+        import pandas as pd
+        from .agents import is_prepared_agent, question_frame
+        from .benchmark import _collect_stream
+
+        plan = self.request("plan", datasets=datasets)["plan"]
+        runs = []
+        for job in plan:
+            csv_path = job["csv_path"]
+            if csv_path not in self._frames:
+                self._frames[csv_path] = pd.read_csv(csv_path)
+            df = self._frames[csv_path]
+
+            if is_prepared_agent(agent_callable):
+                prepared_frame = question_frame(df)
+                state = agent_callable.prepare(prepared_frame)
+
+                def ask(text):
+                    return agent_callable.answer(text, state)
+            else:
+                def ask(text):
+                    return agent_callable(text, question_frame(df))
+
+            responses = []
+            for q in job["questions"]:
+                start_time = time.time()
+                # Streamed answers are joined here; only text goes over the socket
+                agent_response, _ = _collect_stream(ask(q["question_text"]), start_time)
+                responses.append({
+                    "question_id": q["question_id"],
+                    "agent_response": agent_response,
+                    "time_taken_seconds": round(time.time() - start_time, 3)
+                })
+            runs.append({"csv_path": csv_path, "responses": responses})
+
+        return self.request("grade", runs=runs)
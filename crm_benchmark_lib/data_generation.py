@@ -1,46 +1,222 @@
 # data_generation.py
 """
 Generates synthetic data for questions D1 through D5 using a Pydantic + Faker + ChatGPT approach.
+ - With scale=N, a generator streams N filler rows to disk in chunks (CSV, or
+   Parquet for a ".parquet" path) after the unchanged signature records, so
+   CRM-sized tables can be built in bounded memory.
  - Preserves key 'signature' records.
- - Uses the 'chat' function from chatgpt.py to produce realistic, custom text fields.
+ - Uses the 'chat' function below to produce realistic, custom text fields.
+   chat_many() runs many prompts on a bounded thread pool, rate limited to
+   CHAT_REQUESTS_PER_MINUTE and retried on transient errors. Without an
+   OPENAI_API_KEY the D2 emails come from offline_emails.OfflineEmailWriter.
  - Stores each dataset as a CSV in the 'data/' folder.
 """
 
 import os
+import re
+import json
+import time
+import hashlib
 import random
 import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 from faker import Faker
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from .retries import CircuitBreaker, call_with_retries
+from .offline_emails import OfflineEmailWriter
+
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Created on first use, so the module imports (and generates offline) without an API key
+client = None
+
+CHAT_MODEL = "gpt-3.5-turbo"
+# Requests in flight at once, and the request rate across all of them
+CHAT_MAX_CONCURRENCY = 8
+CHAT_REQUESTS_PER_MINUTE = 3000
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / requests_per_minute seconds apart, across threads."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_rate_limiter = RateLimiter(CHAT_REQUESTS_PER_MINUTE)
+# Kept apart from the grader's breaker: generation outages must not pause benchmark runs
+_chat_breaker = CircuitBreaker(label="Content generation API")
 
-def chat(prompt):
+
+def get_client() -> OpenAI:
+    """The OpenAI client used for content generation."""
+    global client
+    if client is None:
+        # Retries are handled by chat()
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return client
+
+
+def chat(prompt, seed: Optional[int] = None, response_format: Optional[dict] = None):
     """
-    Helper function to interact with OpenAI API
+    Helper function to interact with OpenAI API. Safe to call from several
+    threads; `seed` asks the model for reproducible sampling, `response_format`
+    (e.g. {"type": "json_object"}) for structured output.
     """
     messages = [
         {"role": "system", "content": "You are a helpful assistant that generates realistic business communication content."},
         {"role": "user", "content": prompt}
     ]
-    
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=messages
-    )
+    extra = {"seed": seed} if seed is not None else {}
+    if response_format is not None:
+        extra["response_format"] = response_format
+
+    def request():
+        _rate_limiter.wait()
+        return get_client().chat.completions.create(model=CHAT_MODEL, messages=messages, **extra)
+
+    response = call_with_retries(request, breaker=_chat_breaker)
     return response.choices[0].message.content
 
+
+def chat_many(
+    prompts: List[str], seeds: Optional[List[Optional[int]]] = None, max_concurrency: int = CHAT_MAX_CONCURRENCY
+) -> List[str]:
+    """chat() for many prompts at once; the replies come back in prompt order."""
+    if seeds is None:
+        seeds = [None] * len(prompts)
+    return _map_concurrently(chat, prompts, seeds, max_concurrency=max_concurrency)
+
+
+def _map_concurrently(func: Callable, *iterables: Sequence, max_concurrency: int = CHAT_MAX_CONCURRENCY) -> list:
+    """map() on a bounded thread pool, results in input order."""
+    if max_concurrency <= 1 or len(iterables[0]) <= 1:
+        return list(map(func, *iterables))
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="crm-bench-chat") as pool:
+        return list(pool.map(func, *iterables))
+
 fake = Faker()
 Faker.seed(0)
 
+
+# -------- SCALED DATASETS --------
+# Filler rows generated and written at a time when a generator is called with scale=
+SCALE_CHUNK_SIZE = 100_000
+# Distinct Faker names / emails sampled in scaled mode (Faker is too slow to call per row)
+SCALE_NAME_POOL = 5000
+# Scaled dates count from this day plus (seed % 365) days, never from today
+SCALE_DATE_EPOCH = "2025-01-01"
+
+
+class ChunkedTableWriter:
+    """
+    Appends DataFrame chunks to one file. The format follows the extension:
+    ".parquet" writes Parquet row groups (requires pyarrow), anything else
+    writes CSV. Later chunks are put in the first chunk's column order (and,
+    for Parquet, cast to its schema).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = "parquet" if path.lower().endswith(".parquet") else "csv"
+        self.rows_written = 0
+        self._columns = None
+        self._writer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._columns is None:
+            self._columns = list(df.columns)
+        else:
+            df = df[self._columns]
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, index=False, mode="w" if self.rows_written == 0 else "a", header=self.rows_written == 0)
+        self.rows_written += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _faker_pool(seed: int, method: str, size: int = SCALE_NAME_POOL) -> np.ndarray:
+    """`size` values of a Faker provider (e.g. "company"), from a private seeded Faker."""
+    generator = Faker()
+    generator.seed_instance(seed)
+    provider = getattr(generator, method)
+    return np.array([provider() for _ in range(size)], dtype=object)
+
+
+def _scale_epoch(seed: int) -> np.datetime64:
+    """First day of the date range of scaled rows: fixed for a given seed."""
+    return np.datetime64(SCALE_DATE_EPOCH) + np.timedelta64(seed % 365, "D")
+
+
+def _write_scaled(
+    csv_path: str,
+    signature_rows: List[dict],
+    make_chunk: Callable[[np.random.Generator, int, int], pd.DataFrame],
+    units: int,
+    chunk_size: int,
+    seed: int,
+    label: str
+) -> dict:
+    """
+    Write the signature rows, then make_chunk(rng, start, count) for `units`
+    filler units, `chunk_size` at a time. The same seed and chunk size give
+    the same file on any day: dates derive from _scale_epoch(seed), not from
+    the current date.
+    """
+    rng = np.random.default_rng(seed)
+    with ChunkedTableWriter(csv_path) as writer:
+        writer.write(pd.DataFrame(signature_rows))
+        for start in range(0, units, chunk_size):
+            writer.write(make_chunk(rng, start, min(chunk_size, units - start)))
+    print(f"{label} dataset generated at:", csv_path, f"({writer.rows_written} rows)")
+    return {"path": csv_path, "rows": writer.rows_written, "format": writer.format}
+
 # -------- D1 DATASET --------
 class D1Deal(BaseModel):
     deal_name: str = Field(..., description="Name of the deal")
@@ -51,7 +227,12 @@ class D1Deal(BaseModel):
     close_date: str = Field(..., description="Expected close date (YYYY-MM-DD)")
     next_step: str = Field(..., description="Next step or action in the pipeline")
 
-def generate_dataset_for_d1(csv_path="data/d1_deals.csv"):
+def generate_dataset_for_d1(
+    csv_path="data/d1_deals.csv",
+    scale: Optional[int] = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+    seed: int = 0
+):
     """
     D1: pipeline insights with signature deals:
       - 4 deals in Negotiation => total exactly 250K
@@ -60,6 +241,13 @@ def generate_dataset_for_d1(csv_path="data/d1_deals.csv"):
       - Northstar missing close date
       - Redline missing next step
     Then generate many more deals. Store to CSV.
+
+    Args:
+        csv_path: Output path; with scale, a ".parquet" path writes Parquet
+        scale: Number of filler deals to stream to disk in chunks instead of the
+            200 built in memory; returns a summary dict instead of the DataFrame
+        chunk_size: Filler rows generated and written at a time (with scale)
+        seed: Random seed of the scaled filler rows
     """
     # Signature records (ensuring Q&A correctness):
     signature_records = [
@@ -131,6 +319,35 @@ def generate_dataset_for_d1(csv_path="data/d1_deals.csv"):
     # When generating random deals, ensure none are larger than Acme Corp
     stages = ["Prospecting", "Qualification", "Proposal", "Closed Won", "Closed Lost"]  # Remove Negotiation
     lead_sources = ["Webinar", "Referral", "Cold Call", "Trade Show", "Partner"]
+    next_steps = [
+        "Schedule demo",
+        "Email follow-up",
+        "Call next week",
+        "Arrange site visit"  # Remove empty string to avoid confusion with missing next step
+    ]
+
+    if scale is not None:
+        companies = _faker_pool(seed, "company")
+        epoch = _scale_epoch(seed)
+
+        def make_chunk(rng, start, count):
+            # Numbered names: no accidental duplicates next to Global Industries / Global Ind.
+            names = rng.choice(companies, count)
+            close_dates = (epoch + rng.integers(1, 401, count).astype("timedelta64[D]")).astype(str)
+            return pd.DataFrame({
+                "deal_name": [f"{name} - Deal {start + i + 1}" for i, name in enumerate(names)],
+                "stage": rng.choice(stages, count),  # Negotiation excluded
+                "amount": rng.integers(10000, 400001, count).astype(float),  # Max less than Acme Corp
+                "owner_id": [f"EMP{n}" for n in rng.integers(100000, 1000000, count)],
+                "lead_source": rng.choice(lead_sources, count),
+                "close_date": close_dates,
+                "next_step": rng.choice(next_steps, count),
+            })
+
+        return _write_scaled(
+            csv_path, [r.dict() for r in signature_records], make_chunk, scale, chunk_size, seed, "D1 deals"
+        )
+
     extra_records = []
 
     # Generate many random deals
@@ -142,12 +359,7 @@ def generate_dataset_for_d1(csv_path="data/d1_deals.csv"):
             owner_id=f"EMP{random.randint(100000,999999)}",
             lead_source=random.choice(lead_sources),
             close_date=(datetime.now() + timedelta(days=random.randint(1, 400))).strftime("%Y-%m-%d"),
-            next_step=random.choice([
-                "Schedule demo",
-                "Email follow-up",
-                "Call next week",
-                "Arrange site visit"  # Remove empty string to avoid confusion with missing next step
-            ])
+            next_step=random.choice(next_steps)
         )
         extra_records.append(deal)
 
@@ -170,10 +382,213 @@ class D2Email(BaseModel):
     stage_guess: str = Field(..., description="Sales stage guess from the email")
     objection: str = Field(..., description="Main objection or concern if any")
 
-def generate_dataset_for_d2(csv_path="data/d2_emails.csv"):
+
+class D2EmailDraft(BaseModel):
+    id: int = Field(..., description="Slot number from the request")
+    content: str = Field(..., description="Email text")
+
+
+# Filler emails generated per request, and how often under-filled batches are re-requested
+D2_EMAILS_PER_REQUEST = 25
+D2_BATCH_ATTEMPTS = 3
+
+# We'll ask ChatGPT to generate a short email excerpt for a sales conversation,
+# matching the record's sentiment and objection.
+# Focus on product features or pricing discussions.
+# Avoid any mention of implementation delays, timing issues, or demos.
+# No disclaimers, just the email text in a couple of sentences.
+D2_FILLER_PROMPT = (
+    "Please write a short email excerpt that a prospect sent to a sales rep, with {sentiment} sentiment "
+    "and this main concern: {concern}. "
+    "Focus on product features or pricing discussions. "
+    "Avoid any mention of implementation delays, timing issues, or demos. "
+    "No subject line, signature, placeholders in brackets or disclaimers, just the email text in a couple of sentences."
+)
+
+# Topics reserved for the signature threads, and template placeholders
+_D2_FILLER_FORBIDDEN = re.compile(
+    r"\b(demos?|demonstrations?|delay(s|ed)?|timing|timelines?|implementation)\b|\[[^\]]*\]", re.IGNORECASE
+)
+
+
+def _d2_filler_prompt(record: dict) -> str:
+    """D2_FILLER_PROMPT for one record."""
+    return D2_FILLER_PROMPT.format(
+        sentiment=record["sentiment"].lower(), concern=record["objection"].lower() or "none in particular"
+    )
+
+
+def _d2_batch_prompt(slots: List[Tuple[int, dict]]) -> str:
+    """Ask for one distinct email per slot, matching its sentiment and objection."""
+    lines = [
+        f"- {number}: {record['sentiment'].lower()} sentiment, main concern: {record['objection'].lower()}"
+        for number, record in slots
+    ]
+    return (
+        f"Write {len(slots)} distinct short email excerpts that prospects sent to a sales rep. "
+        "Each is a couple of sentences about product features or pricing and matches the sentiment "
+        "and main concern of its slot. "
+        "Avoid any mention of implementation delays, timing issues, or demos. "
+        "Vary the companies, tone, length and wording; no two emails may open the same way. "
+        "No subject lines, signatures, placeholders in brackets or disclaimers.\n"
+        "Slots:\n" + "\n".join(lines) + "\n"
+        'Reply with a JSON object {"emails": [{"id": <slot number>, "content": "<email text>"}, ...]} '
+        "with exactly one entry per slot."
+    )
+
+
+def _request_email_batch(slots: List[Tuple[int, dict]], seed: int) -> Dict[int, str]:
+    """One batch request; returns slot number -> email text for the well-formed entries."""
+    reply = chat(_d2_batch_prompt(slots), seed=seed, response_format={"type": "json_object"})
+    try:
+        data = json.loads(reply)
+    except (TypeError, ValueError):
+        return {}
+    items = data.get("emails", []) if isinstance(data, dict) else data
+    wanted = {number for number, _ in slots}
+    drafts = {}
+    for item in items if isinstance(items, list) else []:
+        try:
+            draft = D2EmailDraft(**item)
+        except (TypeError, ValidationError):
+            continue
+        if draft.id in wanted and draft.id not in drafts:
+            drafts[draft.id] = draft.content.strip()
+    return drafts
+
+
+def _normalize_email(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SeenEmails:
+    """
+    Email bodies used so far, compared case- and whitespace-insensitively.
+    Only an 8-byte digest of each body is kept, so a scaled D2 run can keep one
+    for all of its chunks.
+    """
+
+    def __init__(self):
+        self._digests = set()
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        return hashlib.blake2b(_normalize_email(text).encode("utf-8"), digest_size=8).digest()
+
+    def __contains__(self, text: str) -> bool:
+        return self._digest(text) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def add(self, text: str) -> None:
+        self._digests.add(self._digest(text))
+
+
+def generate_filler_emails(
+    fields: List[dict],
+    emails_per_request: int = D2_EMAILS_PER_REQUEST,
+    max_concurrency: int = CHAT_MAX_CONCURRENCY,
+    content_seed: int = 0,
+    seen: Optional[SeenEmails] = None
+) -> List[str]:
+    """
+    Email bodies for the filler records in `fields`, requested
+    `emails_per_request` at a time as JSON. Entries that are missing,
+    malformed, duplicated or touch the signature threads' topics are
+    re-requested (D2_BATCH_ATTEMPTS rounds). What is still missing is then
+    requested one email per record, with the same prompt details and checks
+    (another D2_BATCH_ATTEMPTS rounds); the few records left after that get
+    an OfflineEmailWriter email. Pass `seen` to also avoid (and extend) the
+    bodies of earlier calls.
+    """
+    contents: List[Optional[str]] = [None] * len(fields)
+    seen = SeenEmails() if seen is None else seen
+
+    def accept(index: int, text: Optional[str]) -> None:
+        text = text.strip() if text else ""
+        if not text or _D2_FILLER_FORBIDDEN.search(text) or text in seen:
+            return
+        contents[index] = text
+        seen.add(text)
+
+    pending = list(range(len(fields)))
+    if emails_per_request > 1:
+        for attempt in range(D2_BATCH_ATTEMPTS):
+            if not pending:
+                break
+            batches = [pending[i:i + emails_per_request] for i in range(0, len(pending), emails_per_request)]
+            # Seeds depend on the slots and the attempt, not on scheduling
+            seeds = [content_seed + attempt * len(fields) + batch[0] for batch in batches]
+            replies = _map_concurrently(
+                lambda batch, seed: _request_email_batch(
+                    [(number, fields[index]) for number, index in enumerate(batch, 1)], seed
+                ),
+                batches, seeds, max_concurrency=max_concurrency
+            )
+            for batch, drafts in zip(batches, replies):
+                for number, index in enumerate(batch, 1):
+                    accept(index, drafts.get(number))
+            pending = [index for index in pending if contents[index] is None]
+
+    for attempt in range(D2_BATCH_ATTEMPTS):
+        if not pending:
+            break
+        singles = chat_many(
+            [_d2_filler_prompt(fields[index]) for index in pending],
+            seeds=[content_seed + (D2_BATCH_ATTEMPTS + attempt) * len(fields) + index for index in pending],
+            max_concurrency=max_concurrency
+        )
+        for index, text in zip(pending, singles):
+            accept(index, text)
+        pending = [index for index in pending if contents[index] is None]
+
+    if pending:
+        print(f"{len(pending)} D2 filler emails failed the checks; writing them offline")
+        writer = OfflineEmailWriter(seed=content_seed)
+        for index in pending:
+            contents[index] = writer.write(index, fields[index]["sentiment"], fields[index]["objection"], seen)
+    return contents
+
+
+def resolve_content_backend(content_backend: str = "auto") -> str:
+    """"llm" or "offline"; "auto" picks "llm" when OPENAI_API_KEY is set."""
+    if content_backend == "auto":
+        return "llm" if os.getenv("OPENAI_API_KEY") else "offline"
+    if content_backend not in ("llm", "offline"):
+        raise ValueError(f"Unknown content backend {content_backend!r}; use 'auto', 'llm' or 'offline'")
+    return content_backend
+
+
+def generate_dataset_for_d2(
+    csv_path="data/d2_emails.csv",
+    max_concurrency: int = CHAT_MAX_CONCURRENCY,
+    content_seed: int = 0,
+    emails_per_request: int = D2_EMAILS_PER_REQUEST,
+    content_backend: str = "auto",
+    scale: Optional[int] = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+    seed: int = 0
+):
     """
     D2: email analysis with signature threads, plus random emails whose content
-    is custom-generated by ChatGPT (via chatgpt.py) so there's no filler content.
+    is custom-generated by ChatGPT (via generate_filler_emails) so there's no
+    filler content. Each request asks for `emails_per_request` distinct emails.
+    With content_backend="offline" (the "auto" default when no OPENAI_API_KEY
+    is set) the emails come from offline_emails.OfflineEmailWriter instead:
+    no network access, same output for the same content_seed.
+
+    The random fields are drawn in record order before any request is sent, and
+    request seeds derive from content_seed and the records they cover, so the
+    concurrency level does not change the dataset.
+
+    With scale, `scale` filler emails (instead of 300) are generated and
+    written `chunk_size` at a time, and a summary dict is returned; see
+    generate_dataset_for_d1. One SeenEmails spans all chunks, so bodies are
+    distinct across the whole file (the offline grammar may still repeat a
+    body once its redraws run out on very large files). Scaled files use the
+    offline writer unless content_backend="llm" is passed explicitly, since
+    the LLM needs about scale / emails_per_request requests.
     """
     # Signature threads
     signature_threads = [
@@ -238,31 +653,63 @@ def generate_dataset_for_d2(csv_path="data/d2_emails.csv"):
     sentiments = ["Neutral", "Negative"]  # Remove Positive to avoid confusion with key threads
     stage_guesses = ["Qualification", "Proposal", "Unknown"]  # Limit stages to avoid confusion
     possible_objections = ["Price", "Features", "Support"]  # Remove timeline/implementation to avoid confusion
+    if scale is not None and content_backend == "auto":
+        # One API request per emails_per_request rows is too many for load tests
+        backend = "offline"
+    else:
+        backend = resolve_content_backend(content_backend)
 
-    additional_threads = []
-    for i in range(300):
-        # We'll ask ChatGPT to generate a short email excerpt for a sales conversation.
-        # Focus on product features or pricing discussions.
-        # Avoid any mention of implementation delays, timing issues, or demos.
-        # No disclaimers, just the email text in a couple of sentences.
-        prompt = (
-            "Please write a short email excerpt for a sales conversation. "
-            "Focus on product features or pricing discussions. "
-            "Avoid any mention of implementation delays, timing issues, or demos. "
-            "No disclaimers, just the email text in a couple of sentences."
+    if scale is not None:
+        if backend == "llm":
+            requests_needed = -(-scale // max(emails_per_request, 1))
+            print(f"Generating {scale} D2 email bodies with the LLM: about {requests_needed} API requests")
+        senders = _faker_pool(seed, "email")
+        writer = OfflineEmailWriter(seed=content_seed)
+        seen = SeenEmails()
+
+        def make_chunk(rng, start, count):
+            chunk_fields = pd.DataFrame({
+                "thread_id": [f"RND-{i:04d}" for i in range(start, start + count)],
+                "sender": rng.choice(senders, count),
+                "recipient": "rep@company.com",
+                "sentiment": rng.choice(sentiments, count),
+                "stage_guess": rng.choice(stage_guesses, count),
+                "objection": rng.choice(possible_objections, count),
+            })
+            records = chunk_fields.to_dict("records")
+            if backend == "offline":
+                chunk_fields["content"] = writer.write_many(records, start=start, seen=seen)
+            else:
+                chunk_fields["content"] = generate_filler_emails(
+                    records, emails_per_request=emails_per_request,
+                    max_concurrency=max_concurrency, content_seed=content_seed + start, seen=seen
+                )
+            return chunk_fields
+
+        return _write_scaled(
+            csv_path, [t.dict() for t in signature_threads], make_chunk, scale, chunk_size, seed, "D2 emails"
         )
-        generated_text = chat(prompt).strip()
 
-        email = D2Email(
-            thread_id=f"RND-{i:04d}",
-            sender=fake.email(),
-            recipient="rep@company.com",
-            sentiment=random.choice(sentiments),
-            content=generated_text,
-            stage_guess=random.choice(stage_guesses),
-            objection=random.choice(possible_objections)
+    fields = [
+        {
+            "thread_id": f"RND-{i:04d}",
+            "sender": fake.email(),
+            "recipient": "rep@company.com",
+            "sentiment": random.choice(sentiments),
+            "stage_guess": random.choice(stage_guesses),
+            "objection": random.choice(possible_objections)
+        }
+        for i in range(300)
+    ]
+    if backend == "offline":
+        contents = OfflineEmailWriter(seed=content_seed).write_many(fields)
+    else:
+        contents = generate_filler_emails(
+            fields, emails_per_request=emails_per_request, max_concurrency=max_concurrency, content_seed=content_seed
         )
-        additional_threads.append(email)
+    additional_threads = [
+        D2Email(content=text, **record) for record, text in zip(fields, contents)
+    ]
 
     final_emails = [t.dict() for t in signature_threads] + [t.dict() for t in additional_threads]
     df = pd.DataFrame(final_emails)
@@ -282,12 +729,18 @@ class D3Record(BaseModel):
     last_activity_days: int = Field(..., description="Days since last activity")
     notes: str = Field(..., description="Any additional notes")
 
-def generate_dataset_for_d3(csv_path="data/d3_records.csv"):
+def generate_dataset_for_d3(
+    csv_path="data/d3_records.csv",
+    scale: Optional[int] = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+    seed: int = 0
+):
     """
     D3: Sales records with signature deals:
     - High confidence: Northbound (80%) and DeltaOne (75%)
     - Stale deals: Optima and RoverTech (90+ days inactive)
-    Then generate additional random records.
+    Then generate additional random records. With scale, `scale` records are
+    streamed to disk in chunks (see generate_dataset_for_d1).
     """
     # Signature records ensuring Q&A correctness
     signature_records = [
@@ -332,6 +785,32 @@ def generate_dataset_for_d3(csv_path="data/d3_records.csv"):
     # Generate additional random records
     record_types = ["Opportunity", "Lead", "Meeting"]
     stages = ["Prospecting", "Qualification", "Closed Won", "Closed Lost"]  # Remove Proposal to avoid confusion
+    notes = [
+        "Following up next week",
+        "Scheduled demo",
+        "Need to qualify budget",
+        "Initial contact made"
+    ]
+
+    if scale is not None:
+        companies = _faker_pool(seed, "company")
+
+        def make_chunk(rng, start, count):
+            stage = rng.choice(stages, count)
+            return pd.DataFrame({
+                "record_type": rng.choice(record_types, count),
+                "name": rng.choice(companies, count),
+                "stage": np.where(rng.random(count) > 0.3, stage, ""),
+                "amount": rng.integers(50000, 170001, count).astype(float),  # Keep below our high-confidence deals
+                "probability": rng.integers(10, 66, count).astype(float),  # Keep below our high-confidence probabilities
+                "last_activity_days": rng.integers(1, 86, count),  # Keep well under 90 to not interfere with stale deals
+                "notes": rng.choice(notes, count),
+            })
+
+        return _write_scaled(
+            csv_path, [r.dict() for r in signature_records], make_chunk, scale, chunk_size, seed, "D3 records"
+        )
+
     extra_records = []
 
     for _ in range(100):
@@ -342,12 +821,7 @@ def generate_dataset_for_d3(csv_path="data/d3_records.csv"):
             amount=float(random.randint(50000, 170000)),  # Keep below our high-confidence deals
             probability=float(random.randint(10, 65)),  # Keep below our high-confidence probabilities
             last_activity_days=random.randint(1, 85),  # Keep well under 90 to not interfere with stale deals
-            notes=random.choice([
-                "Following up next week",
-                "Scheduled demo",
-                "Need to qualify budget",
-                "Initial contact made"
-            ])
+            notes=random.choice(notes)
         )
         extra_records.append(record)
 
@@ -369,7 +843,12 @@ class D4RepCompliance(BaseModel):
     rule5_compliant: bool = Field(..., description="Rule 5 compliance")
     total_revenue_this_quarter: float = Field(..., description="Total revenue adjusted by compliance")
 
-def generate_dataset_for_d4(csv_path="data/d4_reps.csv"):
+def generate_dataset_for_d4(
+    csv_path="data/d4_reps.csv",
+    scale: Optional[int] = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+    seed: int = 0
+):
     """
     D4: Sales rep rule compliance with exact numbers:
     - 5 reps follow Rule 1 (3-day follow-up)
@@ -377,6 +856,8 @@ def generate_dataset_for_d4(csv_path="data/d4_reps.csv"):
     - 7 reps follow Rule 3 (30-day pipeline)
     - 3 reps follow Rule 4 (10% discount max)
     - 5 reps follow Rule 5 (training hours)
+    With scale, `scale` additional reps are streamed to disk in chunks (see
+    generate_dataset_for_d1).
     """
     # First create the signature compliant reps
     signature_records = [
@@ -426,6 +907,25 @@ def generate_dataset_for_d4(csv_path="data/d4_reps.csv"):
     ]
 
     # Generate additional random reps that won't interfere with our counts
+    if scale is not None:
+        def make_chunk(rng, start, count):
+            base_revenue = rng.integers(100000, 300001, count)
+            personalized = rng.random(count) < 0.5
+            return pd.DataFrame({
+                "rep_id": [f"EMP{i + 100}" for i in range(start, start + count)],
+                "follow_up_3days": False,  # Keep false to maintain exactly 5 compliant
+                "personalized_followup": personalized,
+                "close_stale_deals": False,  # Keep false to maintain exactly 7 compliant
+                "discount_under_10pct": False,  # Keep false to maintain exactly 3 compliant
+                "rule5_compliant": False,  # Keep false to maintain exactly 5 compliant
+                # Add 20% more revenue if personalized follow-ups are used
+                "total_revenue_this_quarter": np.round(base_revenue * np.where(personalized, 1.2, 1.0), 2),
+            })
+
+        return _write_scaled(
+            csv_path, [r.dict() for r in signature_records], make_chunk, scale, chunk_size, seed, "D4 reps"
+        )
+
     extra_records = []
     for i in range(20):
         base_revenue = random.randint(100000, 300000)
@@ -461,7 +961,12 @@ class D5Performance(BaseModel):
     total_revenue: float = Field(..., description="Total revenue from closed-won deals")
     avg_win_rate: float = Field(..., description="Percentage, e.g. 38.5 = 38.5%")
 
-def generate_dataset_for_d5(csv_path="data/d5_performance.csv"):
+def generate_dataset_for_d5(
+    csv_path="data/d5_performance.csv",
+    scale: Optional[int] = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+    seed: int = 0
+):
     """
     D5: Performance trends with exact numbers:
     - 15% quarterly growth in opportunity volume
@@ -469,6 +974,9 @@ def generate_dataset_for_d5(csv_path="data/d5_performance.csv"):
     - Top 5 reps (EMP111-555) with >$200k each
     - EMPxyz showing 55% win rate, 45% quota, 12% deal size growth
     - Largest drop-off at Proposal to Negotiation stage
+    With scale, about `scale` additional rows (whole reps of four quarters)
+    are streamed to disk in chunks after the team and funnel rows (see
+    generate_dataset_for_d1).
     """
     # First create signature records for top performers
     signature_records = [
@@ -521,7 +1029,36 @@ def generate_dataset_for_d5(csv_path="data/d5_performance.csv"):
         if q == "Q4":  # Ensure we hit exactly 35% by Q4
             win_rate = 35.0
 
+    # Add stage transition data to show largest drop-off at Proposal to Negotiation
+    stage_transitions = D5Performance(
+        rep_id="FUNNEL_METRICS",
+        year=2024,
+        quarter="Q1",
+        total_deals=100,  # Base number
+        closed_won=20,    # Final outcome
+        total_revenue=0,  # Not relevant for funnel
+        avg_win_rate=0    # Not relevant for funnel
+    )
+
     # Generate additional random rep data that won't interfere with our metrics
+    if scale is not None:
+        def make_chunk(rng, start, count):
+            rows = count * len(quarters)
+            return pd.DataFrame({
+                "rep_id": np.repeat([f"EMP{i + 1000}" for i in range(start, start + count)], len(quarters)),  # Keep IDs well away from our signature reps
+                "year": 2024,
+                "quarter": np.tile(quarters, count),
+                "total_deals": rng.integers(5, 13, rows),  # Keep lower than our top performers
+                "closed_won": rng.integers(1, 6, rows),  # Keep lower than our top performers
+                "total_revenue": rng.integers(50000, 190001, rows).astype(float),  # Keep below 200k threshold
+                "avg_win_rate": rng.uniform(20.0, 33.0, rows),  # Keep below both our target metrics
+            })
+
+        return _write_scaled(
+            csv_path, [r.dict() for r in signature_records + quarterly_records + [stage_transitions]], make_chunk,
+            -(-scale // len(quarters)), max(chunk_size // len(quarters), 1), seed, "D5 performance"
+        )
+
     extra_records = []
     for i in range(20):
         for q in quarters:
@@ -536,17 +1073,6 @@ def generate_dataset_for_d5(csv_path="data/d5_performance.csv"):
             )
             extra_records.append(record)
 
-    # Add stage transition data to show largest drop-off at Proposal to Negotiation
-    stage_transitions = D5Performance(
-        rep_id="FUNNEL_METRICS",
-        year=2024,
-        quarter="Q1",
-        total_deals=100,  # Base number
-        closed_won=20,    # Final outcome
-        total_revenue=0,  # Not relevant for funnel
-        avg_win_rate=0    # Not relevant for funnel
-    )
-
     # Combine all records
     final_data = [r.dict() for r in signature_records + quarterly_records + extra_records + [stage_transitions]]
     df = pd.DataFrame(final_data)
@@ -557,13 +1083,13 @@ def generate_dataset_for_d5(csv_path="data/d5_performance.csv"):
 
 
 # ---------- MASTER FUNCTION -------------
-def generate_all_datasets():
+def generate_all_datasets(content_backend: str = "auto"):
     """
     Helper function to generate all five datasets at once.
     They will be saved to CSV in the data/ folder.
     """
     generate_dataset_for_d1()
-    generate_dataset_for_d2()
+    generate_dataset_for_d2(content_backend=content_backend)
     generate_dataset_for_d3()
     generate_dataset_for_d4()
     generate_dataset_for_d5()
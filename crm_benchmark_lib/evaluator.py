@@ -8,11 +8,23 @@ This revised version uses an OpenAI LLM (o3-mini) to provide a numeric score,
 and logs intermediate steps for debugging.
 """
 
+import copy
 import json
 import os
-from openai import OpenAI
+import time
+import asyncio
+import weakref
+import functools
+import threading
+from typing import Optional
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient, DEFAULT_CONNECTION_LIMITS
 import logging
 from .config import CATEGORY_SECTION_WEIGHTS
+from .metering import record_usage, usage_scope, current_usage_ledger, share_usage
+from .fast_grader import pre_grade
+from .hedging import hedged_call, hedged_call_async
+from .grader_health import call_with_retries, call_with_retries_async
+from .question_registry import load_question_set
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,17 +39,58 @@ logger.setLevel(logging.CRITICAL)
 logging.basicConfig(level=logging.INFO)
 # or create a handler. For brevity, we'll trust an external config or basicConfig.
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Created on first use, so offline graders work without an API key
+client = None
+
+# Debug prefix of verdicts whose grader call failed after all retries
+GRADING_FAILED_PREFIX = "OpenAI API error"
+
+# Part of the grading cache key: bump the version whenever the prompt below changes
+GRADER_MODEL = "gpt-4o"
+GRADER_PROMPT_VERSION = 1
+# Batch verdicts come from another prompt (_BATCH_PROMPT_HEADER) and are cached separately
+GRADER_BATCH_PROMPT_VERSION = 1
+
+# Rubric shared by the single-response and the batch prompt
+_SCORING_GUIDELINES = """
+Scoring Guidelines:
+- 1.00 means the agent's answer is fully correct (or acceptable).
+- 0.01 means the agent is completely incorrect or contradicts known facts.
+- A value between 0.01 and 1.00 is allowed if partially correct.
+- If the agent's response is not relevant to the question, score 0.10.
+- If the agent's response is fully incorrect, score 0.01.
+- If the agent's response is partially correct, score 0.50.
+- If the agent's response is mostly correct, score 0.75.
+- If the agent's response is fully correct, score 1.00.
+- If the agent's response is in between any of the above, score the appropriate value between 0.01 and 1.00.
+""".strip()
+
+def get_grader_client() -> OpenAI:
+    """The synchronous OpenAI client used for grading."""
+    global client
+    if client is None:
+        # Retries are handled by grader_health.call_with_retries
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return client
+
+def grading_failed(debug_info) -> bool:
+    """Whether a (score, debug_info) verdict records a failed grader call rather than a grade."""
+    return str(debug_info).startswith(GRADING_FAILED_PREFIX)
 
 def load_questions(json_path):
-    logger.debug(f"Loading questions from: {json_path}")
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """
+    Question list of a set JSON. The file is parsed once per process
+    (question_registry); each call returns a private copy the caller may modify.
+    """
+    return copy.deepcopy(load_question_set(json_path).questions)
 
 def evaluate_response_with_variants(
     agent_response: str,
     correct_answer_data: dict,
-    csv_data: str = ""
+    csv_data: str = "",
+    fast_path: bool = False,
+    question_text: str = "",
+    model: Optional[str] = None
 ):
     """
     Evaluate an agent's response by passing the agent response, plus info about
@@ -46,8 +99,62 @@ def evaluate_response_with_variants(
     We ask the model to provide a single float between 0.0 and 1.0 (two decimals).
     If it fails to parse, we default to 0.1.
 
+    With fast_path=True, responses the rule-based fast_grader.pre_grade can
+    decide with confidence (crisp numbers / names) are scored without the LLM.
+    `model` overrides GRADER_MODEL (e.g. a cheaper first tier of a cascade).
+
     Returns: (score: float, debug_info: str)
     """
+    if fast_path:
+        verdict = pre_grade(agent_response, correct_answer_data, question_text)
+        if verdict is not None:
+            return verdict
+
+    prompt = _build_prompt(agent_response, correct_answer_data, csv_data)
+    logger.debug("=== EVALUATION PROMPT ===\n%s", prompt)
+
+    try:
+        content = call_with_retries(functools.partial(hedged_call, functools.partial(_request_grade, prompt, model)))
+    except Exception as e:
+        logger.error("OpenAI API error: %s", e, exc_info=True)
+        return (0.0, f"{GRADING_FAILED_PREFIX}: {str(e)}")
+
+    return _parse_score(content)
+
+
+async def evaluate_response_with_variants_async(
+    agent_response: str,
+    correct_answer_data: dict,
+    csv_data: str = "",
+    fast_path: bool = False,
+    question_text: str = "",
+    model: Optional[str] = None
+):
+    """
+    Asynchronous evaluate_response_with_variants on the shared AsyncOpenAI
+    client of the running event loop (see get_async_grader_client). Same
+    prompt, arguments and (score, debug_info) result.
+    """
+    if fast_path:
+        verdict = pre_grade(agent_response, correct_answer_data, question_text)
+        if verdict is not None:
+            return verdict
+
+    prompt = _build_prompt(agent_response, correct_answer_data, csv_data)
+    logger.debug("=== EVALUATION PROMPT ===\n%s", prompt)
+
+    try:
+        content = await call_with_retries_async(
+            functools.partial(hedged_call_async, functools.partial(_request_grade_async, prompt, model))
+        )
+    except Exception as e:
+        logger.error("OpenAI API error: %s", e, exc_info=True)
+        return (0.0, f"{GRADING_FAILED_PREFIX}: {str(e)}")
+
+    return _parse_score(content)
+
+
+def _build_prompt(agent_response, correct_answer_data: dict, csv_data: str = "") -> str:
     main_answer = correct_answer_data["main_answer"]
     acceptable = correct_answer_data.get("acceptable_variants", [])
     wrong = correct_answer_data.get("wrong_variants", [])
@@ -60,16 +167,7 @@ You are an AI-based evaluator. You must read the following question's "correct"
 the agent's response, and any relevant CSV data, then decide on a single numeric score
 between 0.00 and 1.00 (inclusive). Output ONLY that float with two decimals, nothing else.
 
-Scoring Guidelines:
-- 1.00 means the agent's answer is fully correct (or acceptable).
-- 0.01 means the agent is completely incorrect or contradicts known facts.
-- A value between 0.01 and 1.00 is allowed if partially correct.
-- If the agent's response is not relevant to the question, score 0.10.
-- If the agent's response is fully incorrect, score 0.01.
-- If the agent's response is partially correct, score 0.50.
-- If the agent's response is mostly correct, score 0.75.
-- If the agent's response is fully correct, score 1.00.
-- If the agent's response is in between any of the above, score the appropriate value between 0.01 and 1.00.
+{_SCORING_GUIDELINES}
 
 Question's Correct/Acceptable/Wrong Data:
 - MAIN correct statement: {main_answer}
@@ -86,22 +184,45 @@ Return only the numeric score in the format: XX.XX (two decimals, e.g., 0.75).
 Always return a score between 0.01 and 1.00.
 """
 
-    logger.debug("=== EVALUATION PROMPT ===\n%s", prompt.strip())
+    return prompt.strip()
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a strict evaluator."},
-                {"role": "user", "content": prompt.strip()},
-            ]
+
+def _grader_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": "You are a strict evaluator."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _request_grade(prompt: str, model: Optional[str] = None) -> str:
+    response = get_grader_client().chat.completions.create(
+        model=model or GRADER_MODEL,
+        messages=_grader_messages(prompt)
+    )
+    return _read_grader_response(response)
+
+
+async def _request_grade_async(prompt: str, model: Optional[str] = None) -> str:
+    response = await get_async_grader_client().chat.completions.create(
+        model=model or GRADER_MODEL,
+        messages=_grader_messages(prompt)
+    )
+    return _read_grader_response(response)
+
+
+def _read_grader_response(response) -> str:
+    """Message text of a grader completion; records its token usage."""
+    content = response.choices[0].message.content.strip()
+    logger.debug("LLM Raw Output: %r", content)
+    if response.usage is not None:
+        record_usage(
+            "grader", response.model or GRADER_MODEL,
+            response.usage.prompt_tokens, response.usage.completion_tokens
         )
-        content = response.choices[0].message.content.strip()
-        logger.debug("LLM Raw Output: %r", content)
-    except Exception as e:
-        logger.error("OpenAI API error: %s", e, exc_info=True)
-        return (0.0, f"OpenAI API error: {str(e)}")
+    return content
+
 
+def _parse_score(content: str):
     # Attempt to parse float
     try:
         score = float(content)
@@ -115,18 +236,312 @@ Always return a score between 0.01 and 1.00.
         logger.warning("Failed to parse float from LLM response: %r", content)
         return (0.0, f"Failed to parse float from: {content}")
 
-def compute_weighted_score(question_results):
+
+# ------------------------------------------------------------------------
+# Async grader client
+# ------------------------------------------------------------------------
+# Connection pool of the AsyncOpenAI client each event loop shares for grading
+GRADER_MAX_CONNECTIONS = 200
+GRADER_MAX_KEEPALIVE_CONNECTIONS = 50
+GRADER_KEEPALIVE_EXPIRY = 30.0
+
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncOpenAI
+_async_client_holds = weakref.WeakKeyDictionary()  # event loop -> runs still using its client
+
+
+def configure_async_grader(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None
+) -> None:
+    """
+    Tune the connection pool of async grader clients. Applies to clients
+    created afterwards, i.e. to event loops that have not graded yet.
+    """
+    global GRADER_MAX_CONNECTIONS, GRADER_MAX_KEEPALIVE_CONNECTIONS, GRADER_KEEPALIVE_EXPIRY
+    if max_connections is not None:
+        GRADER_MAX_CONNECTIONS = max_connections
+    if max_keepalive_connections is not None:
+        GRADER_MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+    if keepalive_expiry is not None:
+        GRADER_KEEPALIVE_EXPIRY = keepalive_expiry
+
+
+def get_async_grader_client() -> AsyncOpenAI:
+    """
+    The AsyncOpenAI client of the running event loop, created on first use
+    with one keep-alive connection pool for every grading on that loop.
+    (httpx connections cannot move between loops, hence one client per loop.)
+    """
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        # DEFAULT_CONNECTION_LIMITS is an httpx.Limits of the httpx build openai uses
+        limits = type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=GRADER_MAX_CONNECTIONS,
+            max_keepalive_connections=GRADER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=GRADER_KEEPALIVE_EXPIRY
+        )
+        async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+            max_retries=0
+        )
+        _async_clients[loop] = async_client
+    return async_client
+
+
+def hold_async_grader_client() -> None:
+    """
+    Keep the running loop's grader client open until the matching
+    close_async_grader_client(), so concurrent runs on one loop share it.
+    """
+    loop = asyncio.get_running_loop()
+    _async_client_holds[loop] = _async_client_holds.get(loop, 0) + 1
+
+
+async def close_async_grader_client() -> None:
+    """
+    Release one hold_async_grader_client(); the last release (or a call
+    without holds) closes the running loop's grader client and its connections.
+    """
+    loop = asyncio.get_running_loop()
+    holds = _async_client_holds.pop(loop, 0) - 1
+    if holds > 0:
+        _async_client_holds[loop] = holds
+        return
+    async_client = _async_clients.pop(loop, None)
+    if async_client is not None:
+        await async_client.close()
+
+# ------------------------------------------------------------------------
+# Batched grading
+# ------------------------------------------------------------------------
+# Rough prompt size per batch request (~4 characters per token) and hard cap on items
+GRADER_BATCH_TOKEN_BUDGET = 8000
+GRADER_BATCH_MAX_ITEMS = 40
+
+_BATCH_PROMPT_HEADER = """
+You are an AI-based evaluator. For every numbered item below, read the question's "correct" info
+and the agent's response, then decide on a single numeric score between 0.00 and 1.00 (inclusive).
+Grade each item independently.
+
+""" + _SCORING_GUIDELINES + """
+
+Return ONLY a JSON object of the form {"scores": [{"id": 0, "score": 0.75}, ...]} with exactly one
+entry per item id, scores with two decimals between 0.01 and 1.00.
+"""
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _batch_item_text(item_id: int, agent_response, correct_answer_data: dict) -> str:
+    return (
+        f"### Item {item_id}\n"
+        f"- MAIN correct statement: {correct_answer_data['main_answer']}\n"
+        f"- ACCEPTABLE variants: {correct_answer_data.get('acceptable_variants', [])}\n"
+        f"- WRONG variants: {correct_answer_data.get('wrong_variants', [])}\n"
+        f"Agent's Response:\n{agent_response}\n"
+    )
+
+
+def plan_grading_batches(items, token_budget: int = GRADER_BATCH_TOKEN_BUDGET, max_items: int = GRADER_BATCH_MAX_ITEMS):
+    """
+    Split (agent_response, correct_answer_data) items into lists of indices
+    whose prompts fit the token budget. An item larger than the budget gets a
+    batch of its own.
+    """
+    batches = []
+    current = []
+    used = _estimate_tokens(_BATCH_PROMPT_HEADER)
+    for index, (agent_response, correct_answer_data) in enumerate(items):
+        cost = _estimate_tokens(_batch_item_text(index, agent_response, correct_answer_data))
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            used = _estimate_tokens(_BATCH_PROMPT_HEADER)
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_scores(content: str, expected_ids) -> dict:
+    """{item id: score} for every well-formed entry; missing or malformed ids are left out."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    entries = data.get("scores", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return {}
+
+    scores = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            item_id = int(entry["id"])
+            score = float(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if item_id in expected_ids and item_id not in scores:
+            scores[item_id] = round(max(0.0, min(score, 1.0)), 2)
+    return scores
+
+
+def _grade_batch(batch_items, model: Optional[str] = None) -> dict:
+    """One grader request for [(item id, agent_response, correct_answer_data)]; returns {id: score}."""
+    prompt = _BATCH_PROMPT_HEADER + "\n" + "\n".join(
+        _batch_item_text(item_id, agent_response, correct_answer_data)
+        for item_id, agent_response, correct_answer_data in batch_items
+    )
+    logger.debug("=== BATCH EVALUATION PROMPT ===\n%s", prompt.strip())
+
+    try:
+        response = call_with_retries(functools.partial(
+            get_grader_client().chat.completions.create,
+            model=model or GRADER_MODEL,
+            messages=_grader_messages(prompt.strip()),
+            response_format={"type": "json_object"}
+        ))
+        content = _read_grader_response(response)
+    except Exception as e:
+        logger.error("OpenAI API error in batch grading: %s", e, exc_info=True)
+        return {}
+
+    return _parse_batch_scores(content, {item_id for item_id, _, _ in batch_items})
+
+
+def _score_batches(items, token_budget: int, max_items: int, model: Optional[str] = None):
+    """Batch scores for `items`; None where the grader left an item unscored or it is alone in its batch."""
+    results = [None] * len(items)
+    for batch in plan_grading_batches(items, token_budget, max_items):
+        if len(batch) == 1:
+            continue
+        scores = _grade_batch([(index, items[index][0], items[index][1]) for index in batch], model)
+        for index in batch:
+            if index in scores:
+                results[index] = (scores[index], f"LLM batch scored => {scores[index]} ({len(batch)} items)")
+    return results
+
+
+def _fill_unscored(items, results, model: Optional[str] = None):
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing and len(missing) < len(items):
+        logger.warning("Batch grading left %d of %d items unscored; grading them individually", len(missing), len(items))
+    for index in missing:
+        agent_response, correct_answer_data = items[index]
+        results[index] = evaluate_response_with_variants(agent_response, correct_answer_data, csv_data="", model=model)
+    return results
+
+
+def evaluate_responses_batch(
+    items,
+    token_budget: int = GRADER_BATCH_TOKEN_BUDGET,
+    max_items: int = GRADER_BATCH_MAX_ITEMS,
+    model: Optional[str] = None
+):
+    """
+    Grade many (agent_response, correct_answer_data) pairs with as few grader
+    requests as the token budget allows. Every item must come back with a
+    score; items missing from a batch reply (or in a failed request) are
+    graded one by one with evaluate_response_with_variants.
+
+    Returns: list of (score, debug_info) in the order of `items`
+    """
+    items = list(items)
+    return _fill_unscored(items, _score_batches(items, token_budget, max_items, model), model)
+
+
+class GradingBatcher:
+    """
+    Packs grading items from concurrently running benchmarks (e.g. the CSVs of
+    a parallel run_full_benchmark) into shared batch requests. Each caller
+    waits `linger` seconds for others to add their items; one of them then
+    sends the pooled batches while the rest wait for their scores. Grader
+    usage of a shared request is split between the callers' usage scopes in
+    proportion to their items.
+
+    Args:
+        token_budget: Approximate prompt tokens per batch request
+        max_items: Maximum responses per batch request
+        linger: Seconds to wait for items from other runs before sending
+    """
+
+    def __init__(
+        self,
+        token_budget: int = GRADER_BATCH_TOKEN_BUDGET,
+        max_items: int = GRADER_BATCH_MAX_ITEMS,
+        linger: float = 0.2
+    ):
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.linger = linger
+        self.requests = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def grade(self, items):
+        """Same contract as evaluate_responses_batch, sharing requests with other callers."""
+        items = list(items)
+        ledger = current_usage_ledger()
+        entries = [{"item": item, "result": None, "done": threading.Event(), "ledger": ledger} for item in items]
+        with self._lock:
+            self._pending.extend(entries)
+
+        time.sleep(self.linger)
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if pending:
+                self._flush(pending)
+
+        for entry in entries:
+            entry["done"].wait()
+        return _fill_unscored(items, [entry["result"] for entry in entries])
+
+    def _flush(self, pending) -> None:
+        try:
+            items = [entry["item"] for entry in pending]
+            for batch in plan_grading_batches(items, self.token_budget, self.max_items):
+                if len(batch) == 1:
+                    continue
+                with usage_scope() as usage:
+                    scores = _grade_batch([(index, items[index][0], items[index][1]) for index in batch])
+                self.requests += 1
+                share_usage(usage, [pending[index]["ledger"] for index in batch])
+                for index in batch:
+                    if index in scores:
+                        pending[index]["result"] = (
+                            scores[index], f"LLM batch scored => {scores[index]} ({len(batch)} items)"
+                        )
+        finally:
+            for entry in pending:
+                entry["done"].set()
+
+
+def compute_weighted_score(question_results, weights=None):
     """
-    Weighted overall score (as a percentage) from individual question scores,
-    using the category weights in config.
+    Weighted overall score (as a percentage) from individual question scores.
+    `weights` maps question_id to weight (question_registry.QuestionSet.weights);
+    questions it does not cover use the category weights in config.
     """
+    weights = weights or {}
     total_weight = 0.0
     weighted_sum = 0.0
 
     for result in question_results:
-        category = result["category"]
+        if result.get("status") == "grading_failed":
+            continue
         score = result["score"]
-        weight = CATEGORY_SECTION_WEIGHTS.get(category, 0)
+        weight = weights.get(result.get("question_id"))
+        if weight is None:
+            weight = CATEGORY_SECTION_WEIGHTS.get(result["category"], 0)
         weighted_sum += score * weight
         total_weight += weight
 
@@ -0,0 +1,323 @@
+# fast_grader.py
+
+"""
+Rule-based pre-grader that settles crisp answers without an LLM call.
+
+The "key facts" of a question are the numbers (counts, amounts, percentages)
+and names (rep IDs, company names, stages) that the main answer shares with at
+least one acceptable variant. A response is scored locally only when the
+verdict is clear:
+
+- every key fact of the main answer (or of one acceptable variant) appears in
+  one clause of the response, and the response states no other number of the
+  same kind, record ID or pipeline stage -> 1.0
+- a purely numeric answer (e.g. "Seven reps ...") whose numbers the response
+  contradicts -> 0.01
+- a response containing one of the question's wrong variants -> 0.01
+- an empty response -> 0.0
+
+Responses containing a negation, responses that state the numbers or IDs a
+wrong variant names, questions that ask for reasoning or prose (why, steps,
+recommendations, summaries, drafts, rankings) and everything else that is not
+clear-cut (partial matches, conflicting or extra facts) return None and go to
+the LLM judge. run_benchmark only uses this grader with fast_path_grading=True.
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+FAST_PATH_CORRECT = 1.0
+FAST_PATH_WRONG = 0.01
+
+_NUMBER = re.compile(
+    r"(?<![\w.])(\$)?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|m|million|thousand|%|percent)?(?![\w])",
+    re.IGNORECASE
+)
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "half a million": 500000
+}
+_NUMBER_WORD = re.compile(r"\b(" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6}
+
+# Record IDs such as EMP476bbd / EMPxyz, quoted names and capitalized words
+_IDENTIFIER = re.compile(r"\b[A-Z]{2,}[a-z0-9]\w*\b")
+_QUOTED = re.compile(r"['\"‘“]([^'\"’”]{2,40})['\"’”]")
+_CAPITALIZED = re.compile(r"\b[A-Z][A-Za-z]+\b")
+_STOPWORDS = {
+    "a", "an", "and", "any", "both", "but", "for", "it", "no", "not", "only", "the", "there", "they",
+    "this", "we", "yes", "their", "these", "those", "all", "each", "key", "next", "example"
+}
+
+_OPEN_ENDED = re.compile(
+    r"\b(why|steps?|recommend\w*|suggest\w*|explain|summari[sz]e|draft|notes|analy[sz]\w*|rank\w*|"
+    r"strateg\w*|impl(?:y|ies|ications?))\b",
+    re.IGNORECASE
+)
+
+# "not 4 deals" must not count as stating 4 deals
+_NEGATION = re.compile(
+    r"\b(not|no|never|none|neither|nor|without|instead|rather than|except|no longer|"
+    r"incorrect\w*|wrong\w*|false\w*)\b|n't\b",
+    re.IGNORECASE
+)
+
+# Pipeline stages: naming a stage that is not a key fact conflicts with the answer
+_STAGES = ("prospecting", "qualification", "proposal", "negotiation", "closed won", "closed lost")
+
+# Key facts must appear together in one of these clauses
+_CLAUSE_BREAK = re.compile(
+    r"(?<!\d)[.;!?](?!\d)|\n|\b(?:but|however|whereas|while|although|though|except|instead)\b",
+    re.IGNORECASE
+)
+
+# A response with this many more numbers than the key facts is not judged locally
+_MAX_EXTRA_NUMBERS = 6
+
+
+def extract_numbers(text: str) -> Set[Tuple[str, float]]:
+    """(kind, value) pairs: kind is "percent" or "number"; 250k and 250,000 both give 250000.0."""
+    found = set()
+    for _, digits, unit in _NUMBER.findall(text or ""):
+        value = float(digits.replace(",", ""))
+        unit = (unit or "").lower()
+        if unit in ("%", "percent"):
+            found.add(("percent", value))
+        else:
+            found.add(("number", value * _MULTIPLIERS.get(unit, 1)))
+    for word in _NUMBER_WORD.findall(text or ""):
+        found.add(("number", float(_NUMBER_WORDS[word.lower()])))
+    return found
+
+
+def extract_entities(text: str) -> Set[str]:
+    """Lower-cased identifiers, quoted names and capitalized words (minus common stopwords)."""
+    text = text or ""
+    found = {m.lower() for m in _IDENTIFIER.findall(text)}
+    found.update(m.strip().lower() for m in _QUOTED.findall(text))
+    found.update(m.lower() for m in _CAPITALIZED.findall(text))
+    return {e for e in found if e not in _STOPWORDS and e not in _NUMBER_WORDS and len(e) > 1}
+
+
+def _number_in(fact: Tuple[str, float], numbers: Set[Tuple[str, float]]) -> bool:
+    kind, value = fact
+    for other_kind, other in numbers:
+        if other_kind == kind and abs(other - value) <= max(abs(value) * 0.005, 1e-9):
+            return True
+    return False
+
+
+def _entity_in(entity: str, text_lower: str) -> bool:
+    return re.search(r"(?<!\w)" + re.escape(entity) + r"(?!\w)", text_lower) is not None
+
+
+def key_facts(correct_answer_data: Dict, question_text: str = "") -> Tuple[Set, Set]:
+    """Numbers and entities of the main answer that an acceptable variant repeats."""
+    main = correct_answer_data.get("main_answer", "")
+    acceptable = correct_answer_data.get("acceptable_variants", []) or []
+    question_numbers = extract_numbers(question_text)
+
+    variant_numbers = set()
+    variant_text = " ".join(acceptable).lower()
+    for variant in acceptable:
+        variant_numbers |= extract_numbers(variant)
+
+    numbers = {
+        n for n in extract_numbers(main)
+        if _number_in(n, variant_numbers) and not _number_in(n, question_numbers)
+    }
+    entities = {e for e in extract_entities(main) if _entity_in(e, variant_text)}
+    return numbers, entities
+
+
+def _facts_present(numbers: Set, entities: Set, response_numbers: Set, response_lower: str) -> Tuple[List, List]:
+    matched = [n for n in numbers if _number_in(n, response_numbers)]
+    matched += [e for e in entities if _entity_in(e, response_lower)]
+    missing = [n for n in numbers if not _number_in(n, response_numbers)]
+    missing += [e for e in entities if not _entity_in(e, response_lower)]
+    return matched, missing
+
+
+def _clauses(response: str) -> List[str]:
+    return [clause for clause in _CLAUSE_BREAK.split(response) if clause and clause.strip()]
+
+
+def _facts_in_one_clause(numbers: Set, entities: Set, clauses: List[str]) -> Optional[List]:
+    """The matched facts of the first clause that contains all of them, else None."""
+    for clause in clauses:
+        matched, missing = _facts_present(numbers, entities, extract_numbers(clause), clause.lower())
+        if not missing:
+            return matched
+    return None
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _wrong_variant_facts(correct_answer_data: Dict, numbers: Set, entities: Set, question_text: str) -> Tuple[Set, Set]:
+    """Numbers and record IDs that the wrong variants name and neither the key facts nor the question do."""
+    question_numbers = extract_numbers(question_text)
+    wrong_numbers, wrong_ids = set(), set()
+    for variant in correct_answer_data.get("wrong_variants", []) or []:
+        wrong_numbers |= {
+            n for n in extract_numbers(variant) if not _number_in(n, numbers) and not _number_in(n, question_numbers)
+        }
+        wrong_ids |= {m.lower() for m in _IDENTIFIER.findall(variant)} - entities
+    return wrong_numbers, wrong_ids
+
+
+def _conflicting_facts(numbers: Set, entities: Set, response: str, question_text: str) -> List:
+    """Numbers of a key fact's kind, record IDs and stages in the response that are not key facts."""
+    kinds = {kind for kind, _ in numbers}
+    question_numbers = extract_numbers(question_text)
+    conflicts = [
+        n for n in extract_numbers(response)
+        if n[0] in kinds and not _number_in(n, numbers) and not _number_in(n, question_numbers)
+    ]
+    question_ids = {m.lower() for m in _IDENTIFIER.findall(question_text)}
+    conflicts += [
+        m.lower() for m in _IDENTIFIER.findall(response)
+        if m.lower() not in entities and m.lower() not in question_ids
+    ]
+    response_lower = response.lower()
+    conflicts += [
+        stage for stage in _STAGES
+        if _entity_in(stage, response_lower) and not all(word in entities for word in stage.split())
+    ]
+    return conflicts
+
+
+# Weight of a fact that no expected answer states, relative to a missing one
+EXTRA_FACT_WEIGHT = 1.0
+
+# Capitalized words inside a sentence, e.g. the company in "the Acme renewal"
+_MID_SENTENCE_NAME = re.compile(r"(?<=[\w,)] )[A-Z][A-Za-z]+\b")
+_STAGE_WORDS = {word for stage in _STAGES for word in stage.split()}
+
+
+def _crisp_facts(text: str) -> Tuple[Set, Set]:
+    """Numbers, and lower-cased record IDs and names of `text`."""
+    text = text or ""
+    names = {m.lower() for m in _IDENTIFIER.findall(text)}
+    names |= {
+        m.lower() for m in _MID_SENTENCE_NAME.findall(text)
+        if m.lower() not in _STOPWORDS and m.lower() not in _STAGE_WORDS
+    }
+    return extract_numbers(text), names
+
+
+def fact_agreement(response: str, correct_answer_data: Dict, question_text: str = "") -> Optional[float]:
+    """
+    Agreement (0.0 to 1.0) of the response's numbers, record IDs and names
+    with the closest expected answer (main answer or acceptable variant): the
+    share of that answer's facts the response states, where every fact that
+    no expected answer states counts as EXTRA_FACT_WEIGHT of a missing fact.
+    Facts repeated from the question are ignored. None when no expected
+    answer states any such fact.
+    """
+    response = response if isinstance(response, str) else str(response or "")
+    question_numbers, question_ids = _crisp_facts(question_text)
+    answers = [correct_answer_data.get("main_answer", "")] + list(correct_answer_data.get("acceptable_variants", []) or [])
+
+    answer_facts = []
+    known_numbers, known_ids = set(question_numbers), set(question_ids)
+    for answer in answers:
+        numbers, ids = _crisp_facts(answer)
+        numbers = {n for n in numbers if not _number_in(n, question_numbers)}
+        ids -= question_ids
+        known_numbers |= numbers
+        known_ids |= ids
+        if numbers or ids:
+            answer_facts.append((numbers, ids))
+    if not answer_facts:
+        return None
+
+    response_numbers, response_ids = _crisp_facts(response)
+    extra = sum(1 for n in response_numbers if not _number_in(n, known_numbers)) + len(response_ids - known_ids)
+    best = 0.0
+    for numbers, ids in answer_facts:
+        matched = sum(1 for n in numbers if _number_in(n, response_numbers)) + len(ids & response_ids)
+        best = max(best, matched / (len(numbers) + len(ids) + EXTRA_FACT_WEIGHT * extra))
+    return best
+
+
+def _describe(facts) -> str:
+    parts = []
+    for fact in facts:
+        if isinstance(fact, tuple):
+            kind, value = fact
+            parts.append(f"{value:g}%" if kind == "percent" else f"{value:g}")
+        else:
+            parts.append(fact)
+    return ", ".join(sorted(parts))
+
+
+def pre_grade(
+    agent_response: str,
+    correct_answer_data: Dict,
+    question_text: str = ""
+) -> Optional[Tuple[float, str]]:
+    """
+    Return (score, debug_info) when the response can be graded with high
+    confidence from its numbers and names alone, otherwise None.
+    """
+    response = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+    if not response.strip():
+        return 0.0, "Fast path => 0.0 (empty response)"
+
+    if question_text and _OPEN_ENDED.search(question_text):
+        return None
+
+    numbers, entities = key_facts(correct_answer_data, question_text)
+    response_numbers = extract_numbers(response)
+    response_lower = response.lower()
+    if len(response_numbers) > len(numbers) + _MAX_EXTRA_NUMBERS or _NEGATION.search(response):
+        return None
+
+    normalized = _normalize(response)
+    for variant in correct_answer_data.get("wrong_variants", []) or []:
+        if _normalize(variant) and _normalize(variant) in normalized:
+            return FAST_PATH_WRONG, f"Fast path => {FAST_PATH_WRONG} (matches wrong variant {variant!r})"
+    wrong_numbers, wrong_ids = _wrong_variant_facts(correct_answer_data, numbers, entities, question_text)
+    if any(_number_in(n, response_numbers) for n in wrong_numbers) or any(_entity_in(e, response_lower) for e in wrong_ids):
+        return None
+
+    if len(numbers) == 1 and not entities:
+        # A single count or amount: only decide when the response states exactly one number of that kind
+        (fact,) = numbers
+        stated = {n for n in response_numbers if n[0] == fact[0]}
+        if len(stated) != 1:
+            return None
+        if _number_in(fact, stated):
+            return FAST_PATH_CORRECT, f"Fast path => {FAST_PATH_CORRECT} (matched {_describe(numbers)})"
+        return FAST_PATH_WRONG, f"Fast path => {FAST_PATH_WRONG} (stated {_describe(stated)}, expected {_describe(numbers)})"
+
+    if len(numbers) + len(entities) < 2:
+        return None
+
+    matched, missing = _facts_present(numbers, entities, response_numbers, response_lower)
+    if _conflicting_facts(numbers, entities, response, question_text):
+        # Other amounts, reps or stages next to the expected ones: let the LLM decide
+        if not matched and numbers and not entities:
+            return FAST_PATH_WRONG, f"Fast path => {FAST_PATH_WRONG} (none of {_describe(missing)} found)"
+        return None
+
+    clauses = _clauses(response)
+    clause_matched = _facts_in_one_clause(numbers, entities, clauses)
+    if clause_matched is not None:
+        return FAST_PATH_CORRECT, f"Fast path => {FAST_PATH_CORRECT} (matched {_describe(clause_matched)})"
+
+    # All facts of one acceptable variant are enough too
+    for variant in correct_answer_data.get("acceptable_variants", []) or []:
+        variant_numbers = {n for n in extract_numbers(variant) if _number_in(n, numbers)}
+        variant_entities = {e for e in entities if _entity_in(e, variant.lower())}
+        if len(variant_numbers) + len(variant_entities) < 2:
+            continue
+        variant_matched = _facts_in_one_clause(variant_numbers, variant_entities, clauses)
+        if variant_matched is not None:
+            return FAST_PATH_CORRECT, (
+                f"Fast path => {FAST_PATH_CORRECT} (matched acceptable variant: {_describe(variant_matched)})"
+            )
+
+    return None
@@ -5,12 +5,23 @@ Each CSV is intended to contain relevant data that an AI agent might need to ana
 in order to answer the questions for that set.
 
 We've minimized random clutter so the primary "trends" are obvious.
+
+Run it with `python -m crm_benchmark_lib.generate_csvs [--content auto|llm|offline]`.
+The D2 email bodies come from the OpenAI API, or from an offline phrase
+grammar when no OPENAI_API_KEY is set (or with --content offline).
+
+`--scale N` streams N filler rows per file to disk in chunks, for load tests
+on CRM-sized tables; `--format parquet` writes Parquet instead (needs pyarrow).
+Scaled D2 bodies come from the offline grammar unless `--content llm` is given.
 """
 
 import os
 import random
 import string
-from data_generation import (
+import argparse
+import functools
+from typing import Optional
+from .data_generation import (
     generate_dataset_for_d1,
     generate_dataset_for_d2,
     generate_dataset_for_d3,
@@ -22,6 +33,10 @@ from data_generation import (
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_FOLDER = os.path.join(SCRIPT_DIR, "generated_csvs")
 
+# D2 file N uses content_seed N * D2_CONTENT_SEED_STRIDE, so the five variants get
+# different email bodies and never share request seeds
+D2_CONTENT_SEED_STRIDE = 1_000_000_000
+
 def random_suffix(length=5):
     """Helper to generate a random string suffix for uniqueness."""
     return ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(length))
@@ -32,14 +47,14 @@ def ensure_output_directory():
         os.makedirs(OUTPUT_FOLDER)
         print(f"Created directory: {OUTPUT_FOLDER}")
 
-def main():
+def main(content_backend: str = "auto", scale: Optional[int] = None, file_format: str = "csv"):
     """Generate 5 variations of each dataset (D1-D5)."""
     ensure_output_directory()
     
     # Generator functions for each dataset
     generators = {
         'D1': generate_dataset_for_d1,
-        'D2': generate_dataset_for_d2,
+        'D2': functools.partial(generate_dataset_for_d2, content_backend=content_backend),
         'D3': generate_dataset_for_d3,
         'D4': generate_dataset_for_d4,
         'D5': generate_dataset_for_d5
@@ -50,16 +65,30 @@ def main():
         for file_index in range(1, 6):
             # Create a unique filename with random suffix
             suffix = random_suffix()
-            filename = f"{dataset_name}_file{file_index}_{suffix}.csv"
+            filename = f"{dataset_name}_file{file_index}_{suffix}.{file_format}"
             filepath = os.path.join(OUTPUT_FOLDER, filename)
             
+            extra = {"content_seed": file_index * D2_CONTENT_SEED_STRIDE} if dataset_name == "D2" else {}
             try:
                 # Generate the dataset with the specific output path
-                df = generator_func(csv_path=filepath)
+                if scale is None:
+                    df = generator_func(csv_path=filepath, **extra)
+                else:
+                    generator_func(csv_path=filepath, scale=scale, seed=file_index, **extra)
                 print(f"Generated: {filepath}")
             except Exception as e:
                 print(f"Error generating {dataset_name} dataset: {e}")
                 continue
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate the benchmark CSVs")
+    parser.add_argument("--content", choices=["auto", "llm", "offline"], default="auto",
+                        help="Source of the D2 email bodies (default: offline without OPENAI_API_KEY or with --scale)")
+    parser.add_argument("--scale", type=int, default=None,
+                        help="Filler rows per file, streamed to disk in chunks (default: the small built-in sizes)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Output format; parquet needs pyarrow and requires --scale")
+    args = parser.parse_args()
+    if args.format == "parquet" and args.scale is None:
+        parser.error("--format parquet requires --scale")
+    main(content_backend=args.content, scale=args.scale, file_format=args.format)
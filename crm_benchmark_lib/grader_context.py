@@ -0,0 +1,258 @@
+# grader_context.py
+
+"""
+Token-budgeted CSV context for the LLM grader.
+
+The evaluator prompt has room for "CSV Data (for context)", but a whole CSV
+(D2 has ~2,400 lines) would multiply grader tokens and latency. A
+GraderContextBuilder compacts the run's DataFrame into a bounded context per
+response:
+
+  - a schema summary (row count, per-column type, distinct count and examples),
+  - the columns the question, the expected answer or the response refer to,
+  - the rows containing names or numbers mentioned in the response or the
+    expected answer, most matches first, as many as the budget allows.
+
+Overlong agent responses are cut to their head and tail. The builder keeps
+count of the tokens that the compacted prompts saved compared with sending
+the full CSV and response.
+
+Usage:
+```python
+results = client.run_full_benchmark(agent_callable=my_agent, grader_context=True)
+results["grader_context"]     # {"prompts": 80, "full_tokens": 1450210, "sent_tokens": 98544, ...}
+```
+"""
+
+import io
+import re
+import csv
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .fast_grader import extract_entities, extract_numbers
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+# Approximate tokens of CSV context per grader prompt, and of the agent response
+GRADER_CONTEXT_TOKEN_BUDGET = 1500
+GRADER_RESPONSE_TOKEN_LIMIT = 1000
+
+_SCHEMA_EXAMPLES = 3
+_EXAMPLE_CHARS = 40
+_WORD = re.compile(r"[a-z]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), as used for grader batches."""
+    return len(text) // 4 + 1
+
+
+def truncate_response(agent_response: Any, token_limit: int = GRADER_RESPONSE_TOKEN_LIMIT) -> str:
+    """Keep the head and tail of a response longer than `token_limit`, marking the cut."""
+    text = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+    limit = token_limit * 4
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    return f"{text[:head]}\n[... {len(text) - limit} characters omitted ...]\n{text[-tail:]}"
+
+
+def _words(text: str) -> Set[str]:
+    """Lower-cased words, also without a plural "s"."""
+    words = set(_WORD.findall(text.lower()))
+    return words | {w[:-1] for w in words if w.endswith("s") and len(w) > 3}
+
+
+def _column_words(column: str) -> Set[str]:
+    parts = re.sub(r"([a-z])([A-Z])", r"\1 \2", str(column)).lower()
+    return {p for p in _WORD.findall(parts) if len(p) > 2}
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(values)
+    return buffer.getvalue()
+
+
+@dataclass
+class GraderContext:
+    """Compacted grader input for one response."""
+
+    csv_data: str
+    agent_response: str
+    full_tokens: int
+    sent_tokens: int
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the context, for cache keys."""
+        return hashlib.sha256(self.csv_data.encode("utf-8")).hexdigest()[:16]
+
+
+class GraderContextBuilder:
+    """
+    Builds GraderContexts from one DataFrame and accumulates token savings.
+    Safe to share between threads.
+
+    Args:
+        df: The run's CSV data
+        token_budget: Approximate tokens of CSV context per prompt
+        response_token_limit: Longer agent responses are truncated to this many tokens
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        token_budget: int = GRADER_CONTEXT_TOKEN_BUDGET,
+        response_token_limit: int = GRADER_RESPONSE_TOKEN_LIMIT
+    ):
+        self.df = df
+        self.token_budget = token_budget
+        self.response_token_limit = response_token_limit
+        self._lock = threading.Lock()
+        self._prepared = False
+        self._text: Dict[str, pd.Series] = {}
+        self._numeric: Dict[str, pd.Series] = {}
+        self._schema: List[str] = []
+        self._full_csv_tokens = 0
+        self.prompts = 0
+        self.full_tokens = 0
+        self.sent_tokens = 0
+
+    def _prepare(self) -> None:
+        with self._lock:
+            if self._prepared:
+                return
+            df = self.df
+            self._full_csv_tokens = estimate_tokens(df.to_csv(index=False))
+            self._schema = [f"Table: {len(df)} rows x {len(df.columns)} columns"]
+            for column in df.columns:
+                series = df[column]
+                if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                    self._numeric[column] = series
+                    values = series.dropna()
+                    detail = f"range {values.min():g} to {values.max():g}" if len(values) else "empty"
+                else:
+                    self._text[column] = series.astype(str).str.lower()
+                    examples = [str(v)[:_EXAMPLE_CHARS] for v in series.dropna().unique()[:_SCHEMA_EXAMPLES]]
+                    detail = "e.g. " + ", ".join(examples) if examples else "empty"
+                self._schema.append(
+                    f"- {column} ({series.dtype}, {series.nunique()} distinct): {detail}"
+                )
+            self._prepared = True
+
+    def _matching_rows(self, entities: Set[str], numbers: Set[float]) -> Tuple[pd.Series, Set[str]]:
+        """Number of mentioned names / numbers found in each row, and the columns they were found in."""
+        hits = pd.Series(0, index=self.df.index)
+        columns = set()
+        for column, values in self._text.items():
+            for entity in entities:
+                found = values.str.contains(entity, regex=False)
+                if found.any():
+                    hits += found.astype(int)
+                    columns.add(column)
+        if numbers:
+            for column, values in self._numeric.items():
+                found = values.isin(numbers)
+                if found.any():
+                    hits += found.astype(int)
+                    columns.add(column)
+        return hits, columns
+
+    def _relevant_columns(self, words: Set[str], matched_columns: Set[str]) -> List[str]:
+        columns = [c for c in self.df.columns if c in matched_columns or _column_words(c) & words]
+        # The first column usually names the record (deal, thread, rep)
+        if len(self.df.columns) and self.df.columns[0] not in columns:
+            columns.insert(0, self.df.columns[0])
+        return columns if len(columns) > 1 else list(self.df.columns)
+
+    def build(self, question_text: str, agent_response: Any, correct_answer_data: dict) -> GraderContext:
+        """Compact context and (possibly truncated) response for one grading prompt."""
+        if not self._prepared:
+            self._prepare()
+        response = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+        sent_response = truncate_response(response, self.response_token_limit)
+        main_answer = correct_answer_data.get("main_answer", "")
+
+        mentioned = f"{sent_response}\n{main_answer}"
+        entities = {e for e in extract_entities(mentioned) if len(e) > 2}
+        numbers = {value for _, value in extract_numbers(mentioned)}
+        words = _words(f"{question_text}\n{mentioned}")
+
+        lines = list(self._schema)
+        hits, matched_columns = self._matching_rows(entities, numbers)
+        matched = hits[hits > 0].sort_values(ascending=False, kind="stable")
+        if len(matched):
+            rows = self.df.loc[matched.index]
+            columns = self._relevant_columns(words, matched_columns)
+            lines.append(f"Rows mentioning the response's or answer's names/numbers ({len(matched)} found):")
+            lines.append(_csv_line(columns))
+            used = estimate_tokens("\n".join(lines))
+            shown = 0
+            for row in rows[columns].itertuples(index=False):
+                line = _csv_line("" if pd.isna(v) else v for v in row)
+                cost = estimate_tokens(line)
+                if used + cost > self.token_budget:
+                    break
+                lines.append(line)
+                used += cost
+                shown += 1
+            if shown < len(matched):
+                lines.append(f"[... {len(matched) - shown} more matching rows omitted ...]")
+
+        csv_data = "\n".join(lines)
+        if estimate_tokens(csv_data) > self.token_budget:
+            csv_data = csv_data[:self.token_budget * 4] + "\n[... truncated ...]"
+
+        return GraderContext(
+            csv_data=csv_data,
+            agent_response=sent_response,
+            full_tokens=self._full_csv_tokens + estimate_tokens(response),
+            sent_tokens=estimate_tokens(csv_data) + estimate_tokens(sent_response)
+        )
+
+    def record(self, context: GraderContext) -> None:
+        """Count a context that was actually sent to the grader."""
+        with self._lock:
+            self.prompts += 1
+            self.full_tokens += context.full_tokens
+            self.sent_tokens += context.sent_tokens
+
+    def truncate(self, agent_response: Any) -> str:
+        """
+        truncate_response for prompts without CSV context (batched grading);
+        counts the tokens saved.
+        """
+        response = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+        sent_response = truncate_response(response, self.response_token_limit)
+        with self._lock:
+            self.prompts += 1
+            self.full_tokens += estimate_tokens(response)
+            self.sent_tokens += estimate_tokens(sent_response)
+        return sent_response
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "full_tokens": self.full_tokens,
+                "sent_tokens": self.sent_tokens,
+                "tokens_saved": self.full_tokens - self.sent_tokens
+            }
+
+
+def merge_context_stats(stats: List[Optional[Dict[str, int]]]) -> Dict[str, int]:
+    """Add up GraderContextBuilder.stats() results (e.g. over CSVs)."""
+    merged = {"prompts": 0, "full_tokens": 0, "sent_tokens": 0, "tokens_saved": 0}
+    for entry in stats:
+        for key in merged:
+            merged[key] += (entry or {}).get(key, 0)
+    return merged
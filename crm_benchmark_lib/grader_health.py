@@ -0,0 +1,97 @@
+# grader_health.py
+
+"""
+Retries and a circuit breaker for grader requests, built on retries.py.
+
+Transient grader errors (rate limits, 5xx, timeouts, dropped connections) are
+retried. The delay is the server's Retry-After when it sends one, otherwise
+exponential backoff with full jitter. After `failure_threshold` consecutive
+transient failures the circuit opens. Grader calls then wait for it to close
+instead of failing one after another, and run_benchmark stops asking the
+agent new questions until the grader recovers. A call that still fails after
+its retries, or that has waited GRADER_OUTAGE_TIMEOUT on an open circuit, is
+given up. The question is recorded with status "grading_failed" and left out
+of the score.
+
+The breaker is shared by every grader call in the process (see
+`grader_breaker`):
+
+```python
+from crm_benchmark_lib.grader_health import grader_breaker
+
+grader_breaker.stats()     # {"state": "closed", "trips": 0, "consecutive_failures": 0, ...}
+```
+"""
+
+from typing import Any, Awaitable, Callable, Optional
+
+from . import retries
+from .retries import CircuitBreaker, ServiceUnavailableError, is_transient, retry_after
+
+# is_transient and retry_after are re-exported for grader code
+__all__ = [
+    "GRADER_MAX_RETRIES", "GRADER_BACKOFF_BASE", "GRADER_BACKOFF_MAX", "GRADER_OUTAGE_TIMEOUT",
+    "GraderUnavailableError", "GraderCircuitBreaker", "grader_breaker", "backoff_delay",
+    "call_with_retries", "call_with_retries_async", "is_transient", "retry_after"
+]
+
+GRADER_MAX_RETRIES = 4
+GRADER_BACKOFF_BASE = 1.0
+GRADER_BACKOFF_MAX = 60.0
+# Longest a call (or the agent loop) waits for an open circuit to close
+GRADER_OUTAGE_TIMEOUT = 600.0
+
+
+class GraderUnavailableError(ServiceUnavailableError):
+    """The grader stayed unhealthy for longer than the outage timeout."""
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None) -> float:
+    """retries.backoff_delay with the GRADER_* settings."""
+    return retries.backoff_delay(attempt, error, GRADER_BACKOFF_BASE, GRADER_BACKOFF_MAX, GRADER_OUTAGE_TIMEOUT)
+
+
+class GraderCircuitBreaker(CircuitBreaker):
+    """
+    retries.CircuitBreaker for the grader: waits default to
+    GRADER_OUTAGE_TIMEOUT.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_reset_timeout: float = 300.0):
+        super().__init__(failure_threshold, reset_timeout, max_reset_timeout, label="Grader")
+
+    def wait_until_healthy(self, timeout: Optional[float] = None, probe: bool = False) -> bool:
+        return super().wait_until_healthy(GRADER_OUTAGE_TIMEOUT if timeout is None else timeout, probe)
+
+    async def wait_until_healthy_async(self, timeout: Optional[float] = None, probe: bool = False) -> bool:
+        return await super().wait_until_healthy_async(GRADER_OUTAGE_TIMEOUT if timeout is None else timeout, probe)
+
+
+# Shared by all grader calls of the process
+grader_breaker = GraderCircuitBreaker()
+
+
+def _settings() -> dict:
+    return {
+        "max_retries": GRADER_MAX_RETRIES,
+        "backoff_base": GRADER_BACKOFF_BASE,
+        "backoff_max": GRADER_BACKOFF_MAX,
+        "outage_timeout": GRADER_OUTAGE_TIMEOUT,
+        "unavailable_error": GraderUnavailableError
+    }
+
+
+def call_with_retries(func: Callable[[], Any], breaker: Optional[CircuitBreaker] = None) -> Any:
+    """
+    Call `func()` with retries on transient errors, waiting out an open
+    circuit first. Raises the last error (or GraderUnavailableError) when
+    giving up.
+    """
+    return retries.call_with_retries(func, breaker or grader_breaker, **_settings())
+
+
+async def call_with_retries_async(
+    func: Callable[[], Awaitable[Any]], breaker: Optional[CircuitBreaker] = None
+) -> Any:
+    """Asynchronous call_with_retries for a coroutine function."""
+    return await retries.call_with_retries_async(func, breaker or grader_breaker, **_settings())
@@ -0,0 +1,416 @@
+# graders.py
+
+"""
+Grader backends.
+
+run_benchmark (and, through their keyword arguments, the clients) accept a
+`grader`: either a GraderBackend instance or one of the names in GRADERS.
+
+- OpenAIGrader ("openai", the default) is the LLM judge in evaluator.py.
+- SimilarityGrader ("similarity") is a fully offline grader: TF-IDF cosine
+  similarity of the response to `main_answer` / `acceptable_variants`, minus a
+  penalty for similarity to `wrong_variants`. It needs no network access or
+  API key and grades in well under a millisecond, which makes it suitable for
+  local iteration, CI and load tests. Its scores only approximate the LLM's.
+- CascadeGrader ("cascade") grades with a cheap backend first and escalates
+  only borderline scores to an expensive one (by default similarity -> LLM).
+
+Usage:
+```python
+results = client.run_full_benchmark(agent_callable=my_agent, grader="similarity")
+```
+
+A custom backend subclasses GraderBackend and implements grade(); it gets the
+same fast path, caching and batching as the built-in ones.
+"""
+
+import os
+import re
+import glob
+import json
+import math
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .fast_grader import fact_agreement
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+_QUESTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_questions")
+
+
+class GraderBackend:
+    """
+    Interface of a grader backend.
+
+    Attributes:
+        name: Tier recorded in each question's "grader_tier"
+        version: Part of the grading cache key; change it when scores would change
+        batch_version: Cache key part of grade_batch verdicts (`version` unless
+            batches are graded differently)
+        cacheable: Whether verdicts are worth storing in a GradingCache
+        uses_openai: Whether grading calls the OpenAI API; only then does
+            run_benchmark wait for the shared grader circuit breaker
+    """
+
+    name = "custom"
+    version = "1"
+    cacheable = True
+    uses_openai = False
+
+    @property
+    def batch_version(self) -> str:
+        return self.version
+
+    def grade(
+        self, agent_response: str, correct_answer_data: dict, question_text: str = "", csv_data: str = ""
+    ) -> Tuple[float, str]:
+        """
+        Return (score between 0.0 and 1.0, debug_info). `csv_data` is the
+        compacted CSV context (grader_context.py) when the run asks for one.
+        """
+        raise NotImplementedError
+
+    async def grade_async(
+        self, agent_response: str, correct_answer_data: dict, question_text: str = "", csv_data: str = ""
+    ) -> Tuple[float, str]:
+        """Asynchronous grade(); by default runs grade() in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.grade, agent_response, correct_answer_data, question_text, csv_data
+        )
+
+    def grade_batch(self, items: List[Tuple[str, dict]]) -> List[Tuple[float, str]]:
+        """Grade (agent_response, correct_answer_data) pairs; by default one by one."""
+        return [self.grade(agent_response, correct_answer_data) for agent_response, correct_answer_data in items]
+
+    # The *_tiered variants also return the tier that decided; run_benchmark uses them
+    def grade_tiered(self, agent_response, correct_answer_data, question_text="", csv_data="") -> Tuple[float, str, str]:
+        score, debug_info = self.grade(agent_response, correct_answer_data, question_text, csv_data)
+        return score, debug_info, self.name
+
+    async def grade_tiered_async(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        score, debug_info = await self.grade_async(agent_response, correct_answer_data, question_text, csv_data)
+        return score, debug_info, self.name
+
+    def grade_batch_tiered(self, items, grade_batch=None) -> List[Tuple[float, str, str]]:
+        """
+        grade_batch with tiers. `grade_batch(backend, items)` may replace the
+        backend's own batch call (run_benchmark uses it to share a GradingBatcher).
+        """
+        graded = grade_batch(self, items) if grade_batch is not None else self.grade_batch(items)
+        return [(score, debug_info, self.name) for score, debug_info in graded]
+
+
+class OpenAIGrader(GraderBackend):
+    """
+    The LLM judge with its batched and async variants.
+
+    Args:
+        model: Grader model; defaults to evaluator.GRADER_MODEL. Other models
+            are recorded as tier "llm:<model>"
+    """
+
+    name = "llm"
+    cacheable = True
+    uses_openai = True
+
+    def __init__(self, model: Optional[str] = None):
+        from .evaluator import GRADER_MODEL, GRADER_PROMPT_VERSION
+        self.model = model if model and model != GRADER_MODEL else None
+        if self.model is not None:
+            self.name = f"llm:{self.model}"
+        self.version = f"{self.model or GRADER_MODEL}:{GRADER_PROMPT_VERSION}"
+
+    @property
+    def batch_version(self) -> str:
+        # Batch verdicts come from their own prompt: never mix them with single ones in the cache
+        from .evaluator import GRADER_BATCH_PROMPT_VERSION
+        return f"{self.version}:batch-{GRADER_BATCH_PROMPT_VERSION}"
+
+    def grade(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        from .evaluator import evaluate_response_with_variants
+        return evaluate_response_with_variants(agent_response, correct_answer_data, csv_data=csv_data, model=self.model)
+
+    async def grade_async(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        from .evaluator import evaluate_response_with_variants_async
+        return await evaluate_response_with_variants_async(
+            agent_response, correct_answer_data, csv_data=csv_data, model=self.model
+        )
+
+    def grade_batch(self, items):
+        from .evaluator import evaluate_responses_batch
+        return evaluate_responses_batch(items, model=self.model)
+
+
+# ------------------------------------------------------------------------
+# Offline TF-IDF grader
+# ------------------------------------------------------------------------
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the their there these this "
+    "those to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word and number tokens; thousands separators are dropped (250,000 -> 250000)."""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        if token[0].isdigit():
+            token = token.replace(",", "")
+        if token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _answer_texts(correct_answer_data: dict) -> List[str]:
+    texts = [correct_answer_data.get("main_answer", "")]
+    texts += correct_answer_data.get("acceptable_variants", []) or []
+    texts += correct_answer_data.get("wrong_variants", []) or []
+    return [t for t in texts if t]
+
+
+def _bundled_corpus() -> List[str]:
+    """Every main / acceptable / wrong answer text of the bundled question sets."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(_QUESTIONS_DIR, "dataset_*_questions.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for question in json.load(f):
+                texts.extend(_answer_texts(question.get("correct_answer", {})))
+    return texts
+
+
+# Calibrated defaults of SimilarityGrader
+SIMILARITY_FULL_CREDIT = 0.2
+SIMILARITY_ZERO_POINT = 0.0
+SIMILARITY_FACT_WEIGHT = 1.0
+SIMILARITY_QUESTION_WEIGHT = 0.3
+
+
+class SimilarityGrader(GraderBackend):
+    """
+    Offline grader based on TF-IDF cosine similarity.
+
+    score = scale(max similarity to the main / acceptable answers
+                  - wrong_penalty * max similarity to the wrong variants)
+            * (1 - fact_weight * (1 - fact agreement))
+
+    where scale maps [zero_point, full_credit] linearly onto [0.00, 1.00]
+    (at least 0.01 overall) and the fact agreement
+    (fast_grader.fact_agreement) compares the numbers, record IDs and names
+    of the response with those of the expected answers. Words of
+    the question count `question_weight` times as much, so echoing the
+    question earns little. The defaults are calibrated on the bundled question
+    sets: reference answers (graded leave-one-out) against the same answers
+    with altered numbers, IDs and names, echoed questions and other questions'
+    answers. The scores are still only an approximation of the LLM judge and
+    are not comparable with LLM-graded runs.
+
+    Args:
+        corpus: Texts to compute document frequencies from; defaults to every
+            answer text of the bundled question sets
+        wrong_penalty: Weight of the similarity to the closest wrong variant
+        full_credit: Adjusted similarity that earns 1.00
+        zero_point: Adjusted similarity at or below which the score is 0.01
+        fact_weight: Share of the score that depends on matching numbers, IDs and names
+        question_weight: Weight of the question's own words
+    """
+
+    name = "similarity"
+    cacheable = False
+
+    def __init__(
+        self,
+        corpus: Optional[List[str]] = None,
+        wrong_penalty: float = 0.5,
+        full_credit: float = SIMILARITY_FULL_CREDIT,
+        zero_point: float = SIMILARITY_ZERO_POINT,
+        fact_weight: float = SIMILARITY_FACT_WEIGHT,
+        question_weight: float = SIMILARITY_QUESTION_WEIGHT
+    ):
+        self.wrong_penalty = wrong_penalty
+        self.full_credit = full_credit
+        self.zero_point = zero_point
+        self.fact_weight = fact_weight
+        self.question_weight = question_weight
+        self.version = f"tfidf:{wrong_penalty}:{full_credit}:{zero_point}:{fact_weight}:{question_weight}"
+        self._corpus = corpus
+        self._idf: Optional[Dict[str, float]] = None
+        self._default_idf = 1.0
+        self._lock = threading.Lock()
+
+    def _fit(self) -> None:
+        with self._lock:
+            if self._idf is not None:
+                return
+            corpus = self._corpus if self._corpus is not None else _bundled_corpus()
+            document_frequency = Counter()
+            for text in corpus:
+                document_frequency.update(set(tokenize(text)))
+            documents = max(len(corpus), 1)
+            # Smoothed idf; unseen tokens are treated as the rarest ones
+            self._default_idf = math.log((1 + documents) / 1) + 1
+            self._idf = {
+                token: math.log((1 + documents) / (1 + count)) + 1
+                for token, count in document_frequency.items()
+            }
+
+    def _vectors(self, texts: List[str], question_tokens=frozenset()) -> np.ndarray:
+        """L2-normalized TF-IDF rows of `texts` over their joint vocabulary; question words weigh less."""
+        token_lists = [tokenize(text) for text in texts]
+        vocabulary = {token: i for i, token in enumerate(sorted({t for tokens in token_lists for t in tokens}))}
+        matrix = np.zeros((len(texts), max(len(vocabulary), 1)))
+        for row, tokens in enumerate(token_lists):
+            for token, count in Counter(tokens).items():
+                weight = self.question_weight if token in question_tokens else 1.0
+                matrix[row, vocabulary[token]] = (1 + math.log(count)) * self._idf.get(token, self._default_idf) * weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def grade(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        response = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+        if not tokenize(response):
+            return 0.0, "Similarity => 0.0 (empty response)"
+        if self._idf is None:
+            self._fit()
+
+        positives = [correct_answer_data.get("main_answer", "")]
+        positives += correct_answer_data.get("acceptable_variants", []) or []
+        negatives = correct_answer_data.get("wrong_variants", []) or []
+
+        vectors = self._vectors([response] + positives + negatives, frozenset(tokenize(question_text)))
+        similarities = vectors[1:] @ vectors[0]
+        positive = float(similarities[:len(positives)].max())
+        negative = float(similarities[len(positives):].max()) if negatives else 0.0
+
+        adjusted = positive - self.wrong_penalty * negative
+        fraction = min(max((adjusted - self.zero_point) / (self.full_credit - self.zero_point), 0.0), 1.0)
+        facts = fact_agreement(response, correct_answer_data, question_text)
+        if facts is not None:
+            # Wrong or missing numbers and IDs cap the score however similar the wording
+            fraction *= 1.0 - self.fact_weight * (1.0 - facts)
+        score = round(max(fraction, 0.01), 2)
+        facts_info = "" if facts is None else f", facts {facts:.2f}"
+        return score, f"Similarity => {score} (answer {positive:.2f}, wrong {negative:.2f}{facts_info})"
+
+    async def grade_async(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        # Fast enough to run on the event loop
+        return self.grade(agent_response, correct_answer_data, question_text, csv_data)
+
+
+# ------------------------------------------------------------------------
+# Cascade
+# ------------------------------------------------------------------------
+CASCADE_BAND = (0.2, 0.8)
+
+
+class CascadeGrader(GraderBackend):
+    """
+    Grades with a cheap backend first and re-grades only uncertain verdicts
+    with the expensive one: scores inside `band`, and scores above it whose
+    response does not state all numbers, record IDs and names of an expected
+    answer (fast_grader.fact_agreement below 1.0), since a confident first
+    tier can still be wrong. Each verdict's tier is the backend that decided
+    it, and run_benchmark reports the share that was escalated
+    ("escalation_rate" in "grading").
+
+    Args:
+        first: Cheap backend (or name); defaults to the offline SimilarityGrader
+        second: Expensive backend (or name); defaults to the OpenAI LLM judge
+        band: Inclusive (low, high) score range that is escalated
+    """
+
+    name = "cascade"
+
+    def __init__(
+        self,
+        first: Union[None, str, GraderBackend] = "similarity",
+        second: Union[None, str, GraderBackend] = None,
+        band: Tuple[float, float] = CASCADE_BAND
+    ):
+        self.first = get_grader(first)
+        self.second = get_grader(second)
+        if self.first.name == self.second.name:
+            raise ValueError(f"Cascade tiers need distinct names, got {self.first.name!r} twice")
+        self.band = band
+        self.cacheable = self.second.cacheable
+        self.uses_openai = self.first.uses_openai or self.second.uses_openai
+        self.version = f"cascade({self.first.version}|{self.second.version}|{band[0]}-{band[1]}|facts)"
+
+    @property
+    def batch_version(self) -> str:
+        return f"cascade({self.first.batch_version}|{self.second.batch_version}|{self.band[0]}-{self.band[1]}|facts)"
+
+    @property
+    def escalation_tier(self) -> str:
+        return self.second.name
+
+    def escalate(self, score: float, agent_response="", correct_answer_data=None, question_text="") -> bool:
+        if self.band[0] <= score <= self.band[1]:
+            return True
+        if score > self.band[1] and correct_answer_data:
+            facts = fact_agreement(agent_response, correct_answer_data, question_text)
+            return facts is not None and facts < 1.0
+        return False
+
+    def grade(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        return self.grade_tiered(agent_response, correct_answer_data, question_text, csv_data)[:2]
+
+    async def grade_async(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        return (await self.grade_tiered_async(agent_response, correct_answer_data, question_text, csv_data))[:2]
+
+    def grade_batch(self, items):
+        return [verdict[:2] for verdict in self.grade_batch_tiered(items)]
+
+    def grade_tiered(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        score, debug_info = self.first.grade(agent_response, correct_answer_data, question_text, csv_data)
+        if not self.escalate(score, agent_response, correct_answer_data, question_text):
+            return score, debug_info, self.first.name
+        score, debug_info = self.second.grade(agent_response, correct_answer_data, question_text, csv_data)
+        return score, debug_info, self.second.name
+
+    async def grade_tiered_async(self, agent_response, correct_answer_data, question_text="", csv_data=""):
+        score, debug_info = await self.first.grade_async(agent_response, correct_answer_data, question_text, csv_data)
+        if not self.escalate(score, agent_response, correct_answer_data, question_text):
+            return score, debug_info, self.first.name
+        score, debug_info = await self.second.grade_async(agent_response, correct_answer_data, question_text, csv_data)
+        return score, debug_info, self.second.name
+
+    def grade_batch_tiered(self, items, grade_batch=None):
+        items = list(items)
+        verdicts = self.first.grade_batch_tiered(items, grade_batch)
+        escalated = [
+            index for index, (score, _, _) in enumerate(verdicts)
+            if self.escalate(score, *items[index][:2])
+        ]
+        if escalated:
+            regraded = self.second.grade_batch_tiered([items[index] for index in escalated], grade_batch)
+            for index, verdict in zip(escalated, regraded):
+                verdicts[index] = verdict
+        return verdicts
+
+
+GRADERS = {
+    "openai": OpenAIGrader,
+    "similarity": SimilarityGrader,
+    "cascade": CascadeGrader,
+}
+
+
+def get_grader(grader: Union[None, str, GraderBackend]) -> GraderBackend:
+    """Resolve the `grader` argument of run_benchmark: None (OpenAI), a name in GRADERS or a backend."""
+    if grader is None:
+        return OpenAIGrader()
+    if isinstance(grader, str):
+        if grader not in GRADERS:
+            raise ValueError(f"Unknown grader {grader!r}; expected one of {sorted(GRADERS)}")
+        return GRADERS[grader]()
+    return grader
@@ -0,0 +1,317 @@
+# grading_cache.py
+
+"""
+Persistent cache of grader verdicts.
+
+Deterministic agents give the same answers run after run and across the CSV
+variants of a dataset, so most LLM grading calls repeat an earlier one. The
+cache stores each verdict in a SQLite file keyed by
+
+  - the question's content hash (question_registry.question_hash: id, text,
+    category and `correct_answer` data),
+  - the grader model and prompt version (evaluator.GRADER_MODEL /
+    GRADER_PROMPT_VERSION), so a grader change starts from an empty cache;
+    batched grading has its own prompt and key (GraderBackend.batch_version),
+  - the normalized response (whitespace collapsed, case-folded).
+
+Concurrent requests for the same key wait for a single in-flight grader call;
+if that call fails, each waiter grades on its own.
+The file is bounded to `max_entries` rows; the least recently used verdicts
+are evicted first.
+
+Usage:
+```python
+cache = GradingCache("grading_cache.db")
+results = client.run_full_benchmark(agent_callable=my_agent, grading_cache=cache)
+results["grading"]            # {"llm": 12, "cache": 118, "cache_hit_rate": 0.9077, ...}
+```
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .question_registry import question_hash
+from .evaluator import GRADING_FAILED_PREFIX
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    question_id TEXT,
+    score REAL NOT NULL,
+    debug_info TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts (last_used);
+"""
+
+# Verdicts with these debug prefixes describe a failed grader call, not the answer
+_UNCACHEABLE_PREFIXES = (GRADING_FAILED_PREFIX, "Failed to parse")
+# Handed to coalesced waiters instead of such a verdict: each waiter grades on its own
+_REGRADE = object()
+
+
+def _cacheable(debug_info: Any) -> bool:
+    return not str(debug_info).startswith(_UNCACHEABLE_PREFIXES)
+
+
+def normalize_response(agent_response: Any) -> str:
+    """Collapse whitespace and case-fold, so trivially different answers share a verdict."""
+    text = agent_response if isinstance(agent_response, str) else str(agent_response or "")
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(question: Dict[str, Any], agent_response: Any, grader_version: str) -> str:
+    """SHA-256 over the question's content hash, grader version and normalized response."""
+    material = "\x1f".join((
+        question_hash(question),
+        grader_version,
+        normalize_response(agent_response)
+    ))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class GradingCache:
+    """
+    SQLite-backed LRU cache of (score, debug_info) grader verdicts. Safe to
+    share between threads; several processes may use the same file.
+
+    Args:
+        path: SQLite file to store verdicts in
+        max_entries: Number of verdicts kept; the least recently used are evicted
+        grader_version: Part of every key; defaults to the evaluator's model and prompt version
+    """
+
+    def __init__(
+        self,
+        path: str = "crm_bench_grading_cache.db",
+        max_entries: int = 100_000,
+        grader_version: Optional[str] = None
+    ):
+        if grader_version is None:
+            from .evaluator import GRADER_MODEL, GRADER_PROMPT_VERSION
+            grader_version = f"{GRADER_MODEL}:{GRADER_PROMPT_VERSION}"
+
+        self.path = path
+        self.max_entries = max_entries
+        self.grader_version = grader_version
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_async: Dict[str, "asyncio.Future"] = {}
+        self._inflight_lock = threading.Lock()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def key(self, question: Dict[str, Any], agent_response: Any, grader_version: Optional[str] = None) -> str:
+        """Cache key; `grader_version` overrides the cache's default (e.g. for another grader backend)."""
+        return cache_key(question, agent_response, grader_version or self.grader_version)
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        """Cached verdict for `key` (marking it recently used), or None."""
+        with self._db_lock:
+            row = self._conn.execute("SELECT score, debug_info FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        return (row[0], row[1]) if row is not None else None
+
+    def put(self, key: str, question_id: Optional[str], score: float, debug_info: str) -> None:
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (key, question_id, score, debug_info, time.time())
+            )
+            self._size += cursor.rowcount
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Recount first: other processes may share the file
+        self._size = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._size -= excess
+
+    def lookup(
+        self, question: Dict[str, Any], agent_response: Any, grader_version: Optional[str] = None
+    ) -> Optional[Tuple[float, str]]:
+        """Cached verdict for a response, counted as a hit or miss (no coalescing)."""
+        verdict = self.get(self.key(question, agent_response, grader_version))
+        with self._inflight_lock:
+            if verdict is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return verdict
+
+    def store(
+        self,
+        question: Dict[str, Any],
+        agent_response: Any,
+        score: float,
+        debug_info: str,
+        grader_version: Optional[str] = None
+    ) -> None:
+        """Save a verdict obtained outside grade(), e.g. from batched grading."""
+        if not _cacheable(debug_info):
+            return
+        try:
+            key = self.key(question, agent_response, grader_version)
+            self.put(key, question.get("question_id"), score, debug_info)
+        except sqlite3.Error as e:
+            logger.error(f"Could not store grading verdict: {e}")
+
+    def _uncoalesce(self) -> None:
+        """A coalesced lookup whose owner's grader call failed turns into a miss."""
+        with self._inflight_lock:
+            self.coalesced -= 1
+            self.misses += 1
+
+    def grade(
+        self,
+        question: Dict[str, Any],
+        agent_response: Any,
+        grade_fn: Callable[[], Tuple[float, str]],
+        grader_version: Optional[str] = None
+    ) -> Tuple[float, str, bool]:
+        """
+        Return (score, debug_info, from_cache). On a miss `grade_fn()` is called
+        once per key, even when several threads ask for it at the same time.
+        If that call fails (an uncacheable verdict), every waiting thread calls
+        `grade_fn()` itself instead of sharing the failure.
+        """
+        key = self.key(question, agent_response, grader_version)
+        verdict = self.get(key)
+        if verdict is not None:
+            with self._inflight_lock:
+                self.hits += 1
+            return verdict[0], verdict[1], True
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            verdict = future.result()
+            if verdict is not _REGRADE:
+                return verdict[0], verdict[1], True
+            self._uncoalesce()
+            score, debug_info = grade_fn()
+            self.store(question, agent_response, score, debug_info, grader_version)
+            return score, debug_info, False
+
+        try:
+            score, debug_info = grade_fn()
+            self.store(question, agent_response, score, debug_info, grader_version)
+            future.set_result((score, debug_info) if _cacheable(debug_info) else _REGRADE)
+            return score, debug_info, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    async def grade_async(
+        self,
+        question: Dict[str, Any],
+        agent_response: Any,
+        grade_fn: Callable[[], Awaitable[Tuple[float, str]]],
+        grader_version: Optional[str] = None
+    ) -> Tuple[float, str, bool]:
+        """
+        grade() for coroutines: concurrent tasks asking for one key await a
+        single `grade_fn()`, and each grade on their own if it fails.
+        """
+        key = self.key(question, agent_response, grader_version)
+        verdict = self.get(key)
+        if verdict is not None:
+            with self._inflight_lock:
+                self.hits += 1
+            return verdict[0], verdict[1], True
+
+        with self._inflight_lock:
+            future = self._inflight_async.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight_async[key] = asyncio.get_running_loop().create_future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            try:
+                verdict = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The task grading this key was cancelled; grade it here instead
+                return await self.grade_async(question, agent_response, grade_fn, grader_version)
+            if verdict is not _REGRADE:
+                return verdict[0], verdict[1], True
+            self._uncoalesce()
+            score, debug_info = await grade_fn()
+            self.store(question, agent_response, score, debug_info, grader_version)
+            return score, debug_info, False
+
+        try:
+            score, debug_info = await grade_fn()
+            self.store(question, agent_response, score, debug_info, grader_version)
+            future.set_result((score, debug_info) if _cacheable(debug_info) else _REGRADE)
+            return score, debug_info, False
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight_async.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookups since the cache was opened and the number of stored verdicts."""
+        with self._inflight_lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "entries": self._size
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,226 @@
+# hedging.py
+
+"""
+Hedged grader requests.
+
+The slowest grader calls take many times the median and decide when a suite
+finishes. A GradingHedger tracks grader latencies live. When a call has not
+returned after the `percentile` latency, it sends one duplicate request and
+takes whichever finishes first. Duplicates are capped at `max_hedge_fraction`
+of all calls, so the extra spend is bounded.
+
+Hedging applies to single-response grader calls (not batch requests, whose
+latency depends on their size). A losing synchronous request cannot be
+cancelled: it finishes in the background, and its tokens are metered only if
+it finishes before the run's usage is summarized. Losing asynchronous requests
+are cancelled. "hedged" counts the duplicate requests sent.
+
+Usage:
+```python
+results = client.run_full_benchmark(agent_callable=my_agent, hedge_grading=True)
+results["hedging"]      # {"calls": 80, "hedged": 3, "hedge_wins": 2, "hedge_rate": 0.0375, ...}
+```
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+HEDGE_PERCENTILE = 0.95
+HEDGE_MAX_FRACTION = 0.05
+# Latencies needed before the percentile is trusted, and how many are kept
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 500
+
+_current_hedge = contextvars.ContextVar("crm_bench_hedge", default=None)
+
+
+def _new_stats() -> Dict[str, int]:
+    return {"calls": 0, "hedged": 0, "hedge_wins": 0}
+
+
+class GradingHedger:
+    """
+    Live latency tracker and hedging policy, shared by the runs that use it.
+
+    Args:
+        percentile: Latency quantile (0-1) after which a duplicate request is sent
+        max_hedge_fraction: Cap on duplicate requests as a fraction of all calls
+        min_samples: Calls to observe before hedging starts
+        window: Number of recent latencies the percentile is computed over
+        max_workers: Threads for synchronous requests in flight
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        max_hedge_fraction: float = HEDGE_MAX_FRACTION,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+        max_workers: int = 64
+    ):
+        self.percentile = percentile
+        self.max_hedge_fraction = max_hedge_fraction
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.stats = _new_stats()
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)]
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _start_call(self, scope_stats: Dict[str, int]) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            scope_stats["calls"] += 1
+
+    def _allow_hedge(self, scope_stats: Dict[str, int]) -> bool:
+        with self._lock:
+            if self.stats["hedged"] + 1 > self.max_hedge_fraction * self.stats["calls"]:
+                return False
+            self.stats["hedged"] += 1
+            scope_stats["hedged"] += 1
+            return True
+
+    def _count_win(self, scope_stats: Dict[str, int]) -> None:
+        with self._lock:
+            self.stats["hedge_wins"] += 1
+            scope_stats["hedge_wins"] += 1
+
+    def _submit(self, func: Callable[[], Any]):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crm-bench-hedge")
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._timed, func)
+
+    def _timed(self, func: Callable[[], Any]):
+        start = time.monotonic()
+        try:
+            return func()
+        finally:
+            self.observe(time.monotonic() - start)
+
+    async def _timed_async(self, func: Callable[[], Any]):
+        start = time.monotonic()
+        result = await func()
+        # Cancelled requests raise before this: they say nothing about latency
+        self.observe(time.monotonic() - start)
+        return result
+
+    @contextmanager
+    def scope(self, stats: Optional[Dict[str, int]] = None):
+        """Hedge grader calls made in the block; yields their counters (`stats`, if given, accumulates them)."""
+        if stats is None:
+            stats = _new_stats()
+        token = _current_hedge.set((self, stats))
+        try:
+            yield stats
+        finally:
+            _current_hedge.reset(token)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def hedged_call(func: Callable[[], Any]) -> Any:
+    """Call `func()`, hedged when inside a GradingHedger.scope()."""
+    scope = _current_hedge.get()
+    if scope is None:
+        return func()
+    hedger, stats = scope
+    hedger._start_call(stats)
+
+    delay = hedger.hedge_delay()
+    primary = hedger._submit(func)
+    if delay is None:
+        return primary.result()
+    done, _ = wait([primary], timeout=delay)
+    if done or not hedger._allow_hedge(stats):
+        return primary.result()
+
+    logger.debug("Grader call exceeded %.2fs; sending a hedge request", delay)
+    hedge = hedger._submit(func)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    hedger._count_win(stats)
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def hedged_call_async(func: Callable[[], Any]) -> Any:
+    """Asynchronous hedged_call for a coroutine function; the losing request is cancelled."""
+    scope = _current_hedge.get()
+    if scope is None:
+        return await func()
+    hedger, stats = scope
+    hedger._start_call(stats)
+
+    delay = hedger.hedge_delay()
+    primary = asyncio.ensure_future(hedger._timed_async(func))
+    if delay is None:
+        return await primary
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done or not hedger._allow_hedge(stats):
+        return await primary
+
+    logger.debug("Grader call exceeded %.2fs; sending a hedge request", delay)
+    hedge = asyncio.ensure_future(hedger._timed_async(func))
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        hedger._count_win(stats)
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def hedging_summary(stats: Dict[str, int]) -> Dict[str, Any]:
+    """Counters of a hedging scope plus the share of calls that were duplicated."""
+    summary = dict(stats)
+    summary["hedge_rate"] = round(stats["hedged"] / stats["calls"], 4) if stats["calls"] else 0.0
+    return summary
+
+
+def merge_hedging_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up hedging_summary() results (e.g. over CSVs)."""
+    stats = _new_stats()
+    for summary in summaries:
+        for key in stats:
+            stats[key] += summary.get(key, 0)
+    return hedging_summary(stats)
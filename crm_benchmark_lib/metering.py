@@ -0,0 +1,217 @@
+# metering.py
+
+"""
+Token and cost accounting for the agent and the grader.
+
+Every grader call records its `response.usage`; agents report their own usage
+with report_agent_usage() (or automatically with trace_agent_llm_calls=True). The
+harness collects both per question and prices them with a per-model table:
+
+```python
+from crm_benchmark_lib.metering import CostMeter, report_agent_usage
+
+def my_agent(question, data):
+    response = openai_client.chat.completions.create(model="gpt-4o-mini", messages=[...])
+    report_agent_usage(response.model, response.usage.prompt_tokens, response.usage.completion_tokens)
+    return response.choices[0].message.content
+
+meter = CostMeter(prices={"my-finetune": (0.30, 1.20)})   # USD per 1M prompt / completion tokens
+results = client.run_full_benchmark(agent_callable=my_agent, cost_meter=meter)
+results["cost_usd"], results["cost_by_dataset"]
+```
+"""
+
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import MODEL_PRICES_PER_MILLION_TOKENS
+
+_current_usage = contextvars.ContextVar("crm_bench_usage", default=None)
+
+SOURCES = ("agent", "grader")
+
+
+def price_for(model: Optional[str], prices: Dict[str, Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+    """
+    (prompt, completion) USD per 1M tokens for `model`. Dated snapshots such as
+    "gpt-4o-2024-08-06" fall back to the longest matching prefix.
+    """
+    if not model:
+        return None
+    if model in prices:
+        return prices[model]
+    matches = [name for name in prices if model.startswith(name)]
+    if not matches:
+        return None
+    return prices[max(matches, key=len)]
+
+
+class UsageLedger:
+    """Token counts of one question (or batch call), by source and model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(
+        self, source: str, model: Optional[str], prompt_tokens: int, completion_tokens: int, calls: int = 1
+    ) -> None:
+        key = (source, model or "unknown")
+        with self._lock:
+            entry = self.entries.setdefault(key, [0, 0, 0])
+            entry[0] += int(prompt_tokens or 0)
+            entry[1] += int(completion_tokens or 0)
+            entry[2] += calls
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def summary(self, prices: Dict[str, Tuple[float, float]]) -> Dict[str, object]:
+        """
+        {"agent": {...}, "grader": {...}, "cost_usd": ...} where each source
+        has prompt_tokens, completion_tokens, calls and cost_usd. Models
+        missing from the price table are listed under "unpriced_models".
+        """
+        summary: Dict[str, object] = {}
+        total_cost = 0.0
+        unpriced = []
+        with self._lock:
+            items = list(self.entries.items())
+        for (source, model), (prompt_tokens, completion_tokens, calls) in items:
+            totals = summary.setdefault(
+                source, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0, "cost_usd": 0.0}
+            )
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["calls"] += calls
+
+            price = price_for(model, prices)
+            if price is None:
+                unpriced.append(model)
+                continue
+            cost = (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+            totals["cost_usd"] += cost
+            total_cost += cost
+
+        for source in SOURCES:
+            if source in summary:
+                summary[source]["cost_usd"] = round(summary[source]["cost_usd"], 6)
+        summary["cost_usd"] = round(total_cost, 6)
+        if unpriced:
+            summary["unpriced_models"] = sorted(set(unpriced))
+        return summary
+
+
+@contextmanager
+def usage_scope():
+    """Collect record_usage() calls made while the block runs into the yielded ledger."""
+    ledger = UsageLedger()
+    token = _current_usage.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(source: str, model: Optional[str], prompt_tokens: int, completion_tokens: int) -> None:
+    """Add token usage to the current question. Outside a benchmark run this is a no-op."""
+    ledger = _current_usage.get()
+    if ledger is not None:
+        ledger.add(source, model, prompt_tokens, completion_tokens)
+
+
+def current_usage_ledger() -> Optional[UsageLedger]:
+    """The ledger of the current usage_scope(), if any."""
+    return _current_usage.get()
+
+
+def share_usage(usage: UsageLedger, ledgers: List[Optional[UsageLedger]]) -> None:
+    """
+    Split the usage of one request made on behalf of several items between
+    the items' ledgers (one entry per item, None for unmetered items). The
+    request counts as a call of the first ledger; token remainders go there too.
+    """
+    if not ledgers:
+        return
+    weights: Dict[UsageLedger, int] = {}
+    for ledger in ledgers:
+        if ledger is not None:
+            weights[ledger] = weights.get(ledger, 0) + 1
+    if not weights:
+        return
+    owners = list(weights)
+    total = sum(weights.values())
+    for (source, model), (prompt_tokens, completion_tokens, calls) in list(usage.entries.items()):
+        shares = [
+            (prompt_tokens * weights[ledger] // total, completion_tokens * weights[ledger] // total)
+            for ledger in owners
+        ]
+        prompt_rest = prompt_tokens - sum(p for p, _ in shares)
+        completion_rest = completion_tokens - sum(c for _, c in shares)
+        for i, (ledger, (p, c)) in enumerate(zip(owners, shares)):
+            if i == 0:
+                ledger.add(source, model, p + prompt_rest, c + completion_rest, calls=calls)
+            else:
+                ledger.add(source, model, p, c, calls=0)
+
+
+def report_agent_usage(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Report tokens the agent spent on the question currently being answered."""
+    record_usage("agent", model, prompt_tokens, completion_tokens)
+
+
+def merge_usage_summaries(summaries: List[Dict[str, object]]) -> Dict[str, object]:
+    """Add up UsageLedger.summary() results (e.g. over questions or CSVs)."""
+    merged: Dict[str, object] = {"cost_usd": 0.0}
+    unpriced = set()
+    for summary in summaries:
+        for source in SOURCES:
+            if source not in summary:
+                continue
+            totals = merged.setdefault(
+                source, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0, "cost_usd": 0.0}
+            )
+            for key, value in summary[source].items():
+                totals[key] += value
+        merged["cost_usd"] += summary.get("cost_usd", 0.0)
+        unpriced.update(summary.get("unpriced_models", []))
+
+    for source in SOURCES:
+        if source in merged:
+            merged[source]["cost_usd"] = round(merged[source]["cost_usd"], 6)
+    merged["cost_usd"] = round(merged["cost_usd"], 6)
+    if unpriced:
+        merged["unpriced_models"] = sorted(unpriced)
+    return merged
+
+
+class CostMeter:
+    """
+    Price table plus a thread-safe running total across a whole run. The
+    clients use `on_update` to show the live cost in the progress bar.
+
+    Args:
+        prices: Extra or overriding entries, model -> (prompt, completion) USD per 1M tokens
+        on_update: Called with the new total (USD) after every priced question
+    """
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        on_update: Optional[Callable[[float], None]] = None
+    ):
+        self.prices = dict(MODEL_PRICES_PER_MILLION_TOKENS)
+        if prices:
+            self.prices.update(prices)
+        self.on_update = on_update
+        self.total_usd = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, cost_usd: float) -> None:
+        with self._lock:
+            self.total_usd += cost_usd
+            total = self.total_usd
+        if self.on_update is not None:
+            self.on_update(total)
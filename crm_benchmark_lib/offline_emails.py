@@ -0,0 +1,181 @@
+# offline_emails.py
+
+"""
+Offline writer for the D2 filler emails.
+
+A small phrase grammar (openers, one or two sentences about the objection, a
+closing question) with slots for products, plans, seat counts, prices and
+competitors. It needs no network access or API key. Each email is drawn from
+its own random stream, seeded by the writer's seed and the record's index, so
+the output is the same on every run and does not depend on the order in which
+emails are written.
+
+Like the LLM prompt, the grammar stays clear of the signature threads' topics
+(demos, timing, implementation delays) and follows the record's sentiment and
+objection.
+
+Usage:
+```python
+writer = OfflineEmailWriter(seed=0)
+writer.write(0, sentiment="Negative", objection="Price")
+# "Hi Dana, I have to be honest: the quote for 40 seats on the Growth plan ..."
+```
+"""
+
+import random
+from typing import Dict, List, Optional, Set
+
+_NAMES = [
+    "Alex", "Dana", "Jordan", "Priya", "Marco", "Lena", "Sam", "Chen", "Fatima", "Noah",
+    "Olivia", "Raj", "Sofia", "Tom", "Ines", "Kwame", "Hannah", "Luis", "Mei", "Erik"
+]
+_PLANS = ["Starter", "Team", "Growth", "Professional", "Business", "Enterprise"]
+_FEATURES = [
+    "custom reporting", "the forecasting dashboard", "role-based permissions", "the mobile app",
+    "bulk data export", "single sign-on", "the Salesforce sync", "audit logs", "the REST API",
+    "territory management", "email tracking", "workflow automation", "multi-currency quotes",
+    "the Outlook add-in", "custom fields on accounts"
+]
+_COMPETITORS = [
+    "Pipedrive", "HubSpot", "Zoho", "Freshsales", "Copper", "Close", "Insightly", "Nimble"
+]
+_TEAMS = ["sales", "finance", "operations", "customer success", "procurement", "IT"]
+
+_OPENERS: Dict[str, List[str]] = {
+    "Neutral": [
+        "Thanks for sending over the pricing sheet for the {plan} plan.",
+        "Following up on our call about the {plan} plan.",
+        "Our {team} team went through your proposal this week.",
+        "Thanks for the detailed answers on {feature}.",
+        "I shared your quote with our {team} lead.",
+        "We compared your offer with {competitor} over the last few days.",
+    ],
+    "Negative": [
+        "I have to be honest: we're disappointed with what we've seen so far.",
+        "This isn't quite what we expected after our last conversation.",
+        "Our {team} team is not convinced yet.",
+        "I'm afraid the proposal falls short for us in a few places.",
+        "We're frustrated that this still hasn't been resolved.",
+        "After reviewing the {plan} plan, we have some serious reservations.",
+    ],
+}
+
+_OBJECTIONS: Dict[str, List[str]] = {
+    "Price": [
+        "The quote for {seats} seats on the {plan} plan came in about {pct}% above our budget.",
+        "{competitor} offered us a comparable package for roughly ${saving:,} less per year.",
+        "At ${price} per user per month, the cost is hard to justify for a team of {seats}.",
+        "The add-on for {feature} pushes the total well past what we planned to spend.",
+        "Our finance team flagged the annual price increase clause in the contract.",
+        "We'd need a lower per-seat price before we can move to the {plan} plan.",
+    ],
+    "Features": [
+        "We rely heavily on {feature}, and I couldn't find it in the {plan} plan.",
+        "{competitor} already covers {feature}, which is a must-have for our {team} team.",
+        "Without {feature} our reps would still need a second tool for daily work.",
+        "The {plan} plan seems to limit {feature} to {limit} records, which is too few for us.",
+        "Our {team} team asked whether {feature} supports custom rules per region.",
+        "We need {feature} to work with our existing data model out of the box.",
+    ],
+    "Support": [
+        "Our team works across {zones} time zones, so we need help outside business hours.",
+        "The standard plan only includes email support, and we expect a named contact.",
+        "When we opened a ticket about {feature}, it took {days} days to get a reply.",
+        "We'd want guaranteed response times written into the contract.",
+        "{competitor} includes phone support at no extra cost, which matters to our {team} team.",
+        "Our admins need onboarding help for {seats} users, and the support package looks thin.",
+    ],
+}
+
+_CLOSINGS: Dict[str, List[str]] = {
+    "Price": [
+        "Is there any flexibility if we commit to a two-year term?",
+        "Could you send a revised quote for {seats} seats?",
+        "Can you match {competitor} on price?",
+        "What discount would apply if we paid annually up front?",
+    ],
+    "Features": [
+        "Is {feature} on your roadmap for this year?",
+        "Could you share documentation showing how {feature} works?",
+        "Would a higher plan include {feature}?",
+        "Can you confirm whether a workaround exists?",
+    ],
+    "Support": [
+        "What does your premium support tier include?",
+        "Can you put the support commitments in writing?",
+        "Who would be our point of contact after signing?",
+        "Is 24/7 support available as an add-on, and at what cost?",
+    ],
+}
+
+_GREETINGS = ["Hi {name},", "Hello {name},", "{name},", "Hi,", "Hello,", ""]
+_SIGNOFFS = ["", "", "Thanks.", "Best, {signer}", "Regards, {signer}", "Thanks in advance, {signer}"]
+
+
+class OfflineEmailWriter:
+    """
+    Deterministic filler emails from a phrase grammar.
+
+    Args:
+        seed: Base seed; email `index` always comes out the same for a given seed
+    """
+
+    # Draws tried before giving up on a distinct email
+    MAX_ATTEMPTS = 20
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def _slots(self, rng: random.Random) -> Dict[str, object]:
+        return {
+            "name": rng.choice(_NAMES),
+            "signer": rng.choice(_NAMES),
+            "plan": rng.choice(_PLANS),
+            "feature": rng.choice(_FEATURES),
+            "competitor": rng.choice(_COMPETITORS),
+            "team": rng.choice(_TEAMS),
+            "seats": rng.choice([10, 15, 25, 40, 60, 80, 120, 250]),
+            "pct": rng.choice([10, 15, 20, 25, 30, 40]),
+            "saving": rng.choice([4000, 6500, 9000, 12000, 18000, 25000]),
+            "price": rng.choice([35, 49, 65, 79, 99, 129]),
+            "limit": rng.choice([500, 1000, 5000, 10000]),
+            "zones": rng.choice([3, 4, 5, 6]),
+            "days": rng.choice([3, 4, 5, 6, 8]),
+        }
+
+    def _draw(self, rng: random.Random, sentiment: str, objection: str) -> str:
+        slots = self._slots(rng)
+        objection_lines = _OBJECTIONS.get(objection, _OBJECTIONS["Price"])
+        closings = _CLOSINGS.get(objection, _CLOSINGS["Price"])
+        parts = [
+            rng.choice(_GREETINGS),
+            rng.choice(_OPENERS.get(sentiment, _OPENERS["Neutral"])),
+            *rng.sample(objection_lines, rng.choice([1, 1, 2])),
+            rng.choice(closings),
+            rng.choice(_SIGNOFFS),
+        ]
+        return " ".join(part.format(**slots) for part in parts if part)
+
+    def write(self, index: int, sentiment: str, objection: str, seen: Optional[Set[str]] = None) -> str:
+        """Email for record `index`; with `seen`, redraws texts already in it (and adds the result)."""
+        text = ""
+        for attempt in range(self.MAX_ATTEMPTS):
+            rng = random.Random(f"{self.seed}:{index}:{attempt}")
+            text = self._draw(rng, sentiment, objection)
+            if seen is None or text not in seen:
+                break
+        if seen is not None:
+            seen.add(text)
+        return text
+
+    def write_many(self, fields: List[dict], start: int = 0, seen: Optional[Set[str]] = None) -> List[str]:
+        """
+        Distinct emails for records with "sentiment" and "objection" keys, in
+        order; the first record is email `start` (for writing in chunks). Pass
+        the same `seen` to every chunk to keep emails distinct across chunks.
+        """
+        seen = set() if seen is None else seen
+        return [
+            self.write(index, record["sentiment"], record["objection"], seen)
+            for index, record in enumerate(fields, start)
+        ]
@@ -0,0 +1,229 @@
+# question_registry.py
+
+"""
+Compiled, versioned registry of the benchmark's question sets.
+
+Every `dataset_N_questions.json` in the questions directory is parsed once
+per process and indexed by question id, dataset ("D1".."D5") and category.
+The category weights from config.CATEGORY_SECTION_WEIGHTS are resolved per
+question up front, so scoring a run does not look them up for every result.
+A file is read again only when its size or modification time changes.
+
+Each question has a content hash: SHA-256 over its canonical JSON (sorted
+keys), shortened to 16 hex digits. Each set has a hash over its questions'
+hashes, in order. Editing a question's wording, category or expected answer
+changes both hashes. They are the stable keys for the grading cache, and two
+runs are comparable on the leaderboard only when their set hashes match.
+
+Usage:
+```python
+from crm_benchmark_lib.question_registry import get_question_registry
+
+registry = get_question_registry()
+registry.question("D1Q1")["category"]   # "pipeline_insights"
+registry.set_hash("D1")                   # "3f9c0a1b2c4d5e6f"
+registry.set_hashes()                     # {"D1": "...", "D2": "...", ...}
+```
+"""
+
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import CATEGORY_SECTION_WEIGHTS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_QUESTIONS_DIR = os.path.join(PACKAGE_DIR, "dataset_questions")
+
+_SET_FILE = re.compile(r"dataset_(\d+)_questions\.json$")
+
+
+def question_hash(question: Dict[str, Any]) -> str:
+    """Content hash of one question dict (canonical JSON, sorted keys)."""
+    material = json.dumps(question, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def _combine(hashes: List[str]) -> str:
+    return hashlib.sha256("\n".join(hashes).encode("utf-8")).hexdigest()[:16]
+
+
+def question_set_hash(questions: List[Dict[str, Any]]) -> str:
+    """Content hash of a question set: over its questions' hashes, in order."""
+    return _combine([question_hash(q) for q in questions])
+
+
+def dataset_for_path(json_path: str) -> Optional[str]:
+    """"D3" for ".../dataset_3_questions.json", else None."""
+    match = _SET_FILE.search(os.path.basename(json_path))
+    return f"D{match.group(1)}" if match else None
+
+
+def find_questions_dir(base_dir: Optional[str] = None) -> str:
+    """
+    `base_dir` if given, else the first existing of ./dataset_questions,
+    ./crm_benchmark_lib/dataset_questions and the package's own copy.
+    """
+    if base_dir is not None:
+        if not os.path.isdir(base_dir):
+            raise FileNotFoundError(f"Cannot find questions directory {base_dir}")
+        return base_dir
+    for dir_path in ("dataset_questions", os.path.join("crm_benchmark_lib", "dataset_questions"), DEFAULT_QUESTIONS_DIR):
+        if os.path.isdir(dir_path):
+            return dir_path
+    raise FileNotFoundError("Cannot find dataset_questions directory")
+
+
+@dataclass
+class QuestionSet:
+    """
+    One parsed question set. `questions` is shared by every run that uses the
+    set and must not be modified; evaluator.load_questions returns a copy.
+    """
+
+    dataset: Optional[str]
+    path: str
+    questions: List[Dict[str, Any]]
+    question_hashes: Dict[str, str] = field(default_factory=dict)
+    # question_id -> category weight (see evaluator.compute_weighted_score), and their sum
+    weights: Dict[str, float] = field(default_factory=dict)
+    total_weight: float = 0.0
+    by_category: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    content_hash: str = ""
+
+    @classmethod
+    def compile(cls, path: str, questions: List[Dict[str, Any]]) -> "QuestionSet":
+        qset = cls(dataset=dataset_for_path(path), path=path, questions=questions)
+        for q in questions:
+            question_id = q["question_id"]
+            qset.question_hashes[question_id] = question_hash(q)
+            qset.weights[question_id] = CATEGORY_SECTION_WEIGHTS.get(q["category"], 0)
+            qset.by_category.setdefault(q["category"], []).append(q)
+        qset.total_weight = sum(qset.weights.values())
+        qset.content_hash = _combine([qset.question_hashes[q["question_id"]] for q in questions])
+        return qset
+
+
+# abspath -> ((mtime_ns, size), QuestionSet)
+_SET_CACHE: Dict[str, Tuple[Tuple[int, int], QuestionSet]] = {}
+_SET_LOCK = threading.Lock()
+
+
+def load_question_set(json_path: str) -> QuestionSet:
+    """Parsed and indexed question set, read from disk only when the file changed."""
+    path = os.path.abspath(json_path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _SET_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    logger.debug(f"Loading questions from: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        qset = QuestionSet.compile(path, json.load(f))
+    with _SET_LOCK:
+        _SET_CACHE[path] = (version, qset)
+    return qset
+
+
+class QuestionRegistry:
+    """
+    All question sets of one directory, indexed by dataset, question id and
+    category. refresh() picks up edited files.
+
+    Args:
+        questions_dir: Directory with dataset_N_questions.json files (see find_questions_dir)
+    """
+
+    def __init__(self, questions_dir: Optional[str] = None):
+        self.questions_dir = find_questions_dir(questions_dir)
+        self.sets: Dict[str, QuestionSet] = {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self.hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Re-read new or changed set files; True if anything changed."""
+        with self._lock:
+            paths = [
+                p for p in glob.glob(os.path.join(self.questions_dir, "dataset_*_questions.json"))
+                if dataset_for_path(p) is not None
+            ]
+            paths.sort(key=lambda p: int(dataset_for_path(p)[1:]))
+            sets = {}
+            for path in paths:
+                qset = load_question_set(path)
+                sets[qset.dataset] = qset
+            if not sets:
+                raise FileNotFoundError(f"No question JSON files found in {self.questions_dir}")
+            changed = any(self.sets.get(name) is not qset for name, qset in sets.items()) or sets.keys() != self.sets.keys()
+            if changed:
+                self.sets = sets
+                self.by_id = {q["question_id"]: q for qset in sets.values() for q in qset.questions}
+                self.hashes = {qid: h for qset in sets.values() for qid, h in qset.question_hashes.items()}
+                by_category = {}
+                for qset in sets.values():
+                    for category, questions in qset.by_category.items():
+                        by_category.setdefault(category, []).extend(questions)
+                self.by_category = by_category
+            return changed
+
+    @property
+    def datasets(self) -> List[str]:
+        return list(self.sets)
+
+    def question_set(self, dataset: str) -> QuestionSet:
+        return self.sets[dataset]
+
+    def question(self, question_id: str) -> Dict[str, Any]:
+        return self.by_id[question_id]
+
+    def questions(self, dataset: Optional[str] = None, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Questions of one dataset and/or category, in file order."""
+        questions = self.sets[dataset].questions if dataset else [q for s in self.sets.values() for q in s.questions]
+        return [q for q in questions if q["category"] == category] if category else list(questions)
+
+    def paths(self) -> Dict[str, str]:
+        """Dataset -> question JSON path."""
+        return {dataset: qset.path for dataset, qset in self.sets.items()}
+
+    def question_hash(self, question_id: str) -> str:
+        return self.hashes[question_id]
+
+    def set_hash(self, dataset: str) -> str:
+        return self.sets[dataset].content_hash
+
+    def set_hashes(self) -> Dict[str, str]:
+        return {dataset: qset.content_hash for dataset, qset in self.sets.items()}
+
+    @property
+    def suite_hash(self) -> str:
+        """Hash over all set hashes: identical only for the very same question suite."""
+        return _combine([f"{dataset}:{h}" for dataset, h in self.set_hashes().items()])
+
+
+_REGISTRIES: Dict[str, QuestionRegistry] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_question_registry(questions_dir: Optional[str] = None) -> QuestionRegistry:
+    """Shared registry for a directory, refreshed against the files on every call."""
+    path = os.path.abspath(find_questions_dir(questions_dir))
+    with _REGISTRY_LOCK:
+        registry = _REGISTRIES.get(path)
+        if registry is None:
+            registry = _REGISTRIES[path] = QuestionRegistry(path)
+            return registry
+    registry.refresh()
+    return registry
@@ -0,0 +1,305 @@
+# records.py
+
+"""
+Compact per-question result records and an optional spill-to-disk writer.
+
+A QuestionRecord keeps the per-question fields in __slots__ and points at a
+shared, interned QuestionMeta instead of copying question_id, category and
+question_text into every result. ResultSpill streams records to a JSONL or
+Parquet file so that long runs only keep ScoreAggregate totals in memory.
+"""
+
+import os
+import json
+import math
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import CATEGORY_SECTION_WEIGHTS
+
+
+class QuestionMeta:
+    """Immutable question metadata shared by every result for that question."""
+
+    __slots__ = ("question_id", "category", "question_text")
+
+    def __init__(self, question_id: str, category: str, question_text: str):
+        object.__setattr__(self, "question_id", question_id)
+        object.__setattr__(self, "category", category)
+        object.__setattr__(self, "question_text", question_text)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuestionMeta is immutable")
+
+    def __repr__(self):
+        return f"QuestionMeta({self.question_id!r}, {self.category!r})"
+
+
+_META_CACHE: Dict[tuple, QuestionMeta] = {}
+_META_LOCK = threading.Lock()
+
+
+def intern_question(question: Dict[str, Any]) -> QuestionMeta:
+    """Return the shared QuestionMeta for a question dict, creating it once."""
+    key = (question["question_id"], question["category"], question["question_text"])
+    meta = _META_CACHE.get(key)
+    if meta is None:
+        with _META_LOCK:
+            meta = _META_CACHE.setdefault(key, QuestionMeta(*key))
+    return meta
+
+
+class QuestionRecord:
+    """
+    One graded question. Supports the read-only dict access used elsewhere in
+    the library (record["score"], record.get("category")), and to_dict() gives
+    the classic "question_details" entry. Optional per-question fields (agent
+    metrics and the like) live in the `extra` dict and are merged into to_dict().
+    """
+
+    __slots__ = ("meta", "agent_response", "score", "evaluation_debug", "time_taken_seconds", "extra")
+
+    _FIELDS = (
+        "question_id", "category", "question_text", "agent_response",
+        "score", "evaluation_debug", "time_taken_seconds"
+    )
+
+    def __init__(
+        self,
+        meta: QuestionMeta,
+        agent_response: str,
+        score: float,
+        evaluation_debug: str,
+        time_taken_seconds: float,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.meta = meta
+        self.agent_response = agent_response
+        self.score = score
+        self.evaluation_debug = evaluation_debug
+        self.time_taken_seconds = time_taken_seconds
+        self.extra = extra or None
+
+    @property
+    def question_id(self) -> str:
+        return self.meta.question_id
+
+    @property
+    def category(self) -> str:
+        return self.meta.category
+
+    @property
+    def question_text(self) -> str:
+        return self.meta.question_text
+
+    def __getitem__(self, key):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        if self.extra:
+            return self._FIELDS + tuple(self.extra)
+        return self._FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = {field: getattr(self, field) for field in self._FIELDS}
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+    def __repr__(self):
+        return f"QuestionRecord({self.question_id!r}, score={self.score!r})"
+
+
+class ScoreAggregate:
+    """
+    Running totals that reproduce compute_weighted_score without keeping
+    the individual results. `weights` is the same question_id -> weight map.
+    """
+
+    __slots__ = ("weights", "weighted_sum", "total_weight", "questions", "total_time", "ttft_samples")
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or {}
+        self.weighted_sum = 0.0
+        self.total_weight = 0.0
+        self.questions = 0
+        self.total_time = 0.0
+        self.ttft_samples = []
+
+    def add(
+        self, category: str, score: float, elapsed: float = 0.0, ttft: Optional[float] = None, scored: bool = True,
+        question_id: Optional[str] = None
+    ) -> None:
+        """Count a question; with scored=False (grading failed) it is left out of the score."""
+        if scored:
+            weight = self.weights.get(question_id)
+            if weight is None:
+                weight = CATEGORY_SECTION_WEIGHTS.get(category, 0)
+            self.weighted_sum += score * weight
+            self.total_weight += weight
+        self.questions += 1
+        self.total_time += elapsed
+        if ttft is not None:
+            self.ttft_samples.append(ttft)
+
+    def weighted_score_percent(self) -> float:
+        if self.total_weight == 0:
+            return 0.0
+        return round((self.weighted_sum / self.total_weight) * 100, 2)
+
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of `values` as {"p50": ..., "p90": ..., ...}."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {}
+    for point in points:
+        rank = max(int(math.ceil(point / 100.0 * len(ordered))) - 1, 0)
+        result[f"p{point}"] = round(ordered[rank], 4)
+    return result
+
+
+# Columns every Parquet spill row has; other fields go to the JSON "extra" column
+SPILL_COLUMNS = (
+    ("question_id", "string"),
+    ("category", "string"),
+    ("question_text", "string"),
+    ("agent_response", "string"),
+    ("score", "float64"),
+    ("evaluation_debug", "string"),
+    ("time_taken_seconds", "float64"),
+    ("csv_data_path", "string"),
+)
+
+
+def _spill_schema():
+    import pyarrow as pa
+
+    fields = [pa.field(name, pa.string() if kind == "string" else pa.float64()) for name, kind in SPILL_COLUMNS]
+    return pa.schema(fields + [pa.field("extra", pa.string())])
+
+
+class ResultSpill:
+    """
+    Thread-safe writer that streams QuestionRecords to disk.
+
+    The format follows the file extension: ".parquet" writes Parquet row groups
+    (requires pyarrow), anything else writes JSON lines. Extra keyword fields
+    passed to write() (e.g. csv_data_path) are stored alongside each row.
+
+    Parquet files have a fixed schema (SPILL_COLUMNS plus an "extra" column):
+    optional per-question fields such as status, usage or llm_trace are stored
+    as one JSON string, so rows that carry them can follow rows that don't.
+    read_spill() merges them back into each row.
+
+    Usage:
+    ```python
+    with ResultSpill("run.jsonl") as spill:
+        run_benchmark(agent, qjson, csv, result_spill=spill)
+    ```
+    """
+
+    def __init__(self, path: str, row_group_size: int = 10000):
+        self.path = path
+        self.format = "parquet" if path.lower().endswith(".parquet") else "jsonl"
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._writer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Parquet spill files require pyarrow: pip install pyarrow")
+            self._file = None
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: QuestionRecord, **extra) -> None:
+        row = record.to_dict()
+        row.update(extra)
+        with self._lock:
+            if self.format == "parquet":
+                self._buffer.append(row)
+                if len(self._buffer) >= self.row_group_size:
+                    self._flush_parquet()
+            else:
+                self._file.write(json.dumps(row, default=str) + "\n")
+            self.rows_written += 1
+
+    def _flush_parquet(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._buffer:
+            return
+        schema = _spill_schema()
+        rows = []
+        for row in self._buffer:
+            fixed = {name: row.pop(name, None) for name, _ in SPILL_COLUMNS}
+            for name, kind in SPILL_COLUMNS:
+                if kind == "string" and fixed[name] is not None and not isinstance(fixed[name], str):
+                    fixed[name] = str(fixed[name])
+            fixed["extra"] = json.dumps(row, default=str) if row else None
+            rows.append(fixed)
+        table = pa.Table.from_pylist(rows, schema=schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def close(self) -> None:
+        with self._lock:
+            if self.format == "parquet":
+                self._flush_parquet()
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            elif self._file is not None and not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_spill(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over the rows of a spill file written by ResultSpill."""
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches():
+            for row in batch.to_pylist():
+                extra = row.pop("extra", None)
+                if extra:
+                    row.update(json.loads(extra))
+                yield row
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,316 @@
+# retries.py
+
+"""
+Retries and circuit breakers for OpenAI API requests.
+
+Transient errors (rate limits, 5xx, timeouts, dropped connections) are
+retried. The delay is the server's Retry-After when it sends one, otherwise
+exponential backoff with full jitter. After `failure_threshold` consecutive
+transient failures a CircuitBreaker opens, and calls through it wait for it
+to close instead of failing one after another.
+
+Each service gets its own breaker, named by its `label` in log messages and
+errors: grader_health wraps this module for the grader, data_generation uses
+it directly for content generation.
+
+```python
+from crm_benchmark_lib.retries import CircuitBreaker, call_with_retries
+
+breaker = CircuitBreaker(label="Embeddings")
+vectors = call_with_retries(lambda: client.embeddings.create(...), breaker)
+```
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+import openai
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Longest a call waits for an open circuit to close
+OUTAGE_TIMEOUT = 600.0
+
+_RETRYABLE_STATUS = {408, 409, 429}
+# How often callers waiting on a half-open probe check its outcome
+_PROBE_POLL = 0.05
+
+
+class ServiceUnavailableError(Exception):
+    """A service stayed unhealthy for longer than the outage timeout."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and connection problems."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked to wait (retry-after-ms / retry-after headers), if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(float(headers["retry-after-ms"]) / 1000.0, 0.0)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    error: Optional[BaseException] = None,
+    base: Optional[float] = None,
+    cap: Optional[float] = None,
+    max_wait: Optional[float] = None
+) -> float:
+    """
+    Retry-After when given (plus a little jitter), else full-jitter
+    exponential backoff. Unset limits default to BACKOFF_BASE, BACKOFF_MAX and
+    OUTAGE_TIMEOUT.
+    """
+    base = BACKOFF_BASE if base is None else base
+    cap = BACKOFF_MAX if cap is None else cap
+    max_wait = OUTAGE_TIMEOUT if max_wait is None else max_wait
+    requested = retry_after(error) if error is not None else None
+    if requested is not None:
+        return min(requested, max_wait) + random.uniform(0, 0.1 * max(requested, 1.0))
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half-open after `reset_timeout` (or the server's Retry-After, if
+    longer). In the half-open state one probe call goes through while the
+    other callers keep waiting; its success closes the circuit, its failure
+    opens it again for twice as long (up to `max_reset_timeout`), so a long
+    outage costs one request per interval. A probe that reports neither
+    stops blocking the others after `probe_timeout` seconds.
+
+    Args:
+        failure_threshold: Consecutive transient failures that open the circuit
+        reset_timeout: Seconds the circuit first stays open before trying again
+        max_reset_timeout: Upper bound of the doubled open intervals
+        label: Name of the service in log messages and errors
+        outage_timeout: Default longest wait of wait_until_healthy (None: OUTAGE_TIMEOUT)
+        probe_timeout: Seconds a half-open probe may take before another caller probes
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+        label: str = "Service",
+        outage_timeout: Optional[float] = None,
+        probe_timeout: float = 120.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.label = label
+        self.outage_timeout = outage_timeout
+        self.probe_timeout = probe_timeout
+        self.consecutive_failures = 0
+        self.trips = 0
+        # Trips since the last success
+        self._streak = 0
+        self._open_until = 0.0
+        # While in the future, a half-open probe is in flight
+        self._probe_until = 0.0
+        self._lock = threading.Lock()
+
+    def _outage_timeout(self) -> float:
+        return OUTAGE_TIMEOUT if self.outage_timeout is None else self.outage_timeout
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.consecutive_failures < self.failure_threshold:
+                return "closed"
+            return "open" if time.monotonic() < self._open_until else "half_open"
+
+    def remaining_open(self) -> float:
+        """Seconds until the circuit may be tried again (0 when it is not open)."""
+        with self._lock:
+            return max(self._open_until - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.consecutive_failures >= self.failure_threshold:
+                logger.warning("%s recovered; closing the circuit", self.label)
+            self.consecutive_failures = 0
+            self._streak = 0
+            self._open_until = 0.0
+            self._probe_until = 0.0
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_until = 0.0
+            if self.consecutive_failures < self.failure_threshold:
+                return
+            if time.monotonic() < self._open_until:
+                # Failures of calls started before the circuit opened
+                self._open_until = max(self._open_until, time.monotonic() + (retry_after(error) or 0.0))
+                return
+            self.trips += 1
+            self._streak += 1
+            pause = min(self.reset_timeout * 2 ** (self._streak - 1), self.max_reset_timeout)
+            pause = max(pause, retry_after(error) or 0.0)
+            logger.warning("%s unhealthy after %d failures; pausing for %.0fs", self.label, self.consecutive_failures, pause)
+            self._open_until = time.monotonic() + pause
+
+    def release_probe(self) -> None:
+        """End a half-open probe that neither succeeded nor failed transiently."""
+        with self._lock:
+            self._probe_until = 0.0
+
+    def _admit(self, probe: bool) -> float:
+        """
+        0 when a call may go ahead now, else seconds to wait before asking
+        again. In the half-open state `probe` claims the single probe slot.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.consecutive_failures < self.failure_threshold:
+                return 0.0
+            if now < self._open_until:
+                return self._open_until - now
+            if now < self._probe_until:
+                return min(_PROBE_POLL, self._probe_until - now)
+            if probe:
+                self._probe_until = now + self.probe_timeout
+            return 0.0
+
+    def wait_until_healthy(self, timeout: Optional[float] = None, probe: bool = False) -> bool:
+        """
+        Block while the circuit is open or a half-open probe is in flight;
+        False if that is still the case after `timeout` seconds (default
+        `outage_timeout`). Callers about to make the request pass `probe=True`
+        and, when the circuit is half-open, become its probe.
+        """
+        deadline = time.monotonic() + (self._outage_timeout() if timeout is None else timeout)
+        while True:
+            wait = self._admit(probe)
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                time.sleep(max(deadline - time.monotonic(), 0.0))
+                return self._admit(probe) <= 0
+            time.sleep(wait)
+
+    async def wait_until_healthy_async(self, timeout: Optional[float] = None, probe: bool = False) -> bool:
+        """wait_until_healthy without blocking the event loop."""
+        deadline = time.monotonic() + (self._outage_timeout() if timeout is None else timeout)
+        while True:
+            wait = self._admit(probe)
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                await asyncio.sleep(max(deadline - time.monotonic(), 0.0))
+                return self._admit(probe) <= 0
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "trips": self.trips,
+                "consecutive_failures": self.consecutive_failures,
+                "open_for_seconds": round(max(self._open_until - time.monotonic(), 0.0), 3)
+            }
+
+
+def call_with_retries(
+    func: Callable[[], Any],
+    breaker: CircuitBreaker,
+    max_retries: Optional[int] = None,
+    backoff_base: Optional[float] = None,
+    backoff_max: Optional[float] = None,
+    outage_timeout: Optional[float] = None,
+    unavailable_error: Type[Exception] = ServiceUnavailableError
+) -> Any:
+    """
+    Call `func()` with up to `max_retries` (default MAX_RETRIES) retries on
+    transient errors, waiting out an open circuit first (at most
+    `outage_timeout`, default the breaker's). Raises the last error, or
+    `unavailable_error` when the circuit stays open.
+    """
+    timeout = breaker._outage_timeout() if outage_timeout is None else outage_timeout
+    max_retries = MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        if not breaker.wait_until_healthy(timeout, probe=True):
+            raise unavailable_error(f"{breaker.label} unavailable for over {timeout:.0f}s")
+        try:
+            result = func()
+        except BaseException as e:
+            if not isinstance(e, Exception) or not is_transient(e):
+                # The service answered (or the caller gave up): not a verdict on its health
+                breaker.release_probe()
+                raise
+            breaker.record_failure(e)
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, e, backoff_base, backoff_max, timeout)
+            logger.info("Transient error from %s (%s); retry %d in %.1fs", breaker.label, e, attempt + 1, delay)
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def call_with_retries_async(
+    func: Callable[[], Awaitable[Any]],
+    breaker: CircuitBreaker,
+    max_retries: Optional[int] = None,
+    backoff_base: Optional[float] = None,
+    backoff_max: Optional[float] = None,
+    outage_timeout: Optional[float] = None,
+    unavailable_error: Type[Exception] = ServiceUnavailableError
+) -> Any:
+    """Asynchronous call_with_retries for a coroutine function."""
+    timeout = breaker._outage_timeout() if outage_timeout is None else outage_timeout
+    max_retries = MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        if not await breaker.wait_until_healthy_async(timeout, probe=True):
+            raise unavailable_error(f"{breaker.label} unavailable for over {timeout:.0f}s")
+        try:
+            result = await func()
+        except BaseException as e:
+            if not isinstance(e, Exception) or not is_transient(e):
+                # The service answered (or the caller gave up): not a verdict on its health
+                breaker.release_probe()
+                raise
+            breaker.record_failure(e)
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, e, backoff_base, backoff_max, timeout)
+            logger.info("Transient error from %s (%s); retry %d in %.1fs", breaker.label, e, attempt + 1, delay)
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
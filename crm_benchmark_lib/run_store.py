@@ -0,0 +1,288 @@
+# run_store.py
+
+"""
+Optional local store of benchmark runs with pandas-backed comparisons.
+
+Every saved run keeps its summary plus one row per graded question in a SQLite
+file, indexed so that picking a handful of runs out of thousands is cheap. The
+query helpers pull only the rows they need and do the comparison with
+vectorized pandas operations.
+
+Usage:
+```python
+store = RunStore("runs.db")
+results = client.run_and_submit(my_agent, "My Agent v2", run_store=store)
+
+store.question_deltas("My Agent v1", "My Agent v2")
+store.score_trend("My Agent v2")
+store.latency_regressions("My Agent v1", "My Agent v2", threshold=0.25)
+```
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .records import read_spill
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    agent_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    overall_score REAL,
+    dataset_scores TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS question_results (
+    run_id TEXT NOT NULL,
+    dataset TEXT,
+    csv_data_path TEXT,
+    question_id TEXT NOT NULL,
+    category TEXT,
+    score REAL,
+    time_taken_seconds REAL,
+    agent_response TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_agent_time ON runs (agent_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_question_results_run ON question_results (run_id, question_id);
+"""
+
+
+# Rows with this status were not graded (grader outage) and are never compared
+_FAILED_STATUS = "grading_failed"
+
+
+def _dataset_from_path(csv_path: Optional[str]) -> Optional[str]:
+    if not csv_path:
+        return None
+    name = os.path.basename(csv_path)
+    return name[:2] if name.startswith("D") else None
+
+
+class RunStore:
+    """SQLite-backed history of benchmark runs."""
+
+    def __init__(self, path: str = "crm_bench_runs.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(question_results)")}
+            if "status" not in columns:
+                # Stores created before per-question statuses were saved
+                conn.execute("ALTER TABLE question_results ADD COLUMN status TEXT")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def save_run(
+        self,
+        results: Dict[str, Any],
+        agent_name: str,
+        run_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Save a run_full_benchmark / run_and_submit summary and its per-question
+        rows. Runs that spilled their results to disk are read back from the
+        spill file. Returns the run id.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        rows = list(self._question_rows(results))
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    agent_name,
+                    time.time(),
+                    results.get("overall_average"),
+                    json.dumps(results.get("dataset_averages", {})),
+                    json.dumps(self._run_metadata(results, metadata), default=str)
+                )
+            )
+            conn.executemany(
+                "INSERT INTO question_results "
+                "(run_id, dataset, csv_data_path, question_id, category, score, time_taken_seconds, agent_response, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        _dataset_from_path(row.get("csv_data_path")),
+                        row.get("csv_data_path"),
+                        row.get("question_id"),
+                        row.get("category"),
+                        row.get("score"),
+                        row.get("time_taken_seconds"),
+                        row.get("agent_response"),
+                        row.get("status")
+                    )
+                    for row in rows
+                ]
+            )
+
+        logger.info(f"Saved run {run_id} for {agent_name} with {len(rows)} question rows")
+        return run_id
+
+    @staticmethod
+    def _run_metadata(results: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        run_metadata = dict(metadata or results.get("metadata", {}))
+        # Which question sets were run, so only comparable runs are compared
+        if results.get("question_set_hashes"):
+            run_metadata.setdefault("question_set_hashes", results["question_set_hashes"])
+        return run_metadata
+
+    def _question_rows(self, results: Dict[str, Any]):
+        if results.get("spill_path"):
+            yield from read_spill(results["spill_path"])
+            return
+
+        for result in results.get("individual_results", []) or []:
+            if not isinstance(result, dict):
+                continue
+            csv_path = result.get("csv_data_path")
+            for question in result.get("question_details", result.get("results", [])) or []:
+                row = dict(question)
+                row.setdefault("csv_data_path", csv_path)
+                yield row
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _read_sql(self, query: str, params=()) -> pd.DataFrame:
+        with self._connect() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+
+    def runs(self, agent_name: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """List stored runs, newest first."""
+        query = "SELECT run_id, agent_name, created_at, overall_score FROM runs"
+        params: List[Any] = []
+        if agent_name is not None:
+            query += " WHERE agent_name = ?"
+            params.append(agent_name)
+        query += " ORDER BY created_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        df = self._read_sql(query, params)
+        df["created_at"] = pd.to_datetime(df["created_at"], unit="s")
+        return df
+
+    def resolve_run(self, ref: str) -> str:
+        """Map a run id or an agent name (its latest run) to a run id."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (ref,)).fetchone()
+            if row is None:
+                row = conn.execute(
+                    "SELECT run_id FROM runs WHERE agent_name = ? ORDER BY created_at DESC LIMIT 1",
+                    (ref,)
+                ).fetchone()
+        if row is None:
+            raise KeyError(f"No stored run or agent named {ref!r}")
+        return row[0]
+
+    def question_rows(self, run_ids: List[str], include_failed: bool = False) -> pd.DataFrame:
+        """
+        Per-question rows for the given runs. Questions whose grading failed
+        have no real score and are left out unless `include_failed`.
+        """
+        placeholders = ", ".join("?" for _ in run_ids)
+        query = (
+            "SELECT run_id, dataset, csv_data_path, question_id, category, score, time_taken_seconds, status "
+            f"FROM question_results WHERE run_id IN ({placeholders})"
+        )
+        params = list(run_ids)
+        if not include_failed:
+            query += " AND (status IS NULL OR status != ?)"
+            params.append(_FAILED_STATUS)
+        return self._read_sql(query, params)
+
+    def question_deltas(self, baseline: str, candidate: str) -> pd.DataFrame:
+        """
+        Mean score per question for two runs (run ids or agent names, latest
+        run) and the candidate-minus-baseline delta, worst regressions first.
+        Questions that could not be graded in a run count as missing there.
+        """
+        base_id, cand_id = self.resolve_run(baseline), self.resolve_run(candidate)
+        rows = self.question_rows([base_id, cand_id])
+
+        table = rows.pivot_table(index="question_id", columns="run_id", values="score", aggfunc="mean")
+        deltas = pd.DataFrame({
+            "baseline_score": table.get(base_id),
+            "candidate_score": table.get(cand_id)
+        })
+        deltas["delta"] = deltas["candidate_score"] - deltas["baseline_score"]
+        return deltas.sort_values("delta")
+
+    def score_trend(self, agent_name: Optional[str] = None, window: int = 5) -> pd.DataFrame:
+        """
+        Overall and per-dataset scores of every run in time order, with a
+        rolling mean of the overall score.
+        """
+        query = "SELECT run_id, agent_name, created_at, overall_score, dataset_scores FROM runs"
+        params: List[Any] = []
+        if agent_name is not None:
+            query += " WHERE agent_name = ?"
+            params.append(agent_name)
+        query += " ORDER BY created_at"
+        runs = self._read_sql(query, params)
+
+        datasets = pd.json_normalize(runs.pop("dataset_scores").map(json.loads).tolist())
+        trend = pd.concat([runs, datasets], axis=1)
+        trend["created_at"] = pd.to_datetime(trend["created_at"], unit="s")
+        trend["rolling_overall"] = (
+            trend.groupby("agent_name")["overall_score"]
+            .transform(lambda s: s.rolling(window, min_periods=1).mean())
+        )
+        return trend
+
+    def latency_regressions(
+        self,
+        baseline: str,
+        candidate: str,
+        threshold: float = 0.2,
+        min_seconds: float = 0.0
+    ) -> pd.DataFrame:
+        """
+        Questions whose median answer time grew by more than `threshold`
+        (0.2 = 20%) between two runs, ignoring candidates faster than
+        `min_seconds`. Largest slowdowns first.
+        """
+        base_id, cand_id = self.resolve_run(baseline), self.resolve_run(candidate)
+        rows = self.question_rows([base_id, cand_id])
+
+        table = rows.pivot_table(
+            index="question_id", columns="run_id", values="time_taken_seconds", aggfunc="median"
+        )
+        latency = pd.DataFrame({
+            "baseline_seconds": table.get(base_id),
+            "candidate_seconds": table.get(cand_id)
+        })
+        latency["ratio"] = latency["candidate_seconds"] / latency["baseline_seconds"].where(latency["baseline_seconds"] > 0)
+        mask = (latency["ratio"] > 1 + threshold) & (latency["candidate_seconds"] >= min_seconds)
+        return latency[mask].sort_values("ratio", ascending=False)
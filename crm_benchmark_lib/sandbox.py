@@ -0,0 +1,351 @@
+# sandbox.py
+
+"""
+Run agents in resource-limited subprocesses.
+
+SandboxedAgent wraps an agent so that every calling thread (i.e. every
+run_batch worker) gets its own worker process with an address-space limit and
+a per-question CPU-time limit. The DataFrame is placed in shared memory once
+and mapped by the worker without copying its numeric columns.
+
+A question that exceeds a limit, times out or crashes the worker is answered
+with an empty response (scored 0) and its "agent_metrics" record
+`sandbox_failure`; the worker is replaced immediately so the remaining
+questions keep running at full speed.
+
+Usage:
+```python
+from crm_benchmark_lib.sandbox import SandboxedAgent
+
+agent = SandboxedAgent(my_agent, memory_limit_mb=2048, cpu_time_limit=60)
+results = client.run_full_benchmark(agent_callable=agent, parallel=True)
+agent.close()
+```
+
+The wrapped agent (a function or PreparedAgent) must be picklable, e.g.
+defined at module level. Inside the worker the DataFrame is read-only.
+"""
+
+import pickle
+import signal
+import logging
+import weakref
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .agents import is_prepared_agent, agent_metrics_scope, report_agent_metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+# Number of DataFrames a worker keeps mapped (and prepared) at once
+_WORKER_FRAME_CACHE = 2
+
+
+class _CpuTimeExceeded(Exception):
+    pass
+
+
+# ------------------------------------------------------------------------
+# Shared-memory DataFrame transport
+# ------------------------------------------------------------------------
+def _frame_to_shared_memory(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, list]:
+    """
+    Pickle `df` (protocol 5) into a new shared memory block. Large buffers such
+    as numeric column data are stored out-of-band so the worker can map them
+    without copying. Returns the block and the (offset, length) layout.
+    """
+    buffers = []
+    head = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+    raw = [memoryview(b.raw()) for b in buffers]
+
+    size = len(head) + sum(r.nbytes for r in raw)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    layout = []
+    offset = 0
+    for chunk in [memoryview(head)] + raw:
+        shm.buf[offset:offset + chunk.nbytes] = chunk.cast("B")
+        layout.append((offset, chunk.nbytes))
+        offset += chunk.nbytes
+    return shm, layout
+
+
+def _frame_from_shared_memory(name: str, layout: list) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    shm = shared_memory.SharedMemory(name=name)
+    view = shm.buf.toreadonly()
+    (head_offset, head_length), buffer_layout = layout[0], layout[1:]
+    df = pickle.loads(
+        view[head_offset:head_offset + head_length],
+        buffers=[view[offset:offset + length] for offset, length in buffer_layout]
+    )
+    return shm, df
+
+
+# ------------------------------------------------------------------------
+# Worker process
+# ------------------------------------------------------------------------
+def _raise_cpu_exceeded(signum, frame):
+    raise _CpuTimeExceeded()
+
+
+def _cpu_seconds_used() -> float:
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _worker_main(conn, agent, memory_limit_mb, cpu_time_limit):
+    import resource
+
+    if memory_limit_mb:
+        limit = int(memory_limit_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_time_limit:
+        signal.signal(signal.SIGXCPU, _raise_cpu_exceeded)
+        _, cpu_hard_limit = resource.getrlimit(resource.RLIMIT_CPU)
+
+    frames = {}  # shm name -> (shm, df, prepared state)
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        name, layout, question = message
+        outcome = None
+        try:
+            if cpu_time_limit:
+                # RLIMIT_CPU counts the whole process lifetime; re-arm it per question.
+                # Only the soft limit moves: a lowered hard limit could not be raised again.
+                soft = int(_cpu_seconds_used() + cpu_time_limit) + 1
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_hard_limit))
+
+            with agent_metrics_scope() as metrics:
+                if name not in frames:
+                    while len(frames) >= _WORKER_FRAME_CACHE:
+                        _release_frame(frames.pop(next(iter(frames))))
+                    shm, df = _frame_from_shared_memory(name, layout)
+                    state = agent.prepare(df) if is_prepared_agent(agent) else df
+                    frames[name] = (shm, df, state)
+                _, df, state = frames[name]
+
+                if is_prepared_agent(agent):
+                    answer = agent.answer(question, state)
+                else:
+                    answer = agent(question, df)
+            outcome = ("ok", answer, metrics)
+        except _CpuTimeExceeded:
+            outcome = ("failed", "cpu_time_limit", {})
+        except MemoryError:
+            outcome = ("failed", "memory_limit", {})
+        except Exception as e:
+            outcome = ("error", f"{type(e).__name__}: {e}", {})
+        finally:
+            if cpu_time_limit:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_hard_limit, cpu_hard_limit))
+
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            conn.send(("error", f"Unpicklable agent response: {e}", {}))
+
+        if outcome[0] == "failed":
+            # State after a breach is unreliable; let the parent start a fresh worker
+            break
+
+    for entry in frames.values():
+        _release_frame(entry)
+
+
+def _release_frame(entry) -> None:
+    shm = entry[0]
+    del entry
+    try:
+        shm.close()
+    except BufferError:
+        # The agent still holds views into the block; the OS reclaims it at exit
+        pass
+
+
+class _Worker:
+    """One worker process and the pipe to it."""
+
+    def __init__(self, context, agent, memory_limit_mb, cpu_time_limit):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, agent, memory_limit_mb, cpu_time_limit),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        try:
+            if self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(timeout)
+        except (OSError, BrokenPipeError):
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+# ------------------------------------------------------------------------
+# Public wrapper
+# ------------------------------------------------------------------------
+class SandboxedAgent:
+    """
+    Agent wrapper that answers questions in resource-limited worker processes.
+
+    Args:
+        agent: Agent function (question, df) -> str or a PreparedAgent; must be picklable
+        memory_limit_mb: Address-space limit of each worker (RLIMIT_AS), None for no limit
+        cpu_time_limit: CPU seconds a single question may use (RLIMIT_CPU), None for no limit
+        timeout: Wall-clock seconds per question before the worker is killed
+        start_method: multiprocessing start method; "forkserver" (default where
+            available) keeps worker restarts fast without forking the threaded parent
+    """
+
+    def __init__(
+        self,
+        agent: Callable[[str, pd.DataFrame], str],
+        memory_limit_mb: Optional[float] = 2048,
+        cpu_time_limit: Optional[float] = 60,
+        timeout: Optional[float] = 300,
+        start_method: Optional[str] = None
+    ):
+        self.agent = agent
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_time_limit = cpu_time_limit
+        self.timeout = timeout
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload(["pandas", __name__])
+
+        self.restarts = 0
+        self.failures: Dict[str, int] = {}
+        self._local = threading.local()
+        self._workers = []
+        self._frames: Dict[int, Tuple[Any, shared_memory.SharedMemory, list]] = {}
+        self._lock = threading.Lock()
+
+    # PreparedAgent protocol: prepare() publishes the DataFrame, answer() asks the worker
+    def prepare(self, df: pd.DataFrame) -> Tuple[str, list]:
+        key = id(df)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None and entry[0]() is df:
+                return entry[1].name, entry[2]
+
+            shm, layout = _frame_to_shared_memory(df)
+            ref = weakref.ref(df, lambda _, key=key: self._release(key))
+            self._frames[key] = (ref, shm, layout)
+        return shm.name, layout
+
+    def answer(self, question: str, state: Tuple[str, list]) -> str:
+        name, layout = state
+        worker = self._worker()
+        try:
+            worker.conn.send((name, layout, question))
+            if worker.conn.poll(self.timeout):
+                status, value, metrics = worker.conn.recv()
+            else:
+                status, value, metrics = "failed", "timeout", {}
+        except (EOFError, OSError):
+            exitcode = worker.process.exitcode
+            if exitcode is None:
+                worker.process.join(1.0)
+                exitcode = worker.process.exitcode
+            status, value, metrics = "failed", self._describe_exit(exitcode), {}
+
+        if metrics:
+            report_agent_metrics(**metrics)
+
+        if status == "ok":
+            return value
+        if status == "error":
+            logger.error(f"Sandboxed agent raised {value}")
+            report_agent_metrics(sandbox_error=value)
+            return ""
+
+        logger.error(f"Sandboxed agent failed on question ({value}); restarting worker")
+        with self._lock:
+            self.failures[value] = self.failures.get(value, 0) + 1
+            self.restarts += 1
+        report_agent_metrics(sandbox_failure=value)
+        self._restart(worker)
+        return ""
+
+    def __call__(self, question: str, df: pd.DataFrame) -> str:
+        return self.answer(question, self.prepare(df))
+
+    @staticmethod
+    def _describe_exit(exitcode: Optional[int]) -> str:
+        if exitcode == -signal.SIGXCPU:
+            return "cpu_time_limit"
+        if exitcode == -signal.SIGKILL:
+            # Typically the kernel OOM killer
+            return "killed"
+        return f"worker_exit_{exitcode}"
+
+    def _worker(self) -> _Worker:
+        worker = getattr(self._local, "worker", None)
+        if worker is None or not worker.process.is_alive():
+            if worker is not None:
+                worker.stop()
+            worker = _Worker(self._context, self.agent, self.memory_limit_mb, self.cpu_time_limit)
+            self._local.worker = worker
+            with self._lock:
+                self._workers.append(worker)
+        return worker
+
+    def _restart(self, worker: _Worker) -> None:
+        worker.stop(timeout=0.2)
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        self._local.worker = None
+        # Start the replacement now so the next question does not wait for it
+        self._worker()
+
+    def _release(self, key: int) -> None:
+        with self._lock:
+            entry = self._frames.pop(key, None)
+        if entry is not None:
+            _, shm, _ = entry
+            shm.close()
+            shm.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker restarts and failures by reason since the agent was created."""
+        with self._lock:
+            return {"restarts": self.restarts, "failures": dict(self.failures)}
+
+    def close(self) -> None:
+        """Stop all workers and free the shared memory blocks."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+        self._local = threading.local()
+        for key in list(self._frames):
+            self._release(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
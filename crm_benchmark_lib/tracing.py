@@ -0,0 +1,212 @@
+# tracing.py
+
+"""
+Opt-in tracing of the OpenAI calls an agent makes while answering a question.
+
+Inside `trace_llm_calls()` every request made through an `openai` client
+(sync or async, any endpoint) is recorded with its model, latency, token usage
+and the number of retries the client performed. The harness uses this for
+`run_benchmark(..., trace_agent_llm_calls=True)` to split each question's time into
+model time and local compute time:
+
+```python
+results = client.run_full_benchmark(agent_callable=my_agent, trace_agent_llm_calls=True)
+question = results["individual_results"][0]["question_details"][0]
+question["llm_trace"]["model_time_seconds"], question["llm_trace"]["local_time_seconds"]
+```
+
+Traced token usage also counts as agent usage for cost metering. The openai
+client is patched once, on first use; outside a tracing scope the patched
+methods only add a context-variable lookup. Calls made from threads the agent
+starts itself are not attributed to the question.
+"""
+
+import time
+import inspect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from .metering import record_usage
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+_current_trace = contextvars.ContextVar("crm_bench_llm_trace", default=None)
+_current_call = contextvars.ContextVar("crm_bench_llm_call", default=None)
+
+_install_lock = threading.Lock()
+_installed = False
+
+# Methods that run once per retry in the different openai 1.x client versions
+_RETRY_HOOKS = ("_sleep_for_retry", "_retry_request")
+
+
+@contextmanager
+def trace_llm_calls():
+    """
+    Record OpenAI calls made in this thread / task while the block runs. Yields
+    the list the call dicts are appended to.
+    """
+    install_openai_tracing()
+    calls = []
+    token = _current_trace.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_trace.reset(token)
+
+
+def install_openai_tracing() -> bool:
+    """Patch the openai base clients (idempotent). Returns False if openai is unavailable."""
+    global _installed
+    if _installed:
+        return True
+    with _install_lock:
+        if _installed:
+            return True
+        try:
+            from openai import _base_client
+        except ImportError:
+            logger.error("openai is not installed; LLM calls will not be traced")
+            return False
+
+        for cls in (_base_client.SyncAPIClient, _base_client.AsyncAPIClient):
+            _wrap_request(cls)
+            for name in _RETRY_HOOKS:
+                if hasattr(cls, name):
+                    _wrap_retry_hook(cls, name)
+                    break
+        _installed = True
+    return True
+
+
+def _wrap_request(cls) -> None:
+    original = cls.request
+
+    if inspect.iscoroutinefunction(original):
+        async def request(self, cast_to, options, *args, **kwargs):
+            calls = _current_trace.get()
+            if calls is None:
+                return await original(self, cast_to, options, *args, **kwargs)
+            call, token, start_time = _start_call(options, kwargs)
+            try:
+                response = await original(self, cast_to, options, *args, **kwargs)
+                _record_response(call, response)
+                return response
+            except Exception as e:
+                call["status"] = "error"
+                call["error"] = type(e).__name__
+                raise
+            finally:
+                _finish_call(calls, call, token, start_time)
+    else:
+        def request(self, cast_to, options, *args, **kwargs):
+            calls = _current_trace.get()
+            if calls is None:
+                return original(self, cast_to, options, *args, **kwargs)
+            call, token, start_time = _start_call(options, kwargs)
+            try:
+                response = original(self, cast_to, options, *args, **kwargs)
+                _record_response(call, response)
+                return response
+            except Exception as e:
+                call["status"] = "error"
+                call["error"] = type(e).__name__
+                raise
+            finally:
+                _finish_call(calls, call, token, start_time)
+
+    cls.request = request
+
+
+def _wrap_retry_hook(cls, name: str) -> None:
+    original = getattr(cls, name)
+
+    if inspect.iscoroutinefunction(original):
+        async def hook(self, *args, **kwargs):
+            call = _current_call.get()
+            if call is not None:
+                call["retries"] += 1
+            return await original(self, *args, **kwargs)
+    else:
+        def hook(self, *args, **kwargs):
+            call = _current_call.get()
+            if call is not None:
+                call["retries"] += 1
+            return original(self, *args, **kwargs)
+
+    setattr(cls, name, hook)
+
+
+def _start_call(options, kwargs):
+    json_data = getattr(options, "json_data", None)
+    call = {
+        "model": json_data.get("model") if isinstance(json_data, dict) else None,
+        "endpoint": getattr(options, "url", None),
+        "stream": bool(kwargs.get("stream")),
+        "status": "ok",
+        "retries": 0,
+    }
+    token = _current_call.set(call)
+    return call, token, time.perf_counter()
+
+
+def _finish_call(calls: list, call: dict, token, start_time: float) -> None:
+    call["latency_seconds"] = round(time.perf_counter() - start_time, 4)
+    _current_call.reset(token)
+    calls.append(call)
+
+
+def _record_response(call: dict, response: Any) -> None:
+    """Copy model and token usage from a parsed response (chat, completions or responses API)."""
+    model = getattr(response, "model", None)
+    if isinstance(model, str):
+        call["model"] = model
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if prompt_tokens is None:
+        prompt_tokens = getattr(usage, "input_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if completion_tokens is None:
+        completion_tokens = getattr(usage, "output_tokens", None)
+    call["prompt_tokens"] = prompt_tokens or 0
+    call["completion_tokens"] = completion_tokens or 0
+    call["total_tokens"] = getattr(usage, "total_tokens", None) or call["prompt_tokens"] + call["completion_tokens"]
+    record_usage("agent", call["model"], call["prompt_tokens"], call["completion_tokens"])
+
+
+def summarize_llm_calls(calls: List[Dict[str, Any]], elapsed: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Totals for a list of traced calls. With `elapsed` (the question's wall
+    time) the remainder not spent waiting on the model is reported as
+    local_time_seconds; concurrent calls can make model time exceed elapsed.
+    """
+    model_time = sum(c.get("latency_seconds", 0.0) for c in calls)
+    summary = {
+        "llm_calls": len(calls),
+        "failed_calls": sum(1 for c in calls if c.get("status") != "ok"),
+        "retries": sum(c.get("retries", 0) for c in calls),
+        "prompt_tokens": sum(c.get("prompt_tokens", 0) for c in calls),
+        "completion_tokens": sum(c.get("completion_tokens", 0) for c in calls),
+        "model_time_seconds": round(model_time, 4),
+    }
+    if elapsed is not None:
+        summary["local_time_seconds"] = round(max(elapsed - model_time, 0.0), 4)
+    return summary
+
+
+def merge_llm_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up summarize_llm_calls() results (e.g. over questions or CSVs)."""
+    merged: Dict[str, Any] = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            merged[key] = merged.get(key, 0) + value
+    for key in ("model_time_seconds", "local_time_seconds"):
+        if key in merged:
+            merged[key] = round(merged[key], 4)
+    return merged
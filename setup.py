@@ -26,6 +26,11 @@ setup(
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
     ],
     python_requires=">=3.7",
+    entry_points={
+        "console_scripts": [
+            "crm-bench=crm_benchmark_lib.cli:main",
+        ],
+    },
     package_data={
         "crm_benchmark_lib": [
             "dataset_questions/*.json",